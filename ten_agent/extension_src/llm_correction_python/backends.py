@@ -0,0 +1,306 @@
+#
+# VoxFlame LLM Correction Extension
+# Copyright (c) 2025 VoxFlame. All rights reserved.
+#
+import asyncio
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from typing import Any, Awaitable, Callable, List, Optional, Tuple, TypeVar
+
+from openai import AsyncOpenAI
+
+
+T = TypeVar("T")
+
+# Latency samples needed before the percentile is trusted for hedging
+MIN_HEDGE_SAMPLES = 5
+
+# Consecutive failures after which a backend sits out for a cooldown
+MAX_CONSECUTIVE_FAILURES = 3
+
+
+class LatencyTracker:
+    """EWMA of a backend's latency plus a window of recent samples"""
+
+    def __init__(self, alpha: float = 0.2, window: int = 64):
+        self.alpha = alpha
+        self.ewma: Optional[float] = None
+        self._samples: deque = deque(maxlen=window)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def observe(self, latency_s: float) -> None:
+        self._samples.append(latency_s)
+        if self.ewma is None:
+            self.ewma = latency_s
+        else:
+            self.ewma += self.alpha * (latency_s - self.ewma)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """q-th quantile (0..1) of the recent samples"""
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+@dataclass
+class BackendStats:
+    requests: int = 0
+    wins: int = 0  # Answers that were used
+    failures: int = 0
+    hedges: int = 0  # Duplicates sent because this backend was slow
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+@dataclass
+class Backend:
+    """One OpenAI-compatible endpoint and model"""
+
+    name: str
+    client: Any
+    model: str
+    weight: float = 1.0
+    timeout_s: float = 10.0
+    latency: LatencyTracker = field(default_factory=LatencyTracker)
+    stats: BackendStats = field(default_factory=BackendStats)
+    inflight: int = 0
+    consecutive_failures: int = 0
+    down_until: float = 0.0
+
+    def score(self) -> float:
+        """Expected latency scaled by load and weight; lower is better"""
+        # Backends without samples go first so they get measured
+        ewma = self.latency.ewma or 0.0
+        return ewma * (1 + self.inflight) / self.weight
+
+
+class BackendPool:
+    """
+    Latency-aware routing and request hedging over LLM backends.
+
+    Requests go to the backend with the lowest EWMA latency (scaled by
+    weight and in-flight requests). If it has not answered by the
+    hedge_percentile of its recent latencies, the same request is sent to
+    the next backend and whichever answers first wins; the other attempt is
+    cancelled. Failed attempts fail over to the next backend immediately.
+    """
+
+    def __init__(
+        self,
+        backends: List[Backend],
+        hedge: bool = True,
+        hedge_percentile: float = 0.9,
+        hedge_min_delay_s: float = 0.15,
+        cooldown_s: float = 30.0,
+    ):
+        if not backends:
+            raise ValueError("BackendPool needs at least one backend")
+        self.backends = backends
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_delay_s = hedge_min_delay_s
+        self.cooldown_s = cooldown_s
+
+    @classmethod
+    def from_config(
+        cls, config, default_api_key: str = "", http_client=None
+    ) -> "BackendPool":
+        """Build the pool from an LLMCorrectionConfig; clients share http_client"""
+        backends = [
+            Backend(
+                name=b.name or f"{b.model}@{b.base_url}",
+                client=AsyncOpenAI(
+                    api_key=b.api_key or default_api_key,
+                    base_url=b.base_url,
+                    max_retries=0,
+                    http_client=http_client,
+                ),
+                model=b.model,
+                weight=b.weight,
+                timeout_s=b.timeout_s,
+            )
+            for b in config.get_backends()
+        ]
+        return cls(
+            backends,
+            hedge=config.hedge_enabled,
+            hedge_percentile=config.hedge_percentile,
+            hedge_min_delay_s=config.hedge_min_delay_ms / 1000,
+        )
+
+    def ranked(self) -> List[Backend]:
+        """Backends in the order they should be tried"""
+        now = time.monotonic()
+        return sorted(
+            self.backends,
+            key=lambda b: (b.down_until > now, b.score()),
+        )
+
+    def hedge_delay(self, backend: Backend) -> float:
+        """How long to wait for a backend before sending a duplicate"""
+        if len(backend.latency) < MIN_HEDGE_SAMPLES:
+            return max(self.hedge_min_delay_s, backend.timeout_s / 2)
+        return max(
+            self.hedge_min_delay_s, backend.latency.percentile(self.hedge_percentile)
+        )
+
+    def stats(self) -> dict:
+        return {
+            b.name: {
+                **b.stats.to_dict(),
+                "ewma_ms": round((b.latency.ewma or 0.0) * 1000, 1),
+            }
+            for b in self.backends
+        }
+
+    async def complete(self, **kwargs) -> Tuple[Any, Backend]:
+        """Non-streaming chat completion"""
+
+        def call(backend: Backend) -> Awaitable[Any]:
+            return backend.client.chat.completions.create(
+                model=backend.model, stream=False, **kwargs
+            )
+
+        return await self.run(call)
+
+    async def stream(self, **kwargs) -> Tuple[Any, Any, Backend]:
+        """
+        Streaming chat completion, hedged on the time to the first event.
+
+        Returns the stream, its first event (None if the stream was empty)
+        and the backend that served it. The caller must close the stream.
+        """
+
+        async def call(backend: Backend) -> Tuple[Any, Any]:
+            stream = await backend.client.chat.completions.create(
+                model=backend.model, stream=True, **kwargs
+            )
+            try:
+                first = await stream.__anext__()
+            except StopAsyncIteration:
+                first = None
+            except BaseException:
+                await stream.close()
+                raise
+            return stream, first
+
+        (stream, first), backend = await self.run(call, discard=_close_stream)
+        return stream, first, backend
+
+    async def run(
+        self,
+        call: Callable[[Backend], Awaitable[T]],
+        discard: Optional[Callable[[T], Awaitable[None]]] = None,
+    ) -> Tuple[T, Backend]:
+        """
+        Run call() against the best backend, hedging and failing over.
+
+        discard() releases the result of an attempt that finished but lost
+        the race.
+        """
+        candidates = self.ranked()
+        attempts: dict = {}
+        last_error: Optional[BaseException] = None
+        hedged = False
+
+        def launch() -> Optional[Backend]:
+            if not candidates:
+                return None
+            backend = candidates.pop(0)
+            task = asyncio.create_task(self._attempt(backend, call))
+            attempts[task] = (backend, time.monotonic())
+            return backend
+
+        primary = launch()
+        try:
+            while attempts:
+                can_hedge = self.hedge and not hedged and candidates
+                done, _ = await asyncio.wait(
+                    attempts,
+                    timeout=self.hedge_delay(primary) if can_hedge else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if not done:
+                    primary.stats.hedges += 1
+                    hedged = True
+                    launch()
+                    continue
+
+                winner = None
+                for task in done:
+                    backend, _ = attempts.pop(task)
+                    if task.exception() is not None:
+                        last_error = task.exception()
+                    elif winner is None:
+                        winner = (task.result(), backend)
+                    elif discard is not None:
+                        await discard(task.result())
+                if winner is not None:
+                    winner[1].stats.wins += 1
+                    return winner
+                if not attempts:
+                    # Every attempt so far failed; fail over
+                    primary = launch()
+                    if primary is None:
+                        break
+        finally:
+            now = time.monotonic()
+            for task, (backend, started) in attempts.items():
+                task.cancel()
+                # Lost the race: the elapsed time is a lower bound of its
+                # latency. It is recorded (so the next request already sees
+                # it) only if it says more than what is known: a hedge
+                # cancelled right after launch would drag the EWMA to ~0
+                # and make a slow backend look like the fastest.
+                elapsed = now - started
+                if elapsed >= (backend.latency.ewma or self.hedge_min_delay_s):
+                    backend.latency.observe(elapsed)
+                if discard is not None:
+                    task.add_done_callback(_discard_later(discard))
+
+        raise last_error or RuntimeError("No LLM backend available")
+
+    async def _attempt(
+        self, backend: Backend, call: Callable[[Backend], Awaitable[T]]
+    ) -> T:
+        backend.stats.requests += 1
+        backend.inflight += 1
+        started = time.monotonic()
+        try:
+            result = await asyncio.wait_for(call(backend), backend.timeout_s)
+        except Exception:
+            backend.stats.failures += 1
+            backend.consecutive_failures += 1
+            backend.latency.observe(backend.timeout_s)
+            if backend.consecutive_failures >= MAX_CONSECUTIVE_FAILURES:
+                backend.down_until = time.monotonic() + self.cooldown_s
+            raise
+        finally:
+            backend.inflight -= 1
+
+        backend.latency.observe(time.monotonic() - started)
+        backend.consecutive_failures = 0
+        backend.down_until = 0.0
+        return result
+
+
+async def _close_stream(result: Tuple[Any, Any]) -> None:
+    try:
+        await result[0].close()
+    except Exception:
+        pass
+
+
+def _discard_later(discard: Callable[[Any], Awaitable[None]]):
+    """Done callback that releases a cancelled attempt's late result"""
+
+    def callback(task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is None:
+            asyncio.ensure_future(discard(task.result()))
+
+    return callback
@@ -0,0 +1,113 @@
+#
+# VoxFlame LLM Correction Extension
+# Copyright (c) 2025 VoxFlame. All rights reserved.
+#
+import asyncio
+import itertools
+from dataclasses import asdict, dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+
+@dataclass
+class BatchItem:
+    id: str
+    request: Any
+    future: asyncio.Future = field(repr=False)
+
+
+@dataclass
+class BatchStats:
+    requests: int = 0  # LLM requests sent (batched or single)
+    batches: int = 0  # Requests that carried more than one utterance
+    batched_items: int = 0
+    fallbacks: int = 0  # Items re-sent alone after a bad batch response
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        data["avg_batch_size"] = (
+            round(self.batched_items / self.batches, 2) if self.batches else 0.0
+        )
+        return data
+
+
+class CorrectionBatcher:
+    """
+    Collects corrections arriving within a short window into one request.
+
+    The first request of a batch starts a window_s timer; the batch is sent
+    when it expires or max_batch requests are waiting. run_batch returns
+    the corrections by item id; items it misses (or all of them, if it
+    raises) are re-sent one by one with run_single. A batch of one goes
+    straight to run_single.
+    """
+
+    def __init__(
+        self,
+        run_batch: Callable[[List[BatchItem]], Awaitable[Dict[str, str]]],
+        run_single: Callable[[Any], Awaitable[str]],
+        window_s: float = 0.03,
+        max_batch: int = 8,
+    ):
+        self.run_batch = run_batch
+        self.run_single = run_single
+        self.window_s = window_s
+        self.max_batch = max_batch
+        self.stats = BatchStats()
+        self._ids = itertools.count(1)
+        self._pending: List[BatchItem] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: set = set()
+
+    async def submit(self, request: Any) -> str:
+        """Correct one request as part of the next batch"""
+        loop = asyncio.get_running_loop()
+        item = BatchItem(id=str(next(self._ids)), request=request, future=loop.create_future())
+        self._pending.append(item)
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window_s, self._flush)
+        return await item.future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        items, self._pending = self._pending, []
+        # Callers that were cancelled while waiting are dropped
+        items = [item for item in items if not item.future.done()]
+        if not items:
+            return
+        task = asyncio.ensure_future(self._run(items))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, items: List[BatchItem]) -> None:
+        results: Dict[str, str] = {}
+        if len(items) > 1:
+            self.stats.requests += 1
+            self.stats.batches += 1
+            self.stats.batched_items += len(items)
+            try:
+                results = await self.run_batch(items)
+            except Exception:
+                results = {}
+
+        missing = [item for item in items if item.id not in results]
+        if len(items) > 1:
+            self.stats.fallbacks += len(missing)
+        self.stats.requests += len(missing)
+        singles = await asyncio.gather(
+            *(self.run_single(item.request) for item in missing),
+            return_exceptions=True,
+        )
+        results.update((item.id, text) for item, text in zip(missing, singles))
+
+        for item in items:
+            if item.future.done():
+                continue
+            result = results[item.id]
+            if isinstance(result, BaseException):
+                item.future.set_exception(result)
+            else:
+                item.future.set_result(result)
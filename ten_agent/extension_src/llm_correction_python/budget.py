@@ -0,0 +1,71 @@
+#
+# VoxFlame LLM Correction Extension
+# Copyright (c) 2025 VoxFlame. All rights reserved.
+#
+import asyncio
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+
+@dataclass
+class BudgetStats:
+    """Per-utterance latency budget counters"""
+
+    utterances: int = 0
+    exceeded: int = 0  # ASR text was sent because the budget ran out
+    late_updates: int = 0  # Late corrections that differed, sent as updates
+    late_unchanged: int = 0  # Late corrections equal to the ASR text
+    late_failed: int = 0
+    max_late_ms: int = 0  # Slowest late correction, from the final ASR result
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        data["exceeded_rate"] = (
+            round(self.exceeded / self.utterances, 3) if self.utterances else 0.0
+        )
+        return data
+
+
+class LatencyBudget:
+    """
+    Bounds how long an utterance may wait for its correction.
+
+    The budget runs from the moment the final ASR result arrives. Work that
+    misses it is not cancelled; the caller sends the ASR text and lets the
+    correction finish in the background.
+    """
+
+    def __init__(self, budget_ms: int):
+        self.budget_s: Optional[float] = budget_ms / 1000 if budget_ms > 0 else None
+        self.stats = BudgetStats()
+
+    @staticmethod
+    def now() -> float:
+        return asyncio.get_running_loop().time()
+
+    def remaining(self, started: float) -> Optional[float]:
+        """Seconds left of the budget, None when unbounded"""
+        if self.budget_s is None:
+            return None
+        return max(0.0, started + self.budget_s - self.now())
+
+    async def wait(self, future: asyncio.Future, started: float) -> bool:
+        """Wait for future within the budget; True if it finished in time"""
+        try:
+            done, _ = await asyncio.wait({future}, timeout=self.remaining(started))
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        return bool(done)
+
+    def record_late(self, started: float, changed: Optional[bool]) -> int:
+        """Count a correction that finished after its budget; returns its ms"""
+        late_ms = int((self.now() - started) * 1000)
+        self.stats.max_late_ms = max(self.stats.max_late_ms, late_ms)
+        if changed is None:
+            self.stats.late_failed += 1
+        elif changed:
+            self.stats.late_updates += 1
+        else:
+            self.stats.late_unchanged += 1
+        return late_ms
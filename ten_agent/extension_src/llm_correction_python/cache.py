@@ -0,0 +1,117 @@
+#
+# VoxFlame LLM Correction Extension
+# Copyright (c) 2025 VoxFlame. All rights reserved.
+#
+import hashlib
+import json
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any, List, Optional
+
+
+# Whitespace and punctuation do not change what the user said
+_IGNORED_CHARS = re.compile(r"[\s\W_]+", re.UNICODE)
+
+
+def normalize_text(text: str) -> str:
+    """Normalize ASR text for cache lookups (width, case, punctuation)."""
+    text = unicodedata.normalize("NFKC", text).lower()
+    return _IGNORED_CHARS.sub("", text)
+
+
+def _digest(value: Any) -> str:
+    if not value:
+        return ""
+    data = value if isinstance(value, str) else json.dumps(value, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha1(data.encode("utf-8")).hexdigest()[:16]
+
+
+def make_cache_key(
+    asr_text: str,
+    user_profile: Any = None,
+    vocabulary: Optional[List[str]] = None,
+    last_turn: Optional[dict] = None,
+) -> str:
+    """
+    Build the cache key of a correction.
+
+    The profile, vocabulary and (optionally) last context turn all change
+    the prompt, so they are part of the key; they are hashed to keep keys
+    short.
+    """
+    return "|".join(
+        (
+            normalize_text(asr_text),
+            _digest(user_profile),
+            _digest(vocabulary),
+            _digest(last_turn),
+        )
+    )
+
+
+@dataclass
+class CacheStats:
+    """Correction cache counters"""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    size: int = 0
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        lookups = self.hits + self.misses
+        data["hit_rate"] = round(self.hits / lookups, 3) if lookups else 0.0
+        return data
+
+
+class CorrectionCache:
+    """
+    LRU cache of corrections with a time-to-live.
+
+    Dysarthric users repeat the same short phrases many times a day, so a
+    small cache answers most of them without a remote LLM round trip.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_s: float = 3600):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.stats = CacheStats()
+        self._entries: "OrderedDict[str, tuple[float, str]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats.misses += 1
+            return None
+
+        stored_at, value = entry
+        if self.ttl_s > 0 and time.monotonic() - stored_at > self.ttl_s:
+            del self._entries[key]
+            self.stats.expirations += 1
+            self.stats.misses += 1
+            self.stats.size = len(self._entries)
+            return None
+
+        self._entries.move_to_end(key)
+        self.stats.hits += 1
+        return value
+
+    def put(self, key: str, value: str) -> None:
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+        self.stats.size = len(self._entries)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.stats.size = 0
@@ -3,7 +3,18 @@
 # Copyright (c) 2025 VoxFlame. All rights reserved.
 #
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Optional, List, Literal
+
+
+class BackendConfig(BaseModel):
+    """One OpenAI-compatible LLM endpoint of the backend pool"""
+
+    name: str = ""
+    base_url: str
+    model: str
+    api_key: str = ""  # Empty = use the top-level api_key
+    weight: float = 1.0  # Higher = preferred at equal latency
+    timeout_s: float = 10.0
 
 
 class LLMCorrectionConfig(BaseModel):
@@ -27,6 +38,105 @@ class LLMCorrectionConfig(BaseModel):
     # Maximum context history to keep
     max_context_length: int = 5
 
+    # Estimated prompt size limit; oldest context turns, then phrase hints,
+    # are dropped to stay within it
+    max_prompt_tokens: int = 2048
+
+    # Use the ASR text without calling the LLM when the recognizer's
+    # confidence is at least guard_skip_confidence or it exactly matches a
+    # known phrase. Reject corrections whose edit distance / length from
+    # the ASR text exceeds both the character and the pinyin limit.
+    guard_enabled: bool = True
+    guard_skip_confidence: float = 0.95
+    guard_max_char_distance: float = 0.5
+    guard_max_pinyin_distance: float = 0.4
+
+    # Stream the completion and forward clause-sized chunks to TTS
+    streaming: bool = True
+    stream_min_chunk_chars: int = 4  # Shortest chunk cut at punctuation
+
+    # Cache of corrections keyed by normalized ASR text, profile and vocabulary
+    cache_enabled: bool = True
+    cache_max_entries: int = 1024
+    cache_ttl_s: int = 3600  # 0 = entries never expire
+    cache_include_context: bool = False  # Also key on the last context turn
+
+    # Local index of known phrases, matched by confusable-collapsed pinyin.
+    # Matches above phrase_match_threshold skip the LLM; candidates above
+    # phrase_hint_threshold are added to the prompt.
+    phrases: List[str] = []
+    phrase_bank_enabled: bool = True
+    phrase_match_threshold: float = 0.9
+    phrase_hint_threshold: float = 0.5
+    phrase_max_hints: int = 3
+    phrase_max_distance: int = 2  # Syllable edits searched in the index
+
+    # Start correcting an interim result once it has been unchanged for
+    # speculative_stable_ms; a matching final reuses the result. Costs an
+    # extra LLM request whenever the hypothesis changes after that. Needs
+    # interim results, which main_control forwards with forward_interim.
+    # A reused result is sent as one message, also when streaming. Off by
+    # default; enable it together with forward_interim in the graph.
+    speculative: bool = False
+    speculative_stable_ms: int = 300
+
+    # Corrections running at once across all clients; each client's
+    # corrections are still sent in order
+    max_in_flight: int = 8
+
+    # Micro-batching: corrections arriving within batch_window_ms (across
+    # clients) share one JSON-output request. 0 = one request each. Batched
+    # corrections are not streamed.
+    batch_window_ms: int = 0
+    batch_max_size: int = 8
+
+    # Longest an utterance waits for its correction (for its first chunk
+    # when streaming); after that the ASR text is spoken and the correction
+    # follows as a display update. 0 = wait indefinitely.
+    latency_budget_ms: int = 1500
+
+    # Backend pool; empty = base_url/model above. Requests go to the backend
+    # with the lowest latency EWMA, and a duplicate is sent to the next one
+    # when the first is slower than its hedge_percentile latency.
+    backends: List[BackendConfig] = []
+    request_timeout_s: float = 10.0  # Timeout of the base_url/model backend
+    hedge_enabled: bool = True
+    hedge_percentile: float = 0.9
+    hedge_min_delay_ms: int = 150
+
+    # HTTP connection pool shared by all backends and clients. Idle
+    # connections are kept alive for http_keepalive_expiry_s so requests
+    # skip TCP/TLS setup; on start, http_warmup_connections connections per
+    # backend are opened. http2 needs the h2 package.
+    http_max_connections: int = 32
+    http_max_keepalive: int = 16
+    http_keepalive_expiry_s: float = 60.0
+    http2: bool = False
+    http_connect_timeout_s: float = 3.0
+    http_read_timeout_s: float = 30.0
+    http_pool_timeout_s: float = 5.0  # Wait for a free connection
+    http_warmup_connections: int = 1  # 0 = no warm-up
+
+    # On-box GGUF model (llama-cpp-python) on the CPU; empty path = off.
+    # Utterances of at most local_max_chars characters, and users whose
+    # profile id is in local_users, are corrected locally; with
+    # local_fallback, remote failures are retried locally too.
+    local_model_path: str = ""
+    local_model_threads: int = 4
+    local_model_context: int = 2048
+    local_max_queue: int = 16  # Further requests go to the remote backends
+    local_max_batch: int = 4
+    local_max_chars: int = 6
+    local_users: List[str] = []
+    local_fallback: bool = True
+
+    # Logging (voxflame_common.log). Per-message lines (ASR results, sends)
+    # are logged at debug and summarized at info every
+    # log_summary_interval_s unless log_frame_summaries is off.
+    log_level: Literal["debug", "info", "warn", "error"] = "info"
+    log_frame_summaries: bool = True
+    log_summary_interval_s: float = 10.0
+
     # System prompt for correction
     system_prompt: str = """你是专业的语音纠错助手，帮助构音障碍患者纠正语音识别错误。
 
@@ -40,14 +150,76 @@ class LLMCorrectionConfig(BaseModel):
 4. 如果识别结果已经正确，直接输出原文
 5. 保持简洁，不要添加额外内容"""
 
+    def get_backends(self) -> List[BackendConfig]:
+        """Configured backends, or the single base_url/model backend"""
+        if self.backends:
+            return self.backends
+        return [
+            BackendConfig(
+                name=self.model,
+                base_url=self.base_url,
+                model=self.model,
+                timeout_s=self.request_timeout_s,
+            )
+        ]
+
     def validate_config(self) -> None:
         """Validate configuration"""
-        if not self.api_key:
+        if not self.api_key and (
+            not self.backends or not all(b.api_key for b in self.backends)
+        ):
             raise ValueError("api_key is required")
+        for backend in self.backends:
+            if backend.weight <= 0 or backend.timeout_s <= 0:
+                raise ValueError(
+                    f"backend {backend.name or backend.model}: "
+                    "weight and timeout_s must be positive"
+                )
+        if not 0 < self.hedge_percentile < 1:
+            raise ValueError("hedge_percentile must be between 0 and 1")
+        if self.http_max_connections <= 0 or self.http_max_keepalive < 0:
+            raise ValueError(
+                "http_max_connections must be positive, http_max_keepalive must not be negative"
+            )
+        if self.http_warmup_connections < 0:
+            raise ValueError("http_warmup_connections must not be negative")
+        if self.local_model_path and (
+            self.local_model_threads <= 0
+            or self.local_max_queue <= 0
+            or self.local_max_batch <= 0
+        ):
+            raise ValueError(
+                "local_model_threads, local_max_queue and local_max_batch must be positive"
+            )
+        if not (
+            0 <= self.guard_max_char_distance <= 1
+            and 0 <= self.guard_max_pinyin_distance <= 1
+        ):
+            raise ValueError("guard distances must be between 0 and 1")
+        if self.log_summary_interval_s <= 0:
+            raise ValueError("log_summary_interval_s must be positive")
+        if self.cache_max_entries <= 0:
+            raise ValueError("cache_max_entries must be positive")
+        if self.max_in_flight <= 0:
+            raise ValueError("max_in_flight must be positive")
+        if self.batch_window_ms < 0 or self.batch_max_size <= 0:
+            raise ValueError("batch_window_ms must not be negative, batch_max_size must be positive")
+        if self.latency_budget_ms < 0:
+            raise ValueError("latency_budget_ms must not be negative")
+        if self.speculative_stable_ms < 0:
+            raise ValueError("speculative_stable_ms must not be negative")
+        if not 0 <= self.phrase_hint_threshold <= self.phrase_match_threshold <= 1:
+            raise ValueError(
+                "phrase thresholds must satisfy 0 <= hint <= match <= 1"
+            )
 
     def to_str(self, sensitive_handling: bool = True) -> str:
         """Convert config to string for logging"""
         config_dict = self.model_dump()
         if sensitive_handling and self.api_key:
             config_dict["api_key"] = self.api_key[:8] + "***"
+        if sensitive_handling:
+            for backend in config_dict["backends"]:
+                if backend["api_key"]:
+                    backend["api_key"] = backend["api_key"][:8] + "***"
         return str(config_dict)
@@ -2,18 +2,117 @@
 # VoxFlame LLM Correction Extension
 # Copyright (c) 2025 VoxFlame. All rights reserved.
 #
-from typing import List, Optional
+import json
+from typing import AsyncIterator, Dict, List, Optional
 from openai import AsyncOpenAI
 
 from ten_runtime.async_ten_env import AsyncTenEnv
 
+from .backends import Backend, BackendPool
+from .batcher import BatchItem, CorrectionBatcher
+from .cache import CorrectionCache, make_cache_key
+from .guard import CorrectionGuard
+from .local_model import LocalModel, LocalModelUnavailable
+from .phrase_bank import PhraseBank
+from .prompt import DEFAULT_SESSION, Prompt, PromptBuilder, format_profile
+
+
+# Common prefixes that LLMs put in front of the corrected text
+RESPONSE_PREFIXES = [
+    "纠正后的文本：",
+    "纠正后：",
+    "纠正结果：",
+    "纠正：",
+    "正确的文本：",
+    "应该是：",
+]
+
+# Streamed output is cut into TTS chunks after these characters
+CLAUSE_BREAKS = "，。！？；：、,.!?;:…"
+
+QUOTE_CHARS = "\"'「」“”"
+
+# Appended to the system prompt when several utterances share a request
+BATCH_INSTRUCTIONS = """
+
+## 批量模式
+输入包含多条互不相关的语音识别任务，每条以 "=== id=<编号> ===" 开头，请分别纠正。
+只输出 JSON，不要其他内容：{"results": [{"id": "<编号>", "text": "<纠正后的文本>"}]}"""
+
+
+class ClauseChunker:
+    """
+    Cuts streamed LLM output into clause-sized chunks for TTS.
+
+    Applies the same cleanup as ``LLMCorrector._clean_response``
+    incrementally: known prefixes and quotes are stripped and only the
+    first line is kept. Chunks end at Chinese/ASCII punctuation and are at
+    least ``min_chars`` long, so TTS is not fed single words.
+    """
+
+    def __init__(self, min_chars: int = 4):
+        self.min_chars = min_chars
+        self.done = False
+        self._buffer = ""
+        self._started = False
+
+    def feed(self, delta: str) -> List[str]:
+        """Add a token delta; returns the chunks that are now complete."""
+        if self.done or not delta:
+            return []
+        self._buffer += delta
+
+        # Leading blank lines are not the end of the first line
+        text = self._buffer if self._started else self._buffer.lstrip()
+        if "\n" in text:
+            # Only the first line is the correction; drop explanations
+            self._buffer = text.split("\n", 1)[0]
+            self.done = True
+
+        if not self._started and not self._strip_prefix():
+            return []
+
+        chunks = []
+        start = 0
+        for i, char in enumerate(self._buffer):
+            if char in CLAUSE_BREAKS and i + 1 - start >= self.min_chars:
+                chunks.append(self._buffer[start:i + 1])
+                start = i + 1
+        self._buffer = self._buffer[start:]
+        return chunks
+
+    def finish(self) -> Optional[str]:
+        """Return whatever is left once the stream has ended."""
+        if not self._started:
+            self._strip_prefix(final=True)
+        tail = self._buffer.rstrip().rstrip(QUOTE_CHARS)
+        self._buffer = ""
+        self.done = True
+        return tail or None
+
+    def _strip_prefix(self, final: bool = False) -> bool:
+        """Strip a leading prefix/quote once enough text has arrived."""
+        text = self._buffer.lstrip()
+        if not final and not self.done and (
+            not text or any(p.startswith(text) for p in RESPONSE_PREFIXES)
+        ):
+            # Could still turn into a prefix; wait for more tokens
+            return False
+        for prefix in RESPONSE_PREFIXES:
+            if text.startswith(prefix):
+                text = text[len(prefix):].lstrip()
+        self._buffer = text.lstrip(QUOTE_CHARS)
+        self._started = True
+        return True
+
 
 class LLMCorrector:
     """
     LLM-based speech correction for dysarthric speech.
 
     Uses DashScope (Qwen) API via OpenAI-compatible interface
-    to correct ASR recognition errors.
+    to correct ASR recognition errors. With a BackendPool, requests are
+    routed and hedged across several endpoints/models.
     """
 
     def __init__(
@@ -27,69 +126,115 @@ class LLMCorrector:
         user_profile: str,
         vocabulary: List[str],
         ten_env: AsyncTenEnv,
+        stream_min_chunk_chars: int = 4,
+        cache: Optional[CorrectionCache] = None,
+        cache_include_context: bool = False,
+        phrase_match_threshold: float = 0.9,
+        phrase_hint_threshold: float = 0.5,
+        phrase_max_hints: int = 3,
+        pool: Optional[BackendPool] = None,
+        batch_window_ms: int = 0,
+        batch_max_size: int = 8,
+        max_prompt_tokens: int = 2048,
+        local_model: Optional[LocalModel] = None,
+        local_max_chars: int = 0,
+        local_users: Optional[List[str]] = None,
+        local_fallback: bool = True,
+        guard: Optional[CorrectionGuard] = None,
     ):
         self.model = model
         self.max_tokens = max_tokens
         self.temperature = temperature
         self.system_prompt = system_prompt
-        self.user_profile = user_profile
         self.vocabulary = vocabulary
         self.ten_env = ten_env
+        self.stream_min_chunk_chars = stream_min_chunk_chars
+        self.cache = cache
+        self.cache_include_context = cache_include_context
+        self.phrase_match_threshold = phrase_match_threshold
+        self.phrase_hint_threshold = phrase_hint_threshold
+        self.phrase_max_hints = phrase_max_hints
+        self.guard = guard
 
-        # Initialize OpenAI client with DashScope endpoint
-        self.client = AsyncOpenAI(
-            api_key=api_key,
-            base_url=base_url,
-        )
+        # On-box model: preferred for short utterances and listed users,
+        # and used when the remote backends fail if local_fallback is set
+        self.local_model = local_model
+        self.local_max_chars = local_max_chars
+        self.local_users = set(local_users or [])
+        self.local_fallback = local_fallback
+        self.local_sessions: set = set()
 
-        ten_env.log_info(f"LLMCorrector initialized with model: {model}")
-
-    def update_user_profile(self, user_profile: dict) -> None:
-        """Update user profile for personalized correction."""
-        # Format user profile as string for prompt
-        if isinstance(user_profile, dict):
-            profile_parts = []
-            if user_profile.get('email'):
-                profile_parts.append(f"邮箱: {user_profile['email']}")
-            if user_profile.get('name'):
-                profile_parts.append(f"昵称: {user_profile['name']}")
-            if user_profile.get('id'):
-                profile_parts.append(f"用户ID: {user_profile['id']}")
-            self.user_profile = "\n".join(profile_parts) if profile_parts else ""
-        else:
-            self.user_profile = str(user_profile)
+        # Static prompt parts per session (profile, vocabulary)
+        self.prompts = PromptBuilder(
+            system_prompt,
+            vocabulary=vocabulary,
+            user_profile=user_profile,
+            max_prompt_tokens=max_prompt_tokens,
+        )
 
-        self.ten_env.log_info(f"User profile updated: {self.user_profile[:100] if self.user_profile else 'empty'}...")
+        if pool is None:
+            # Single DashScope endpoint
+            pool = BackendPool(
+                [
+                    Backend(
+                        name=model,
+                        client=AsyncOpenAI(api_key=api_key, base_url=base_url),
+                        model=model,
+                    )
+                ],
+                hedge=False,
+            )
+        self.pool = pool
 
-    def _build_prompt(self, asr_text: str, context: List[dict]) -> str:
-        """Build the correction prompt with context"""
-        prompt_parts = []
+        # Micro-batching of concurrent corrections (0 = off)
+        self.batcher: Optional[CorrectionBatcher] = None
+        if batch_window_ms > 0:
+            self.batcher = CorrectionBatcher(
+                run_batch=self._complete_batch,
+                run_single=self._complete,
+                window_s=batch_window_ms / 1000,
+                max_batch=batch_max_size,
+            )
 
-        # Add user profile if available
-        if self.user_profile:
-            prompt_parts.append(f"## 用户信息\n{self.user_profile}\n")
+        ten_env.log_info(
+            "LLMCorrector initialized with backends: "
+            + ", ".join(b.name for b in pool.backends)
+        )
 
-        # Add vocabulary hints if available
-        if self.vocabulary:
-            vocab_str = "、".join(self.vocabulary[:20])  # Limit to 20 words
-            prompt_parts.append(f"## 用户常用词汇\n{vocab_str}\n")
+    def update_user_profile(
+        self, user_profile: dict, session_id: str = DEFAULT_SESSION
+    ) -> None:
+        """
+        Update user profile for personalized correction.
 
-        # Add recent context
-        if context:
-            context_str = "\n".join([
-                f"- 原文: {c['original']} -> 纠正: {c['corrected']}"
-                for c in context[-3:]  # Last 3 exchanges
-            ])
-            prompt_parts.append(f"## 最近对话\n{context_str}\n")
+        A "vocabulary" list in the profile extends the configured one for
+        this session.
+        """
+        vocabulary = None
+        if isinstance(user_profile, dict) and isinstance(user_profile.get("vocabulary"), list):
+            vocabulary = [
+                w for w in user_profile["vocabulary"] if isinstance(w, str)
+            ] + self.vocabulary
+        profile = format_profile(user_profile)
+        self.prompts.update_session(session_id, profile=profile, vocabulary=vocabulary)
 
-        # Add the ASR text to correct
-        prompt_parts.append(f"## 语音识别结果\n{asr_text}\n")
-        prompt_parts.append("## 纠正后的文本")
+        user_id = user_profile.get("id") if isinstance(user_profile, dict) else None
+        if user_id is not None and str(user_id) in self.local_users:
+            self.local_sessions.add(session_id)
+        else:
+            self.local_sessions.discard(session_id)
 
-        return "\n".join(prompt_parts)
+        self.ten_env.log_info(
+            f"User profile updated for '{session_id}': {profile[:100] if profile else 'empty'}..."
+        )
 
     async def correct(
-        self, asr_text: str, context: Optional[List[dict]] = None
+        self,
+        asr_text: str,
+        context: Optional[List[dict]] = None,
+        phrase_bank: Optional[PhraseBank] = None,
+        session_id: str = DEFAULT_SESSION,
+        confidence: Optional[float] = None,
     ) -> str:
         """
         Correct ASR text using LLM.
@@ -97,60 +242,337 @@ class LLMCorrector:
         Args:
             asr_text: The ASR recognition result to correct
             context: Recent conversation context for better correction
+            phrase_bank: Known phrases of the user; a confident match is
+                returned without calling the LLM
+            session_id: Client whose profile and vocabulary to use
+            confidence: ASR confidence, if the recognizer reports one
 
         Returns:
             Corrected text
         """
         if not asr_text.strip():
             return asr_text
+        if self.guard is not None and self.guard.should_skip(
+            asr_text, confidence, phrase_bank
+        ):
+            return asr_text
+
+        phrase, hints = self._match_phrases(asr_text, phrase_bank)
+        if phrase is not None:
+            return phrase
+
+        cache_key = self._cache_key(asr_text, context, phrase_bank, session_id)
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                self.ten_env.log_debug(f"Correction cache hit: '{asr_text}' -> '{cached}'")
+                return cached
 
         try:
-            # Build the user prompt
-            user_prompt = self._build_prompt(asr_text, context or [])
+            prompt = self.prompts.build(asr_text, context, hints, session_id)
+            self.ten_env.log_debug(
+                f"Correction prompt ({prompt.tokens} tokens): {prompt.user[:200]}..."
+            )
+
+            corrected = await self._route(prompt, asr_text, session_id)
+
+            self.ten_env.log_debug(f"LLM correction: '{asr_text}' -> '{corrected}'")
 
-            self.ten_env.log_debug(f"Correction prompt: {user_prompt[:200]}...")
+            if not corrected:
+                return asr_text
+            if self.guard is not None and not self.guard.accept(asr_text, corrected):
+                self.ten_env.log_info(
+                    f"Correction rejected as a rewrite: '{asr_text}' -> '{corrected}'"
+                )
+                return asr_text
+            if cache_key is not None:
+                self.cache.put(cache_key, corrected)
+            return corrected
+
+        except Exception as e:
+            self.ten_env.log_error(f"LLM correction failed: {e}")
+            # Return original text on error
+            return asr_text
+
+    async def correct_stream(
+        self,
+        asr_text: str,
+        context: Optional[List[dict]] = None,
+        phrase_bank: Optional[PhraseBank] = None,
+        session_id: str = DEFAULT_SESSION,
+        confidence: Optional[float] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Correct ASR text using a streamed LLM completion.
+
+        Yields clause-sized chunks as soon as they are complete, so TTS can
+        start speaking before the completion has finished. The chunks
+        concatenate to the corrected text. Never raises: if the LLM fails
+        before anything was produced, the original text is yielded.
+
+        Batched and local corrections come back whole and are yielded as
+        one chunk. A stream whose first chunk fails the guard is dropped
+        for the original text; later chunks have already been spoken, so
+        a full text failing it is only kept out of the cache.
+        """
+        if (
+            not asr_text.strip()
+            or self.batcher is not None
+            or self._prefers_local(asr_text, session_id)
+        ):
+            yield await self.correct(
+                asr_text, context, phrase_bank, session_id, confidence
+            )
+            return
+        if self.guard is not None and self.guard.should_skip(
+            asr_text, confidence, phrase_bank
+        ):
+            yield asr_text
+            return
 
-            # Call LLM for correction
-            response = await self.client.chat.completions.create(
-                model=self.model,
+        phrase, hints = self._match_phrases(asr_text, phrase_bank)
+        if phrase is not None:
+            yield phrase
+            return
+
+        cache_key = self._cache_key(asr_text, context, phrase_bank, session_id)
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                self.ten_env.log_debug(f"Correction cache hit: '{asr_text}' -> '{cached}'")
+                yield cached
+                return
+
+        chunker = ClauseChunker(self.stream_min_chunk_chars)
+        emitted = []
+        stream = None
+        prompt = None
+        rejected = False
+        try:
+            prompt = self.prompts.build(asr_text, context, hints, session_id)
+            self.ten_env.log_debug(
+                f"Correction prompt ({prompt.tokens} tokens): {prompt.user[:200]}..."
+            )
+
+            stream, first, backend = await self.pool.stream(
                 messages=[
-                    {"role": "system", "content": self.system_prompt},
-                    {"role": "user", "content": user_prompt},
+                    {"role": "system", "content": prompt.system},
+                    {"role": "user", "content": prompt.user},
                 ],
                 max_tokens=self.max_tokens,
                 temperature=self.temperature,
-                stream=False,
             )
+            self.ten_env.log_debug(f"Streaming correction from {backend.name}")
+            events = _prepend(first, stream) if first is not None else stream
+            async for event in events:
+                if not event.choices:
+                    continue
+                for chunk in chunker.feed(event.choices[0].delta.content or ""):
+                    if not emitted and not self._accept_first_chunk(asr_text, chunk):
+                        rejected = True
+                        break
+                    emitted.append(chunk)
+                    yield chunk
+                if chunker.done or rejected:
+                    break
 
-            # Extract corrected text
-            corrected = response.choices[0].message.content.strip()
+            tail = None if rejected else chunker.finish()
+            if tail:
+                if emitted or self._accept_first_chunk(asr_text, tail):
+                    emitted.append(tail)
+                    yield tail
+                else:
+                    rejected = True
+            if emitted:
+                corrected = "".join(emitted)
+                accepted = self.guard is None or self.guard.accept(asr_text, corrected)
+                if accepted and cache_key is not None:
+                    self.cache.put(cache_key, corrected)
 
-            # Clean up the response (remove any explanations)
-            corrected = self._clean_response(corrected)
+        except Exception as e:
+            self.ten_env.log_error(f"LLM streaming correction failed: {e}")
+        finally:
+            if stream is not None:
+                try:
+                    await stream.close()
+                except Exception:
+                    pass
 
-            self.ten_env.log_debug(f"LLM correction: '{asr_text}' -> '{corrected}'")
+        if rejected:
+            self.ten_env.log_info(f"Streamed correction rejected as a rewrite: '{asr_text}'")
+        elif not emitted and prompt is not None and self._local_fallback_ready():
+            try:
+                corrected = await self._complete_local(prompt)
+            except Exception as e:
+                self.ten_env.log_error(f"Local correction failed: {e}")
+            else:
+                if corrected:
+                    emitted.append(corrected)
+                    yield corrected
 
-            return corrected if corrected else asr_text
+        if not emitted:
+            # Nothing usable came back; speak the original text
+            yield asr_text
 
+    def _accept_first_chunk(self, asr_text: str, chunk: str) -> bool:
+        return self.guard is None or self.guard.accept_prefix(asr_text, chunk)
+
+    def _prefers_local(self, asr_text: str, session_id: str) -> bool:
+        """Whether this utterance should skip the remote backends"""
+        if self.local_model is None or not self.local_model.ready:
+            return False
+        return (
+            session_id in self.local_sessions
+            or len(asr_text.strip()) <= self.local_max_chars
+        )
+
+    def _local_fallback_ready(self) -> bool:
+        return (
+            self.local_fallback
+            and self.local_model is not None
+            and self.local_model.ready
+        )
+
+    async def _route(self, prompt: Prompt, asr_text: str, session_id: str) -> str:
+        """
+        Correct on the local model or the remote backends.
+
+        A busy or failing local model hands the request to the remote
+        backends; a remote failure is retried locally when local_fallback
+        is set.
+        """
+        if self._prefers_local(asr_text, session_id):
+            try:
+                return await self._complete_local(prompt)
+            except LocalModelUnavailable:
+                pass
+            except Exception as e:
+                self.ten_env.log_warn(f"Local correction failed ({e}), using remote backends")
+        try:
+            # Batched with concurrent corrections if enabled
+            if self.batcher is not None:
+                return await self.batcher.submit(prompt)
+            return await self._complete(prompt)
         except Exception as e:
-            self.ten_env.log_error(f"LLM correction failed: {e}")
-            # Return original text on error
-            return asr_text
+            if not self._local_fallback_ready():
+                raise
+            self.ten_env.log_warn(f"Remote correction failed ({e}), using local model")
+            return await self._complete_local(prompt)
 
-    def _clean_response(self, response: str) -> str:
-        """Clean up LLM response to extract only the corrected text"""
-        # Remove common prefixes that LLMs might add
-        prefixes_to_remove = [
-            "纠正后的文本：",
-            "纠正后：",
-            "纠正结果：",
-            "纠正：",
-            "正确的文本：",
-            "应该是：",
+    async def _complete_local(self, prompt: Prompt) -> str:
+        content = await self.local_model.complete(prompt.system, prompt.user)
+        return self._clean_response(content.strip())
+
+    async def _complete(self, prompt: Prompt) -> str:
+        """One correction request; returns the cleaned corrected text"""
+        response, backend = await self.pool.complete(
+            messages=[
+                {"role": "system", "content": prompt.system},
+                {"role": "user", "content": prompt.user},
+            ],
+            max_tokens=self.max_tokens,
+            temperature=self.temperature,
+        )
+        self.ten_env.log_debug(f"Correction served by {backend.name}")
+
+        # Extract corrected text and clean up the response (remove any
+        # explanations)
+        return self._clean_response(response.choices[0].message.content.strip())
+
+    async def _complete_batch(self, items: List[BatchItem]) -> Dict[str, str]:
+        """
+        Several corrections in one JSON-output request.
+
+        Items may come from different sessions, so their profile and
+        vocabulary sections go with each item rather than into the shared
+        system prompt. Returns the corrections by item id; unparsable or
+        missing entries are left out, so the batcher re-sends them
+        individually.
+        """
+        user_prompt = "\n\n".join(
+            f"=== id={item.id} ===\n" + "\n".join(
+                part for part in (item.request.static, item.request.user) if part
+            )
+            for item in items
+        )
+        response, backend = await self.pool.complete(
+            messages=[
+                {"role": "system", "content": self.system_prompt + BATCH_INSTRUCTIONS},
+                {"role": "user", "content": user_prompt},
+            ],
+            max_tokens=self.max_tokens * len(items),
+            temperature=self.temperature,
+            response_format={"type": "json_object"},
+        )
+        content = response.choices[0].message.content or ""
+
+        try:
+            entries = json.loads(content[content.find("{"):content.rfind("}") + 1])
+            entries = entries.get("results", []) if isinstance(entries, dict) else []
+        except ValueError:
+            self.ten_env.log_warn(f"Unparsable batch response from {backend.name}")
+            return {}
+
+        ids = {item.id for item in items}
+        results = {}
+        for entry in entries:
+            if not isinstance(entry, dict):
+                continue
+            item_id, text = str(entry.get("id", "")), entry.get("text")
+            if item_id in ids and isinstance(text, str):
+                results[item_id] = self._clean_response(text)
+        self.ten_env.log_debug(
+            f"Batch of {len(items)} served by {backend.name}, {len(results)} parsed"
+        )
+        return results
+
+    def _match_phrases(
+        self, asr_text: str, phrase_bank: Optional[PhraseBank]
+    ) -> tuple[Optional[str], List[str]]:
+        """
+        Look the text up in the user's phrase bank.
+
+        Returns:
+            The phrase to use without calling the LLM (or None), and the
+            lower-confidence candidates to pass to the LLM as hints
+        """
+        if phrase_bank is None or not len(phrase_bank):
+            return None, []
+        matches = phrase_bank.lookup(asr_text, limit=self.phrase_max_hints)
+        if matches and matches[0].confidence >= self.phrase_match_threshold:
+            self.ten_env.log_debug(
+                f"Phrase bank hit: '{asr_text}' -> '{matches[0].phrase}' "
+                f"(confidence {matches[0].confidence:.2f})"
+            )
+            return matches[0].phrase, []
+        return None, [
+            m.phrase for m in matches if m.confidence >= self.phrase_hint_threshold
+        ]
+
+    def _cache_key(
+        self,
+        asr_text: str,
+        context: Optional[List[dict]],
+        phrase_bank: Optional[PhraseBank] = None,
+        session_id: str = DEFAULT_SESSION,
+    ) -> Optional[str]:
+        """Cache key of this request, or None when caching is disabled"""
+        if self.cache is None:
+            return None
+        last_turn = context[-1] if self.cache_include_context and context else None
+        # The phrase bank changes the hints in the prompt
+        vocabulary = [
+            list(self.prompts.vocabulary(session_id)),
+            phrase_bank.fingerprint if phrase_bank else "",
         ]
+        return make_cache_key(
+            asr_text, self.prompts.profile(session_id), vocabulary, last_turn
+        )
 
+    def _clean_response(self, response: str) -> str:
+        """Clean up LLM response to extract only the corrected text"""
         result = response.strip()
-        for prefix in prefixes_to_remove:
+        for prefix in RESPONSE_PREFIXES:
             if result.startswith(prefix):
                 result = result[len(prefix):].strip()
 
@@ -167,3 +589,10 @@ class LLMCorrector:
         result = lines[0].strip()
 
         return result
+
+
+async def _prepend(first, stream) -> AsyncIterator:
+    """Iterate a stream whose first event was already read"""
+    yield first
+    async for event in stream:
+        yield event
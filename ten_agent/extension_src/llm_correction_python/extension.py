@@ -4,8 +4,9 @@
 #
 import json
 import asyncio
-from collections import deque
-from typing import Optional
+import uuid
+from collections import OrderedDict, deque
+from typing import Awaitable, Dict, Optional
 
 from ten_runtime import (
     AsyncExtension,
@@ -16,8 +17,40 @@ from ten_runtime import (
     Data,
 )
 
+from voxflame_common.log import Log
+from voxflame_common.metrics import registry
+from voxflame_common.tracing import (
+    CORRECTION_DONE,
+    CORRECTION_START,
+    CORRECTOR_IN,
+    TraceContext,
+)
+
+from .backends import BackendPool
+from .budget import LatencyBudget
+from .cache import CorrectionCache
 from .config import LLMCorrectionConfig
 from .corrector import LLMCorrector
+from .guard import CorrectionGuard
+from .http_pool import HTTP2_AVAILABLE, HttpPool
+from .local_model import LLAMA_AVAILABLE, LocalModel
+from .phrase_bank import PINYIN_AVAILABLE, PhraseBank
+from .pipeline import CorrectionPipeline, Turn
+from .speculation import Speculator
+
+CORRECTION_SECONDS = registry.histogram(
+    "voxflame_correction_seconds",
+    "Final ASR result to correction ready (or budget exceeded)",
+)
+ERRORS = registry.counter(
+    "voxflame_errors_total", "Errors caught by the extensions",
+    extension="llm_correction",
+)
+
+# Per-client phrase banks kept at most (least recently updated dropped first)
+MAX_CLIENT_PHRASE_BANKS = 256
+# Clients whose conversation context is kept, least recently active first
+MAX_CLIENT_CONTEXTS = 1024
 
 
 class LLMCorrectionExtension(AsyncExtension):
@@ -35,13 +68,31 @@ class LLMCorrectionExtension(AsyncExtension):
         super().__init__(name)
         self.config: Optional[LLMCorrectionConfig] = None
         self.corrector: Optional[LLMCorrector] = None
+        self.cache: Optional[CorrectionCache] = None
+        # HTTP connections shared by every backend and client
+        self.http_pool: Optional[HttpPool] = None
+        self._warmup_task: Optional[asyncio.Task] = None
+        # On-box correction model, loaded in the background
+        self.local_model: Optional[LocalModel] = None
+        self._local_load_task: Optional[asyncio.Task] = None
+        # Phrase bank from the config, and per-client banks from update_profile
+        self.phrase_bank: Optional[PhraseBank] = None
+        self.client_phrase_banks: "OrderedDict[str, PhraseBank]" = OrderedDict()
+        # Corrections started on stable interim results
+        self.speculator: Optional[Speculator] = None
         self.ten_env: Optional[AsyncTenEnv] = None
+        self.log: Optional[Log] = None
+
+        # Recent corrections of each client, the context of its next prompt
+        self.context_histories: "OrderedDict[str, deque]" = OrderedDict()
 
-        # Context history for better correction
-        self.context_history: deque = deque(maxlen=5)
+        # Final results being corrected, ordered per client
+        self.pipeline: Optional[CorrectionPipeline] = None
 
-        # Pending correction task
-        self._correction_task: Optional[asyncio.Task] = None
+        # Corrections that missed their latency budget and finish as updates
+        self.budget = LatencyBudget(0)
+        # late correction task -> client_id
+        self._late_corrections: Dict[asyncio.Task, str] = {}
 
     async def on_init(self, ten_env: AsyncTenEnv) -> None:
         """Initialize the extension"""
@@ -53,11 +104,17 @@ class LLMCorrectionExtension(AsyncExtension):
             config_json, _ = await ten_env.get_property_to_json("")
             self.config = LLMCorrectionConfig.model_validate_json(config_json)
             self.config.validate_config()
+            self.log = Log(
+                ten_env,
+                level=self.config.log_level,
+                frame_summaries=self.config.log_frame_summaries,
+                summary_interval_s=self.config.log_summary_interval_s,
+            )
 
             ten_env.log_info(f"Loaded config: {self.config.to_str()}")
 
-            # Update context history max length
-            self.context_history = deque(maxlen=self.config.max_context_length)
+            self.budget = LatencyBudget(self.config.latency_budget_ms)
+            self.pipeline = CorrectionPipeline(self.config.max_in_flight)
 
         except Exception as e:
             ten_env.log_error(f"Failed to load configuration: {e}")
@@ -68,6 +125,57 @@ class LLMCorrectionExtension(AsyncExtension):
         ten_env.log_info("LLM Correction Extension starting...")
 
         try:
+            if self.config.cache_enabled:
+                self.cache = CorrectionCache(
+                    max_entries=self.config.cache_max_entries,
+                    ttl_s=self.config.cache_ttl_s,
+                )
+
+            if self.config.phrase_bank_enabled:
+                self.phrase_bank = PhraseBank(
+                    self.config.phrases + self.config.vocabulary,
+                    max_distance=self.config.phrase_max_distance,
+                )
+                ten_env.log_info(
+                    f"Phrase bank: {len(self.phrase_bank)} phrases, "
+                    f"pinyin={'on' if PINYIN_AVAILABLE else 'off'}"
+                )
+
+            if self.config.speculative:
+                self.speculator = Speculator(
+                    stable_s=self.config.speculative_stable_ms / 1000
+                )
+
+            self.http_pool = HttpPool.from_config(
+                self.config,
+                on_near_limit=lambda stats: ten_env.log_warn(
+                    f"HTTP pool near its limit: {stats.in_flight}/"
+                    f"{stats.max_connections} connections in use"
+                ),
+            )
+            if self.config.http2 and not HTTP2_AVAILABLE:
+                ten_env.log_warn("http2 requested but h2 is not installed, using HTTP/1.1")
+
+            if self.config.local_model_path:
+                if LLAMA_AVAILABLE:
+                    self.local_model = LocalModel(
+                        self.config.local_model_path,
+                        n_ctx=self.config.local_model_context,
+                        n_threads=self.config.local_model_threads,
+                        max_queue=self.config.local_max_queue,
+                        max_batch=self.config.local_max_batch,
+                        max_tokens=self.config.max_tokens,
+                        temperature=self.config.temperature,
+                    )
+                    # Corrections stay remote until the model is loaded
+                    self._local_load_task = asyncio.create_task(
+                        self._load_local_model(ten_env)
+                    )
+                else:
+                    ten_env.log_warn(
+                        "local_model_path is set but llama-cpp-python is not installed"
+                    )
+
             # Initialize the corrector
             self.corrector = LLMCorrector(
                 api_key=self.config.api_key,
@@ -79,29 +187,164 @@ class LLMCorrectionExtension(AsyncExtension):
                 user_profile=self.config.user_profile,
                 vocabulary=self.config.vocabulary,
                 ten_env=ten_env,
+                stream_min_chunk_chars=self.config.stream_min_chunk_chars,
+                cache=self.cache,
+                cache_include_context=self.config.cache_include_context,
+                phrase_match_threshold=self.config.phrase_match_threshold,
+                phrase_hint_threshold=self.config.phrase_hint_threshold,
+                phrase_max_hints=self.config.phrase_max_hints,
+                pool=BackendPool.from_config(
+                    self.config, self.config.api_key, self.http_pool.client
+                ),
+                batch_window_ms=self.config.batch_window_ms,
+                batch_max_size=self.config.batch_max_size,
+                max_prompt_tokens=self.config.max_prompt_tokens,
+                local_model=self.local_model,
+                local_max_chars=self.config.local_max_chars,
+                local_users=self.config.local_users,
+                local_fallback=self.config.local_fallback,
+                guard=CorrectionGuard(
+                    skip_confidence=self.config.guard_skip_confidence,
+                    max_char_distance=self.config.guard_max_char_distance,
+                    max_pinyin_distance=self.config.guard_max_pinyin_distance,
+                )
+                if self.config.guard_enabled
+                else None,
             )
             ten_env.log_info("LLM Corrector initialized successfully")
 
+            if self.config.http_warmup_connections > 0:
+                # In the background: the first utterance may be a while away
+                self._warmup_task = asyncio.create_task(self._warm_up(ten_env))
+
+            self._register_metrics()
+
         except Exception as e:
             ten_env.log_error(f"Failed to initialize corrector: {e}")
             raise
 
+    def _register_metrics(self) -> None:
+        """Expose the existing stats counters through the shared registry"""
+        if self.cache:
+            cache = self.cache.stats
+            registry.counter_func(
+                "voxflame_correction_cache_lookups_total", "Correction cache lookups",
+                lambda: cache.hits, result="hit",
+            )
+            registry.counter_func(
+                "voxflame_correction_cache_lookups_total", "Correction cache lookups",
+                lambda: cache.misses, result="miss",
+            )
+            registry.gauge_func(
+                "voxflame_correction_cache_entries", "Cached corrections",
+                lambda: cache.size,
+            )
+
+        guard = self.corrector.guard
+        if guard:
+            for outcome in guard.stats.to_dict():
+                registry.counter_func(
+                    "voxflame_correction_guard_total", "Correction guard decisions",
+                    lambda outcome=outcome: getattr(guard.stats, outcome),
+                    outcome=outcome,
+                )
+
+        budget = self.budget.stats
+        registry.counter_func(
+            "voxflame_correction_utterances_total", "Final ASR results corrected",
+            lambda: budget.utterances,
+        )
+        registry.counter_func(
+            "voxflame_correction_budget_exceeded_total",
+            "Utterances sent as ASR text because the latency budget ran out",
+            lambda: budget.exceeded,
+        )
+
+        pipeline = self.pipeline
+        registry.gauge_func(
+            "voxflame_correction_queue_depth", "Corrections submitted and not finished",
+            lambda: len(pipeline),
+        )
+        pool = self.http_pool.stats
+        registry.gauge_func(
+            "voxflame_llm_http_in_flight", "LLM HTTP requests in flight",
+            lambda: pool.in_flight,
+        )
+
     async def on_stop(self, ten_env: AsyncTenEnv) -> None:
         """Stop the extension"""
         ten_env.log_info("LLM Correction Extension stopping...")
+        if self.log:
+            self.log.flush()
+        if self.cache:
+            ten_env.log_info(f"Correction cache stats: {self.cache.stats.to_dict()}")
+        if self._warmup_task:
+            self._warmup_task.cancel()
+        if self.http_pool:
+            ten_env.log_info(f"HTTP pool stats: {self.http_pool.stats.to_dict()}")
+        if self._local_load_task:
+            self._local_load_task.cancel()
+        if self.local_model:
+            ten_env.log_info(f"Local model stats: {self.local_model.stats.to_dict()}")
+            self.local_model.close()
+        if self.corrector:
+            ten_env.log_info(f"LLM backend stats: {self.corrector.pool.stats()}")
+            if self.corrector.guard:
+                ten_env.log_info(
+                    f"Correction guard stats: {self.corrector.guard.stats.to_dict()}"
+                )
+            if self.corrector.batcher:
+                ten_env.log_info(
+                    f"Correction batch stats: {self.corrector.batcher.stats.to_dict()}"
+                )
+        ten_env.log_info(f"Latency budget stats: {self.budget.stats.to_dict()}")
+        for task in list(self._late_corrections):
+            task.cancel()
+        if self.speculator:
+            ten_env.log_info(
+                f"Speculative correction stats: {self.speculator.stats.to_dict()}"
+            )
+            self.speculator.cancel()
 
-        # Cancel any pending correction task
-        if self._correction_task and not self._correction_task.done():
-            self._correction_task.cancel()
-            try:
-                await self._correction_task
-            except asyncio.CancelledError:
-                pass
+        # Cancel any pending corrections
+        if self.pipeline:
+            ten_env.log_info(f"Correction pipeline stats: {self.pipeline.stats.to_dict()}")
+            self.pipeline.cancel()
 
     async def on_deinit(self, ten_env: AsyncTenEnv) -> None:
         """Deinitialize the extension"""
         ten_env.log_info("LLM Correction Extension deinitializing...")
         self.corrector = None
+        if self.http_pool:
+            await self.http_pool.aclose()
+            self.http_pool = None
+
+    async def _load_local_model(self, ten_env: AsyncTenEnv) -> None:
+        try:
+            await self.local_model.load()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            ten_env.log_error(f"Failed to load local model: {e}")
+            return
+        ten_env.log_info(
+            f"Local model loaded in {self.local_model.stats.load_ms:.0f}ms: "
+            f"{self.config.local_model_path}"
+        )
+
+    async def _warm_up(self, ten_env: AsyncTenEnv) -> None:
+        """Open the first connections to every backend before any utterance"""
+        clients = [backend.client for backend in self.corrector.pool.backends]
+        started = asyncio.get_running_loop().time()
+        connected = await self.http_pool.warm_up(
+            clients, connections=self.config.http_warmup_connections
+        )
+        elapsed_ms = (asyncio.get_running_loop().time() - started) * 1000
+        ten_env.log_info(
+            f"HTTP pool warmed up: {connected}/"
+            f"{len(clients) * self.config.http_warmup_connections} "
+            f"connections in {elapsed_ms:.0f}ms (http2={self.http_pool.http2})"
+        )
 
     async def on_cmd(self, ten_env: AsyncTenEnv, cmd: Cmd) -> None:
         """Handle commands"""
@@ -109,12 +352,23 @@ class LLMCorrectionExtension(AsyncExtension):
         ten_env.log_debug(f"Received command: {cmd_name}")
 
         if cmd_name == "flush":
-            # Cancel any pending correction
-            if self._correction_task and not self._correction_task.done():
-                self._correction_task.cancel()
-            # Clear context
-            self.context_history.clear()
-            ten_env.log_info("Flushed correction context")
+            # Cancel pending corrections of one client, or of all clients
+            client_id, _ = cmd.get_property_string("client_id")
+            client_id = client_id or None
+            cancelled = self.pipeline.cancel(client_id) if self.pipeline else 0
+            if self.speculator:
+                self.speculator.cancel(client_id)
+            for task, owner in list(self._late_corrections.items()):
+                if client_id is None or owner == client_id:
+                    task.cancel()
+            if client_id is None:
+                self.context_histories.clear()
+            else:
+                self.context_histories.pop(client_id, None)
+            ten_env.log_info(
+                f"Flushed corrections of {client_id or 'all clients'} "
+                f"({cancelled} cancelled)"
+            )
 
         elif cmd_name == "update_profile":
             # Update user profile in corrector
@@ -123,12 +377,25 @@ class LLMCorrectionExtension(AsyncExtension):
                 profile_data = json.loads(cmd_json) if cmd_json else {}
                 user_profile = profile_data.get("user_profile")
 
+                client_id = profile_data.get("client_id") or ""
+
                 if user_profile and self.corrector:
-                    self.corrector.update_user_profile(user_profile)
+                    self.corrector.update_user_profile(user_profile, client_id)
                     ten_env.log_info(f"Updated user profile: {user_profile.get('email', 'unknown')}")
+
+                if isinstance(user_profile, dict):
+                    self._update_phrase_bank(ten_env, client_id, user_profile)
             except Exception as e:
                 ten_env.log_error(f"Error updating profile: {e}")
 
+        elif cmd_name == "cache_stats":
+            # Hit/miss/eviction counters of the correction cache
+            cmd_result = CmdResult.create(StatusCode.OK, cmd)
+            stats = self.cache.stats.to_dict() if self.cache else {}
+            cmd_result.set_property_from_json(None, json.dumps(stats))
+            await ten_env.return_result(cmd_result)
+            return
+
         # Return success
         cmd_result = CmdResult.create(StatusCode.OK, cmd)
         await ten_env.return_result(cmd_result)
@@ -147,7 +414,7 @@ class LLMCorrectionExtension(AsyncExtension):
         }
         """
         data_name = data.get_name()
-        ten_env.log_debug(f"Received data: {data_name}")
+        self.log.debug("Received data: %s", data_name)
 
         if data_name == "asr_result":
             try:
@@ -157,94 +424,477 @@ class LLMCorrectionExtension(AsyncExtension):
 
                 text = asr_data.get("text", "")
                 is_final = asr_data.get("is_final", False)
+                client_id = self._get_client_id(asr_data)
 
-                ten_env.log_info(f"ASR result: '{text}', final={is_final}")
+                self.log.frame("asr_result", "ASR result: '%s', final=%s", text, is_final)
 
                 if not text.strip():
-                    ten_env.log_debug("Empty ASR text, skipping correction")
+                    self.log.debug("Empty ASR text, skipping correction")
                     return
 
-                # Only correct final results to avoid excessive API calls
+                # Only correct final results to avoid excessive API calls.
+                # Corrections run concurrently; output keeps the order of
+                # each client's utterances.
                 if is_final:
-                    await self._process_final_asr(ten_env, text, asr_data)
+                    trace = TraceContext.find(asr_data)
+                    if trace is not None:
+                        trace.mark(CORRECTOR_IN)
+                    # The budget counts time queued behind other corrections
+                    started = self.budget.now()
+                    self.pipeline.submit(
+                        client_id,
+                        lambda turn: self._process_final_asr(
+                            ten_env, text, asr_data, turn, started, trace
+                        ),
+                    )
                 else:
-                    # For interim results, just forward to frontend for display
-                    await self._send_interim_text(ten_env, text)
+                    # For interim results, forward to frontend for display
+                    # (unless the sender already did, as main_control does)
+                    # and correct them early once they stop changing
+                    if asr_data.get("display", True):
+                        await self._send_interim_text(ten_env, text, client_id)
+                    if self.speculator:
+                        self._speculate(text, client_id)
 
             except Exception as e:
+                ERRORS.inc()
                 ten_env.log_error(f"Error processing ASR result: {e}")
 
     async def _process_final_asr(
-        self, ten_env: AsyncTenEnv, text: str, asr_data: dict
+        self,
+        ten_env: AsyncTenEnv,
+        text: str,
+        asr_data: dict,
+        turn: Turn,
+        started: float,
+        trace: Optional[TraceContext] = None,
     ) -> None:
-        """Process final ASR result with LLM correction"""
-        try:
-            # Get context for better correction
-            context = list(self.context_history)
+        """
+        Process final ASR result with LLM correction
 
-            # Perform correction
-            corrected_text = await self.corrector.correct(text, context)
+        If the correction (or, when streaming, its first chunk) is not
+        ready within latency_budget_ms, the ASR text is sent instead and
+        the correction follows as an update. The budget runs from
+        ``started``, when the final result arrived, so time spent queued
+        in the pipeline counts. Nothing is sent before turn() returns,
+        i.e. before the client's previous utterance is done.
+
+        The utterance's trace, if any, is marked when the job starts and
+        when the text to speak is ready, and goes out on corrected_text.
+        """
+        if trace is not None:
+            trace.mark(CORRECTION_START)
+        client_id = self._get_client_id(asr_data)
+        confidence = self._get_confidence(asr_data)
+        utterance_id = uuid.uuid4().hex
+        self.budget.stats.utterances += 1
+
+        if self.speculator:
+            speculation = asyncio.ensure_future(self.speculator.take(client_id, text))
+            if not await self.budget.wait(speculation, started):
+                await self._exceed_budget(
+                    ten_env, text, client_id, utterance_id, started, speculation, turn,
+                    trace,
+                )
+                return
+            speculated = speculation.result()
+            if speculated is not None:
+                # The whole correction is already there, so it goes out as
+                # one message even when streaming: there is nothing left to
+                # stream, and one TTS request keeps the sentence's prosody
+                self._correction_done(started, trace)
+                await turn()
+                ten_env.log_info(f"Correction (speculative): '{text}' -> '{speculated}'")
+                self._context(client_id).append(
+                    {"original": text, "corrected": speculated}
+                )
+                await self._send_to_tts(ten_env, speculated, client_id)
+                await self._send_corrected_text(
+                    ten_env, text, speculated, client_id, trace=trace
+                )
+                return
+
+        if self.config.streaming:
+            await self._process_final_asr_streaming(
+                ten_env, text, client_id, utterance_id, started, turn, confidence, trace
+            )
+            return
+
+        # Get context for better correction
+        context = list(self._context(client_id))
+        correction = asyncio.ensure_future(
+            self.corrector.correct(
+                text, context, self._get_phrase_bank(client_id), client_id, confidence
+            )
+        )
+        if not await self.budget.wait(correction, started):
+            await self._exceed_budget(
+                ten_env, text, client_id, utterance_id, started, correction, turn,
+                trace,
+            )
+            return
+
+        self._correction_done(started, trace)
+        await turn()
+        try:
+            corrected_text = correction.result()
 
             ten_env.log_info(f"Correction: '{text}' -> '{corrected_text}'")
 
             # Add to context history
-            self.context_history.append({
+            self._context(client_id).append({
                 "original": text,
                 "corrected": corrected_text
             })
 
             # Send corrected text to TTS (text_data format)
-            await self._send_to_tts(ten_env, corrected_text)
+            await self._send_to_tts(ten_env, corrected_text, client_id)
 
             # Send corrected text to frontend (for display)
-            await self._send_corrected_text(ten_env, text, corrected_text)
+            await self._send_corrected_text(
+                ten_env, text, corrected_text, client_id, trace=trace
+            )
 
         except Exception as e:
+            ERRORS.inc()
             ten_env.log_error(f"Error in correction: {e}")
             # On error, forward original text
-            await self._send_to_tts(ten_env, text)
-            await self._send_corrected_text(ten_env, text, text)
+            await self._send_to_tts(ten_env, text, client_id)
+            await self._send_corrected_text(ten_env, text, text, client_id, trace=trace)
+
+    async def _process_final_asr_streaming(
+        self,
+        ten_env: AsyncTenEnv,
+        text: str,
+        client_id: str,
+        utterance_id: str,
+        started: float,
+        turn: Turn,
+        confidence: Optional[float] = None,
+        trace: Optional[TraceContext] = None,
+    ) -> None:
+        """
+        Stream the correction clause by clause.
 
-    async def _send_to_tts(self, ten_env: AsyncTenEnv, text: str) -> None:
+        Every chunk goes to TTS and, as a partial corrected_text, to the
+        frontend as soon as it is complete. A final corrected_text with the
+        full text (streamed=True) and an empty end_of_segment text_data
+        close the utterance.
+        """
+        context = list(self._context(client_id))
+        phrase_bank = self._get_phrase_bank(client_id)
+        chunks = self.corrector.correct_stream(
+            text, context, phrase_bank, client_id, confidence
+        )
+
+        # correct_stream always yields at least once
+        first = asyncio.ensure_future(chunks.__anext__())
+        if not await self.budget.wait(first, started):
+            await self._exceed_budget(
+                ten_env,
+                text,
+                client_id,
+                utterance_id,
+                started,
+                self._join_stream(first, chunks),
+                turn,
+                trace,
+            )
+            return
+
+        self._correction_done(started, trace)
+        await turn()
+        corrected_text = ""
+        segment_index = 0
+        chunk = first.result()
+        while True:
+            corrected_text += chunk
+            await self._send_to_tts(ten_env, chunk, client_id, end_of_segment=False)
+            await self._send_corrected_text(
+                ten_env,
+                text,
+                corrected_text,
+                client_id,
+                is_final=False,
+                chunk=chunk,
+                utterance_id=utterance_id,
+                segment_index=segment_index,
+                trace=trace,
+            )
+            segment_index += 1
+            try:
+                chunk = await chunks.__anext__()
+            except StopAsyncIteration:
+                break
+
+        ten_env.log_info(
+            f"Correction: '{text}' -> '{corrected_text}' ({segment_index} chunks)"
+        )
+        self._context(client_id).append({"original": text, "corrected": corrected_text})
+
+        await self._send_to_tts(ten_env, "", client_id, end_of_segment=True)
+        await self._send_corrected_text(
+            ten_env,
+            text,
+            corrected_text,
+            client_id,
+            utterance_id=utterance_id,
+            segment_index=segment_index,
+            streamed=True,
+        )
+
+    def _correction_done(self, started: float, trace: Optional[TraceContext]) -> None:
+        CORRECTION_SECONDS.observe(self.budget.now() - started)
+        if trace is not None:
+            trace.mark(CORRECTION_DONE)
+
+    @staticmethod
+    async def _join_stream(first: asyncio.Future, chunks) -> str:
+        """Full text of a correction stream whose first chunk is pending"""
+        parts = [await first]
+        async for chunk in chunks:
+            parts.append(chunk)
+        return "".join(parts)
+
+    async def _exceed_budget(
+        self,
+        ten_env: AsyncTenEnv,
+        text: str,
+        client_id: str,
+        utterance_id: str,
+        started: float,
+        late: Awaitable[Optional[str]],
+        turn: Turn,
+        trace: Optional[TraceContext] = None,
+    ) -> None:
+        """Send the ASR text now and the correction once it arrives"""
+        self._correction_done(started, trace)
+        self.budget.stats.exceeded += 1
+        ten_env.log_warn(
+            f"Correction budget of {self.config.latency_budget_ms}ms exceeded "
+            f"for utterance {utterance_id}, sending ASR text: '{text}'"
+        )
+
+        await turn()
+        # Updated in place if the late correction differs
+        context_turn = {"original": text, "corrected": text}
+        self._context(client_id).append(context_turn)
+
+        await self._send_to_tts(ten_env, text, client_id)
+        await self._send_corrected_text(
+            ten_env, text, text, client_id,
+            utterance_id=utterance_id, budget_exceeded=True, trace=trace,
+        )
+
+        task = asyncio.ensure_future(
+            self._finish_late_correction(
+                ten_env, text, client_id, utterance_id, started, late, context_turn
+            )
+        )
+        self._late_corrections[task] = client_id
+        task.add_done_callback(lambda t: self._late_corrections.pop(t, None))
+
+    async def _finish_late_correction(
+        self,
+        ten_env: AsyncTenEnv,
+        text: str,
+        client_id: str,
+        utterance_id: str,
+        started: float,
+        late: Awaitable[Optional[str]],
+        context_turn: dict,
+    ) -> None:
+        try:
+            corrected = await late
+        except Exception as e:
+            ERRORS.inc()
+            ten_env.log_error(f"Late correction of utterance {utterance_id} failed: {e}")
+            corrected = None
+
+        changed = None if corrected is None else corrected != text
+        late_ms = self.budget.record_late(started, changed)
+        ten_env.log_info(
+            f"Late correction of utterance {utterance_id} after {late_ms}ms: "
+            f"'{text}' -> '{corrected}'"
+        )
+        if not changed:
+            return
+
+        context_turn["corrected"] = corrected
+        await self._send_corrected_text(
+            ten_env, text, corrected, client_id,
+            utterance_id=utterance_id, is_update=True,
+        )
+
+    def _context(self, client_id: str) -> deque:
+        """Context history of one client; prompts never see other clients'"""
+        history = self.context_histories.get(client_id)
+        if history is None:
+            history = deque(maxlen=self.config.max_context_length)
+            self.context_histories[client_id] = history
+            while len(self.context_histories) > MAX_CLIENT_CONTEXTS:
+                self.context_histories.popitem(last=False)
+        else:
+            self.context_histories.move_to_end(client_id)
+        return history
+
+    def _speculate(self, text: str, client_id: str) -> None:
+        """Queue a speculative correction of an interim hypothesis"""
+        phrase_bank = self._get_phrase_bank(client_id)
+
+        def correct():
+            # Context is read once the hypothesis is stable
+            return self.corrector.correct(
+                text, list(self._context(client_id)), phrase_bank, client_id
+            )
+
+        self.speculator.update(client_id, text, correct)
+
+    def _update_phrase_bank(
+        self, ten_env: AsyncTenEnv, client_id: str, user_profile: dict
+    ) -> None:
+        """Build the phrase bank of a client from its profile phrases"""
+        if not self.config.phrase_bank_enabled:
+            return
+        phrases = [
+            p
+            for key in ("phrases", "vocabulary")
+            for p in (user_profile.get(key) or [])
+            if isinstance(p, str)
+        ]
+        if not phrases:
+            return
+
+        bank = PhraseBank(
+            phrases + self.config.phrases + self.config.vocabulary,
+            max_distance=self.config.phrase_max_distance,
+        )
+        self.client_phrase_banks[client_id] = bank
+        self.client_phrase_banks.move_to_end(client_id)
+        while len(self.client_phrase_banks) > MAX_CLIENT_PHRASE_BANKS:
+            self.client_phrase_banks.popitem(last=False)
+        ten_env.log_info(
+            f"Phrase bank for client '{client_id}': {len(bank)} phrases"
+        )
+
+    def _get_phrase_bank(self, client_id: str) -> Optional[PhraseBank]:
+        return self.client_phrase_banks.get(client_id, self.phrase_bank)
+
+    @staticmethod
+    def _get_client_id(asr_data: dict) -> str:
+        """Extract the originating WebSocket client_id from an asr_result"""
+        client_id = asr_data.get("client_id")
+        if not client_id:
+            metadata = asr_data.get("metadata")
+            if isinstance(metadata, dict):
+                client_id = metadata.get("client_id")
+        return client_id or ""
+
+    @staticmethod
+    def _get_confidence(asr_data: dict) -> Optional[float]:
+        """ASR confidence of an asr_result (0-1), if the recognizer sent one"""
+        confidence = asr_data.get("confidence")
+        if confidence is None:
+            metadata = asr_data.get("metadata")
+            if isinstance(metadata, dict):
+                confidence = metadata.get("confidence")
+        try:
+            return float(confidence) if confidence is not None else None
+        except (TypeError, ValueError):
+            return None
+
+    async def _send_to_tts(
+        self,
+        ten_env: AsyncTenEnv,
+        text: str,
+        client_id: str = "",
+        end_of_segment: bool = True,
+    ) -> None:
         """Send corrected text to TTS extension"""
         try:
             # Create text_data for TTS
             text_data = Data.create("text_data")
             text_data.set_property_string("text", text)
-            text_data.set_property_bool("end_of_segment", True)
+            text_data.set_property_bool("end_of_segment", end_of_segment)
+            if client_id:
+                text_data.set_property_string("client_id", client_id)
 
             await ten_env.send_data(text_data)
-            ten_env.log_debug(f"Sent to TTS: '{text}'")
+            self.log.debug("Sent to TTS: '%s'", text)
 
         except Exception as e:
+            ERRORS.inc()
             ten_env.log_error(f"Error sending to TTS: {e}")
 
     async def _send_corrected_text(
-        self, ten_env: AsyncTenEnv, original: str, corrected: str
+        self,
+        ten_env: AsyncTenEnv,
+        original: str,
+        corrected: str,
+        client_id: str = "",
+        is_final: bool = True,
+        chunk: str = "",
+        utterance_id: str = "",
+        segment_index: int = 0,
+        streamed: bool = False,
+        budget_exceeded: bool = False,
+        is_update: bool = False,
+        trace: Optional[TraceContext] = None,
     ) -> None:
-        """Send corrected text to frontend via WebSocket"""
+        """
+        Send corrected text to frontend via WebSocket
+
+        Streaming sends partials (is_final=False) whose ``chunk`` is the new
+        clause and ``corrected_text`` the text so far; ``streamed`` on the
+        final message tells main_control the chunks already went to TTS.
+        ``budget_exceeded`` marks the ASR text sent when the latency budget
+        ran out; the correction then follows with ``is_update`` (display
+        only, the ASR text was already spoken). ``trace`` is passed on to
+        main_control with the text it speaks.
+        """
         try:
             # Create corrected_text data for frontend
             corrected_data = Data.create("corrected_text")
             corrected_data.set_property_string("original_text", original)
             corrected_data.set_property_string("corrected_text", corrected)
             corrected_data.set_property_bool("is_corrected", original != corrected)
+            corrected_data.set_property_bool("is_final", is_final)
+            if utterance_id:
+                corrected_data.set_property_string("utterance_id", utterance_id)
+                corrected_data.set_property_int("segment_index", segment_index)
+                corrected_data.set_property_bool("streamed", streamed)
+                corrected_data.set_property_bool("budget_exceeded", budget_exceeded)
+                corrected_data.set_property_bool("is_update", is_update)
+            if chunk:
+                corrected_data.set_property_string("chunk", chunk)
+            if client_id:
+                corrected_data.set_property_string("client_id", client_id)
+            if trace is not None:
+                corrected_data.set_property_from_json(
+                    "trace", json.dumps(trace.to_dict())
+                )
 
             await ten_env.send_data(corrected_data)
-            ten_env.log_debug(f"Sent corrected text to frontend")
+            self.log.debug("Sent corrected text to frontend")
 
         except Exception as e:
+            ERRORS.inc()
             ten_env.log_error(f"Error sending corrected text: {e}")
 
-    async def _send_interim_text(self, ten_env: AsyncTenEnv, text: str) -> None:
+    async def _send_interim_text(
+        self, ten_env: AsyncTenEnv, text: str, client_id: str = ""
+    ) -> None:
         """Send interim (non-final) ASR text to frontend"""
         try:
             interim_data = Data.create("interim_text")
             interim_data.set_property_string("text", text)
             interim_data.set_property_bool("is_interim", True)
+            if client_id:
+                interim_data.set_property_string("client_id", client_id)
 
             await ten_env.send_data(interim_data)
-            ten_env.log_debug(f"Sent interim text: '{text}'")
+            self.log.debug("Sent interim text: '%s'", text)
 
         except Exception as e:
+            ERRORS.inc()
             ten_env.log_error(f"Error sending interim text: {e}")
@@ -0,0 +1,108 @@
+#
+# VoxFlame LLM Correction Extension
+# Copyright (c) 2025 VoxFlame. All rights reserved.
+#
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+from .phrase_bank import PhraseBank, _edit_distance, normalize, phonetic_key
+
+
+@dataclass
+class GuardStats:
+    skipped_confidence: int = 0  # ASR confident enough, LLM not called
+    skipped_exact: int = 0  # Text is a known phrase, LLM not called
+    accepted: int = 0
+    unchanged: int = 0  # LLM returned the ASR text
+    rejected: int = 0  # Too far from the ASR text in characters and pinyin
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+@dataclass
+class GuardScore:
+    char_distance: float  # Edit distance / length, 0 = identical
+    pinyin_distance: float
+    accepted: bool
+
+
+def _ratio(a, b) -> float:
+    length = max(len(a), len(b))
+    return _edit_distance(a, b) / length if length else 0.0
+
+
+class CorrectionGuard:
+    """
+    Decides when to call the LLM and whether to trust its answer.
+
+    Before the call, utterances the ASR is confident about
+    (confidence >= skip_confidence) or that are exactly a known phrase are
+    used as they are. After it, a correction is accepted if it stays
+    within max_char_distance of the ASR text in characters or within
+    max_pinyin_distance in sound-alike pinyin (the usual case for
+    misheard words); anything further is a rewrite and is rejected in
+    favour of the ASR text.
+    """
+
+    def __init__(
+        self,
+        skip_confidence: float = 0.95,
+        max_char_distance: float = 0.5,
+        max_pinyin_distance: float = 0.4,
+    ):
+        self.skip_confidence = skip_confidence
+        self.max_char_distance = max_char_distance
+        self.max_pinyin_distance = max_pinyin_distance
+        self.stats = GuardStats()
+
+    def should_skip(
+        self,
+        asr_text: str,
+        confidence: Optional[float] = None,
+        phrase_bank: Optional[PhraseBank] = None,
+    ) -> bool:
+        """Whether the ASR text can be used without asking the LLM"""
+        if confidence is not None and confidence >= self.skip_confidence:
+            self.stats.skipped_confidence += 1
+            return True
+        if phrase_bank is not None and asr_text in phrase_bank:
+            self.stats.skipped_exact += 1
+            return True
+        return False
+
+    def score(self, asr_text: str, corrected: str) -> GuardScore:
+        """Distances of a correction from the ASR text, without counting it"""
+        char_distance = _ratio(normalize(asr_text), normalize(corrected))
+        pinyin_distance = _ratio(phonetic_key(asr_text), phonetic_key(corrected))
+        return GuardScore(
+            char_distance=char_distance,
+            pinyin_distance=pinyin_distance,
+            accepted=(
+                char_distance <= self.max_char_distance
+                or pinyin_distance <= self.max_pinyin_distance
+            ),
+        )
+
+    def accept_prefix(self, asr_text: str, prefix: str) -> bool:
+        """
+        Check the start of a streamed correction against as much ASR text.
+
+        Only a rejection is counted; the full text goes through accept()
+        once the stream is done.
+        """
+        if self.score(asr_text[:len(prefix)], prefix).accepted:
+            return True
+        self.stats.rejected += 1
+        return False
+
+    def accept(self, asr_text: str, corrected: str) -> bool:
+        """Score a correction and count the outcome"""
+        if normalize(corrected) == normalize(asr_text):
+            self.stats.unchanged += 1
+            return True
+        if self.score(asr_text, corrected).accepted:
+            self.stats.accepted += 1
+            return True
+        self.stats.rejected += 1
+        return False
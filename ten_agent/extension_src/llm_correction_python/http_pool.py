@@ -0,0 +1,177 @@
+#
+# VoxFlame LLM Correction Extension
+# Copyright (c) 2025 VoxFlame. All rights reserved.
+#
+import asyncio
+import importlib.util
+from dataclasses import asdict, dataclass
+from typing import Callable, List, Optional
+
+import httpx
+
+
+# HTTP/2 needs the optional h2 package (pip install httpx[http2])
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Fraction of max_connections at which the pool counts as nearly full
+NEAR_LIMIT = 0.8
+
+
+@dataclass
+class PoolStats:
+    requests: int = 0
+    in_flight: int = 0
+    peak_in_flight: int = 0
+    near_limit_events: int = 0
+    max_connections: int = 0
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        data["utilization"] = (
+            round(self.in_flight / self.max_connections, 3) if self.max_connections else 0.0
+        )
+        data["peak_utilization"] = (
+            round(self.peak_in_flight / self.max_connections, 3)
+            if self.max_connections
+            else 0.0
+        )
+        return data
+
+
+class _TrackingTransport(httpx.AsyncBaseTransport):
+    """Counts requests holding a connection, until their body is closed"""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, stats: PoolStats, on_near_limit):
+        self._transport = transport
+        self._stats = stats
+        self._on_near_limit = on_near_limit
+        self._near = False
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        stats = self._stats
+        stats.requests += 1
+        stats.in_flight += 1
+        stats.peak_in_flight = max(stats.peak_in_flight, stats.in_flight)
+        self._check()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException:
+            self._release()
+            raise
+        response.stream = _ReleasingStream(response.stream, self._release)
+        return response
+
+    def _release(self) -> None:
+        self._stats.in_flight -= 1
+        self._check()
+
+    def _check(self) -> None:
+        limit = self._stats.max_connections
+        near = bool(limit) and self._stats.in_flight >= NEAR_LIMIT * limit
+        if near and not self._near:
+            self._stats.near_limit_events += 1
+            if self._on_near_limit is not None:
+                self._on_near_limit(self._stats)
+        self._near = near
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    def __init__(self, stream, release: Callable[[], None]):
+        self._stream = stream
+        self._release = release
+        self._released = False
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            if not self._released:
+                self._released = True
+                self._release()
+
+
+class HttpPool:
+    """
+    One httpx client shared by every backend and session.
+
+    Keeps connections alive between corrections so only the first request
+    pays for TCP/TLS setup, and that is paid in warm_up() at start. In-flight
+    requests are tracked against max_connections.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 32,
+        max_keepalive: int = 16,
+        keepalive_expiry_s: float = 60.0,
+        http2: bool = False,
+        connect_timeout_s: float = 3.0,
+        read_timeout_s: float = 30.0,
+        pool_timeout_s: float = 5.0,
+        on_near_limit: Optional[Callable[[PoolStats], None]] = None,
+    ):
+        self.http2 = http2 and HTTP2_AVAILABLE
+        self.stats = PoolStats(max_connections=max_connections)
+        transport = httpx.AsyncHTTPTransport(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive,
+                keepalive_expiry=keepalive_expiry_s,
+            ),
+            http2=self.http2,
+        )
+        self.client = httpx.AsyncClient(
+            transport=_TrackingTransport(transport, self.stats, on_near_limit),
+            timeout=httpx.Timeout(
+                read_timeout_s,
+                connect=connect_timeout_s,
+                pool=pool_timeout_s,
+            ),
+        )
+
+    @classmethod
+    def from_config(cls, config, on_near_limit=None) -> "HttpPool":
+        return cls(
+            max_connections=config.http_max_connections,
+            max_keepalive=config.http_max_keepalive,
+            keepalive_expiry_s=config.http_keepalive_expiry_s,
+            http2=config.http2,
+            connect_timeout_s=config.http_connect_timeout_s,
+            read_timeout_s=config.http_read_timeout_s,
+            pool_timeout_s=config.http_pool_timeout_s,
+            on_near_limit=on_near_limit,
+        )
+
+    async def warm_up(self, openai_clients: List, connections: int = 1, timeout_s: float = 5.0) -> int:
+        """
+        Open connections to every backend with a cheap models.list() call.
+
+        The result does not matter (some endpoints answer 404); the
+        connection stays in the pool either way. Returns the number of
+        calls that got any HTTP response.
+        """
+
+        async def touch(client) -> bool:
+            try:
+                await asyncio.wait_for(client.models.list(), timeout_s)
+            except (httpx.TransportError, asyncio.TimeoutError):
+                return False
+            except Exception:
+                # An HTTP error status still means we are connected
+                return True
+            return True
+
+        results = await asyncio.gather(
+            *(touch(client) for client in openai_clients for _ in range(connections))
+        )
+        return sum(results)
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
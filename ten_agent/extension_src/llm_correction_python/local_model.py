@@ -0,0 +1,176 @@
+#
+# VoxFlame LLM Correction Extension
+# Copyright (c) 2025 VoxFlame. All rights reserved.
+#
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import List, Optional
+
+try:
+    from llama_cpp import Llama
+
+    LLAMA_AVAILABLE = True
+except ImportError:  # Optional: pip install llama-cpp-python
+    Llama = None
+    LLAMA_AVAILABLE = False
+
+
+class LocalModelUnavailable(RuntimeError):
+    """The local model is not loaded or its queue is full"""
+
+
+@dataclass
+class LocalModelStats:
+    requests: int = 0
+    rejected: int = 0  # Queue full or model not loaded
+    failed: int = 0
+    batches: int = 0
+    load_ms: float = 0.0
+    total_ms: float = 0.0  # Queueing + generation of completed requests
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        done = self.requests - self.rejected - self.failed
+        data["avg_ms"] = round(self.total_ms / done, 1) if done > 0 else 0.0
+        data["avg_batch_size"] = (
+            round((self.requests - self.rejected) / self.batches, 2) if self.batches else 0.0
+        )
+        return data
+
+
+class LocalModel:
+    """
+    Small quantized chat model (GGUF, llama.cpp) running on the CPU.
+
+    Generation runs on one worker thread, since a llama.cpp context is not
+    thread-safe; n_threads sets how many cores it uses. Requests wait in a
+    queue of at most max_queue; when it is full complete() raises
+    LocalModelUnavailable immediately, so the caller can use a remote
+    backend instead. The worker takes up to max_batch queued requests per
+    hand-off to the thread.
+    """
+
+    def __init__(
+        self,
+        model_path: str,
+        n_ctx: int = 2048,
+        n_threads: int = 4,
+        max_queue: int = 16,
+        max_batch: int = 4,
+        max_tokens: int = 128,
+        temperature: float = 0.3,
+    ):
+        self.model_path = model_path
+        self.n_ctx = n_ctx
+        self.n_threads = n_threads
+        self.max_batch = max_batch
+        self.max_tokens = max_tokens
+        self.temperature = temperature
+        self.stats = LocalModelStats()
+        self._llm = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="local-llm")
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._worker: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        return self._llm is not None
+
+    async def load(self) -> None:
+        """Load the model and run one short generation to warm it up"""
+        if not LLAMA_AVAILABLE:
+            raise LocalModelUnavailable("llama-cpp-python is not installed")
+        started = time.monotonic()
+        loop = asyncio.get_running_loop()
+        llm = await loop.run_in_executor(self._executor, self._load)
+        await loop.run_in_executor(
+            self._executor,
+            lambda: llm.create_chat_completion(
+                messages=[{"role": "user", "content": "你好"}], max_tokens=1
+            ),
+        )
+        self._llm = llm
+        self.stats.load_ms = (time.monotonic() - started) * 1000
+        self._worker = asyncio.create_task(self._work())
+
+    def _load(self):
+        return Llama(
+            model_path=self.model_path,
+            n_ctx=self.n_ctx,
+            n_threads=self.n_threads,
+            verbose=False,
+        )
+
+    async def complete(self, system: str, user: str) -> str:
+        """Generate a reply; raises LocalModelUnavailable instead of waiting for room"""
+        self.stats.requests += 1
+        if not self.ready:
+            self.stats.rejected += 1
+            raise LocalModelUnavailable("local model is not loaded")
+        future = asyncio.get_running_loop().create_future()
+        messages = [
+            {"role": "system", "content": system},
+            {"role": "user", "content": user},
+        ]
+        try:
+            self._queue.put_nowait((messages, future, time.monotonic()))
+        except asyncio.QueueFull:
+            self.stats.rejected += 1
+            raise LocalModelUnavailable("local model queue is full") from None
+        return await future
+
+    async def _work(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            # Callers that gave up while queued are skipped
+            batch = [entry for entry in batch if not entry[1].done()]
+            if not batch:
+                continue
+            self.stats.batches += 1
+            results = await loop.run_in_executor(
+                self._executor, self._generate, [entry[0] for entry in batch]
+            )
+            now = time.monotonic()
+            for (_, future, queued), result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    self.stats.failed += 1
+                    future.set_exception(result)
+                else:
+                    self.stats.total_ms += (now - queued) * 1000
+                    future.set_result(result)
+
+    def _generate(self, batch: List[List[dict]]) -> List:
+        """Runs on the worker thread"""
+        results: List = []
+        for messages in batch:
+            try:
+                response = self._llm.create_chat_completion(
+                    messages=messages,
+                    max_tokens=self.max_tokens,
+                    temperature=self.temperature,
+                )
+                results.append(response["choices"][0]["message"]["content"] or "")
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def close(self) -> int:
+        """Stop the worker; returns the number of queued requests dropped"""
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None
+        dropped = 0
+        while not self._queue.empty():
+            _, future, _ = self._queue.get_nowait()
+            if future.cancel():
+                dropped += 1
+        self._executor.shutdown(wait=False)
+        self._llm = None
+        return dropped
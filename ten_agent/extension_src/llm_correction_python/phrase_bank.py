@@ -0,0 +1,188 @@
+#
+# VoxFlame LLM Correction Extension
+# Copyright (c) 2025 VoxFlame. All rights reserved.
+#
+import hashlib
+import unicodedata
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    from pypinyin import lazy_pinyin
+except ImportError:  # optional dependency, falls back to characters
+    lazy_pinyin = None
+
+
+PINYIN_AVAILABLE = lazy_pinyin is not None
+
+# Confusions typical for dysarthric speech (see the system prompt):
+# z/zh, c/ch, s/sh, l/n initials and an/ang, en/eng, in/ing finals
+_INITIALS = (("zh", "z"), ("ch", "c"), ("sh", "s"), ("n", "l"))
+_FINALS = (("ang", "an"), ("eng", "en"), ("ing", "in"))
+
+Key = Tuple[str, ...]
+
+
+def _collapse(syllable: str) -> str:
+    for full, short in _INITIALS:
+        if syllable.startswith(full):
+            syllable = short + syllable[len(full):]
+            break
+    for full, short in _FINALS:
+        if syllable.endswith(full):
+            syllable = syllable[: -len(full)] + short
+            break
+    return syllable
+
+
+def normalize(text: str) -> str:
+    """Letters and digits of a text, NFKC-normalized and lowercased"""
+    return "".join(
+        c for c in unicodedata.normalize("NFKC", text).lower() if c.isalnum()
+    )
+
+
+def phonetic_key(text: str) -> Key:
+    """
+    Sound-alike key of a text: one collapsed pinyin syllable per character.
+
+    Without pypinyin the key is the normalized characters themselves, which
+    still gives fuzzy matching on ASR substitutions.
+    """
+    chars = normalize(text)
+    if not chars:
+        return ()
+    if lazy_pinyin is None:
+        return tuple(chars)
+    return tuple(_collapse(s) for s in lazy_pinyin(chars))
+
+
+def _edit_distance(a: Sequence[str], b: Sequence[str]) -> int:
+    """Levenshtein distance over syllables"""
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, x in enumerate(a, 1):
+        current = [i]
+        for j, y in enumerate(b, 1):
+            current.append(
+                min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (x != y))
+            )
+        previous = current
+    return previous[-1]
+
+
+class _BKTree:
+    """BK-tree over phonetic keys for bounded edit-distance search"""
+
+    def __init__(self, distance: Callable[[Key, Key], int]):
+        self._distance = distance
+        # node: (key, phrases, children by distance)
+        self._root: Optional[Tuple[Key, List[str], Dict[int, tuple]]] = None
+
+    def add(self, key: Key, phrase: str) -> None:
+        if self._root is None:
+            self._root = (key, [phrase], {})
+            return
+        node = self._root
+        while True:
+            d = self._distance(key, node[0])
+            if d == 0:
+                if phrase not in node[1]:
+                    node[1].append(phrase)
+                return
+            child = node[2].get(d)
+            if child is None:
+                node[2][d] = (key, [phrase], {})
+                return
+            node = child
+
+    def search(self, key: Key, max_distance: int) -> List[Tuple[int, List[str]]]:
+        if self._root is None:
+            return []
+        found = []
+        stack = [self._root]
+        while stack:
+            node_key, phrases, children = stack.pop()
+            d = self._distance(key, node_key)
+            if d <= max_distance:
+                found.append((d, phrases))
+            for child_d, child in children.items():
+                if d - max_distance <= child_d <= d + max_distance:
+                    stack.append(child)
+        return found
+
+
+@dataclass
+class PhraseMatch:
+    """A known phrase that sounds like the ASR text"""
+
+    phrase: str
+    confidence: float
+    distance: int
+
+
+class PhraseBank:
+    """
+    Index of a user's known phrases for sound-alike lookup.
+
+    Phrases are keyed by collapsed pinyin, so "我要喝睡" finds "我要喝水"
+    and z/zh, l/n, an/ang... confusions cost nothing. Confidence is
+    1 - syllable edit distance / phrase length.
+    """
+
+    def __init__(self, phrases: Iterable[str] = (), max_distance: int = 2):
+        self.max_distance = max_distance
+        self._tree = _BKTree(_edit_distance)
+        # phrase -> (key length, insertion index)
+        self._phrases: Dict[str, Tuple[int, int]] = {}
+        # Normalized phrases, for exact matches
+        self._normalized: set = set()
+        self._fingerprint: Optional[str] = None
+        for phrase in phrases:
+            self.add(phrase)
+
+    def __len__(self) -> int:
+        return len(self._phrases)
+
+    def __contains__(self, text: str) -> bool:
+        """Whether the text is exactly a known phrase, ignoring punctuation"""
+        return normalize(text) in self._normalized
+
+    @property
+    def fingerprint(self) -> str:
+        """Changes whenever the phrase list changes (for cache keys)"""
+        if self._fingerprint is None:
+            data = "\n".join(self._phrases).encode("utf-8")
+            self._fingerprint = hashlib.sha1(data).hexdigest()[:16]
+        return self._fingerprint
+
+    def add(self, phrase: str) -> None:
+        phrase = phrase.strip()
+        key = phonetic_key(phrase)
+        if not key or phrase in self._phrases:
+            return
+        self._phrases[phrase] = (len(key), len(self._phrases))
+        self._normalized.add(normalize(phrase))
+        self._fingerprint = None
+        self._tree.add(key, phrase)
+
+    def lookup(self, text: str, limit: int = 3) -> List[PhraseMatch]:
+        """Best matching phrases, highest confidence first"""
+        key = phonetic_key(text)
+        if not key or not self._phrases:
+            return []
+        matches = []
+        for distance, phrases in self._tree.search(key, self.max_distance):
+            for phrase in phrases:
+                length = max(len(key), self._phrases[phrase][0])
+                matches.append(
+                    PhraseMatch(
+                        phrase=phrase,
+                        confidence=1.0 - distance / length,
+                        distance=distance,
+                    )
+                )
+        # Earlier phrases (user profile before vocabulary) win ties
+        matches.sort(key=lambda m: (-m.confidence, self._phrases[m.phrase][1]))
+        return matches[:limit]
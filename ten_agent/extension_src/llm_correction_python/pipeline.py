@@ -0,0 +1,138 @@
+#
+# VoxFlame LLM Correction Extension
+# Copyright (c) 2025 VoxFlame. All rights reserved.
+#
+import asyncio
+from dataclasses import asdict, dataclass, field
+from typing import Awaitable, Callable, Dict, Optional
+
+
+# A job gets turn(), which returns once every earlier job of its session
+# has finished; it must await it before sending anything.
+Turn = Callable[[], Awaitable[None]]
+Job = Callable[[Turn], Awaitable[None]]
+
+
+@dataclass
+class PipelineStats:
+    submitted: int = 0
+    completed: int = 0
+    cancelled: int = 0
+    failed: int = 0
+    peak_in_flight: int = 0
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+@dataclass
+class _Lane:
+    """Jobs of one session, by sequence number"""
+
+    next_seq: int = 0
+    jobs: Dict[int, asyncio.Task] = field(default_factory=dict)
+    # Previous job: set once it holds a slot / once it has finished
+    last_started: Optional[asyncio.Future] = None
+    last_task: Optional[asyncio.Task] = None
+
+
+class CorrectionPipeline:
+    """
+    Runs corrections concurrently, keeping output order per session.
+
+    At most max_in_flight jobs run at once across all sessions. Jobs of
+    one session get increasing sequence numbers and may overlap, but each
+    waits for its predecessor before sending output (turn()), so
+    utterances are spoken in the order they were said. A job takes a slot
+    only after its predecessor has one, so waiting for a turn can never
+    starve the predecessor of a slot.
+    """
+
+    def __init__(self, max_in_flight: int = 8):
+        self.max_in_flight = max_in_flight
+        self.stats = PipelineStats()
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._lanes: Dict[str, _Lane] = {}
+        self._in_flight = 0
+
+    def __len__(self) -> int:
+        """Jobs submitted and not finished yet"""
+        return sum(len(lane.jobs) for lane in self._lanes.values())
+
+    def submit(self, session_id: str, job: Job) -> asyncio.Task:
+        """Queue a job behind the earlier jobs of its session"""
+        lane = self._lanes.setdefault(session_id, _Lane())
+        seq = lane.next_seq
+        lane.next_seq += 1
+
+        started = asyncio.get_running_loop().create_future()
+        task = asyncio.create_task(
+            self._run(job, started, lane.last_started, lane.last_task)
+        )
+        lane.jobs[seq] = task
+        lane.last_started = started
+        lane.last_task = task
+        task.add_done_callback(lambda t: self._finish(session_id, lane, seq, t))
+        self.stats.submitted += 1
+        return task
+
+    def cancel(self, session_id: Optional[str] = None) -> int:
+        """Cancel the jobs of a session, or of all sessions"""
+        if session_id is None:
+            lanes = list(self._lanes.values())
+            self._lanes.clear()
+        else:
+            lane = self._lanes.pop(session_id, None)
+            lanes = [lane] if lane is not None else []
+
+        count = 0
+        for lane in lanes:
+            for task in lane.jobs.values():
+                if task.cancel():
+                    count += 1
+        return count
+
+    async def _run(
+        self,
+        job: Job,
+        started: asyncio.Future,
+        previous_started: Optional[asyncio.Future],
+        previous: Optional[asyncio.Task],
+    ) -> None:
+        async def turn() -> None:
+            if previous is not None and not previous.done():
+                # Wait without inheriting the predecessor's outcome
+                await asyncio.wait({previous})
+
+        try:
+            if previous_started is not None and not previous.done():
+                await asyncio.wait(
+                    {previous_started, previous},
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+            async with self._slots:
+                started.set_result(None)
+                self._in_flight += 1
+                self.stats.peak_in_flight = max(
+                    self.stats.peak_in_flight, self._in_flight
+                )
+                try:
+                    await job(turn)
+                finally:
+                    self._in_flight -= 1
+        finally:
+            if not started.done():
+                started.set_result(None)
+
+    def _finish(
+        self, session_id: str, lane: _Lane, seq: int, task: asyncio.Task
+    ) -> None:
+        lane.jobs.pop(seq, None)
+        if task.cancelled():
+            self.stats.cancelled += 1
+        elif task.exception() is not None:
+            self.stats.failed += 1
+        else:
+            self.stats.completed += 1
+        if not lane.jobs and self._lanes.get(session_id) is lane:
+            del self._lanes[session_id]
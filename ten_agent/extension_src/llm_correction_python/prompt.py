@@ -0,0 +1,196 @@
+#
+# VoxFlame LLM Correction Extension
+# Copyright (c) 2025 VoxFlame. All rights reserved.
+#
+import math
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+
+# Prompt sections, from static to dynamic
+PROFILE_SECTION = "## 用户信息\n{}\n"
+VOCABULARY_SECTION = "## 用户常用词汇\n{}\n"
+CONTEXT_SECTION = "## 最近对话\n{}\n"
+CONTEXT_LINE = "- 原文: {} -> 纠正: {}"
+HINTS_SECTION = "## 可能的常用短语\n{}\n"
+ASR_SECTION = "## 语音识别结果\n{}\n\n## 纠正后的文本"
+
+# Session used when a request carries no client_id
+DEFAULT_SESSION = ""
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token count without a tokenizer.
+
+    Qwen/GPT tokenizers spend about one token per CJK character and about
+    one per four other characters; this errs on the high side.
+    """
+    cjk = sum(1 for c in text if "⺀" <= c <= "鿿" or "豈" <= c <= "﫿")
+    return cjk + math.ceil((len(text) - cjk) / 4)
+
+
+def format_profile(user_profile) -> str:
+    """Profile text for the prompt from an update_profile payload"""
+    if not isinstance(user_profile, dict):
+        return str(user_profile or "")
+    profile_parts = []
+    if user_profile.get("email"):
+        profile_parts.append(f"邮箱: {user_profile['email']}")
+    if user_profile.get("name"):
+        profile_parts.append(f"昵称: {user_profile['name']}")
+    if user_profile.get("id"):
+        profile_parts.append(f"用户ID: {user_profile['id']}")
+    return "\n".join(profile_parts)
+
+
+@dataclass
+class Prompt:
+    """A correction prompt split for prefix caching"""
+
+    system: str  # System prompt + profile + vocabulary: same for a session
+    user: str  # Context, hints and the ASR text
+    static: str  # Profile + vocabulary sections alone (for batching)
+    tokens: int
+
+
+class _SessionPrefix:
+    """Static part of one session's prompts, built once"""
+
+    def __init__(self, profile: str, vocabulary: Tuple[str, ...]):
+        self.profile = profile
+        self.vocabulary = vocabulary
+        self._built: Optional[Tuple[str, int]] = None
+        # Last context section, reused while the context is unchanged
+        self.context_key: Optional[tuple] = None
+        self.context_section = ""
+
+    def static(self, max_vocabulary: int) -> Tuple[str, int]:
+        if self._built is None:
+            sections = []
+            if self.profile:
+                sections.append(PROFILE_SECTION.format(self.profile))
+            if self.vocabulary:
+                sections.append(
+                    VOCABULARY_SECTION.format("、".join(self.vocabulary[:max_vocabulary]))
+                )
+            text = "\n".join(sections)
+            self._built = (text, estimate_tokens(text))
+        return self._built
+
+
+class PromptBuilder:
+    """
+    Builds correction prompts ordered from static to dynamic.
+
+    The system message holds the system prompt, the user profile and the
+    vocabulary, which only change on update_profile, so every request of
+    a session shares that prefix and provider-side prefix caching applies.
+    The user message holds the recent context, phrase hints and ASR text.
+    The static part is built once per session; the context section is
+    reused while the context is unchanged.
+
+    Prompts are kept within max_prompt_tokens by dropping, in order, the
+    oldest context turns and then the phrase hints. The system part and
+    the ASR text are never dropped.
+    """
+
+    def __init__(
+        self,
+        system_prompt: str,
+        vocabulary: Optional[List[str]] = None,
+        user_profile: str = "",
+        max_prompt_tokens: int = 2048,
+        max_vocabulary: int = 20,
+        max_context_turns: int = 3,
+        max_sessions: int = 256,
+    ):
+        self.system_prompt = system_prompt
+        self.system_tokens = estimate_tokens(system_prompt)
+        self.max_prompt_tokens = max_prompt_tokens
+        self.max_vocabulary = max_vocabulary
+        self.max_context_turns = max_context_turns
+        self.max_sessions = max_sessions
+        self._default = _SessionPrefix(user_profile, tuple(vocabulary or ()))
+        self._sessions: "OrderedDict[str, _SessionPrefix]" = OrderedDict()
+
+    def profile(self, session_id: str = DEFAULT_SESSION) -> str:
+        return self._session(session_id).profile
+
+    def vocabulary(self, session_id: str = DEFAULT_SESSION) -> Tuple[str, ...]:
+        return self._session(session_id).vocabulary
+
+    def update_session(
+        self,
+        session_id: str = DEFAULT_SESSION,
+        profile: Optional[str] = None,
+        vocabulary: Optional[List[str]] = None,
+    ) -> None:
+        """Set a session's profile and/or vocabulary, dropping its cached prefix"""
+        current = self._session(session_id)
+        prefix = _SessionPrefix(
+            current.profile if profile is None else profile,
+            current.vocabulary if vocabulary is None else tuple(vocabulary),
+        )
+        if session_id == DEFAULT_SESSION:
+            self._default = prefix
+            return
+        self._sessions[session_id] = prefix
+        self._sessions.move_to_end(session_id)
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+
+    def build(
+        self,
+        asr_text: str,
+        context: Optional[List[dict]] = None,
+        hints: Optional[List[str]] = None,
+        session_id: str = DEFAULT_SESSION,
+    ) -> Prompt:
+        session = self._session(session_id)
+        static, static_tokens = session.static(self.max_vocabulary)
+        system = f"{self.system_prompt}\n\n{static}" if static else self.system_prompt
+
+        asr_section = ASR_SECTION.format(asr_text)
+        budget = (
+            self.max_prompt_tokens
+            - self.system_tokens
+            - static_tokens
+            - estimate_tokens(asr_section)
+        )
+
+        turns = list(context or [])[-self.max_context_turns:]
+        context_section = self._context_section(session, turns)
+        hints_section = (
+            HINTS_SECTION.format("\n".join(f"- {h}" for h in hints)) if hints else ""
+        )
+        while turns and estimate_tokens(context_section + hints_section) > budget:
+            turns = turns[1:]
+            context_section = self._context_section(session, turns)
+        if estimate_tokens(context_section + hints_section) > budget:
+            hints_section = ""
+
+        user = "\n".join(s for s in (context_section, hints_section, asr_section) if s)
+        return Prompt(
+            system=system,
+            user=user,
+            static=static,
+            tokens=self.system_tokens + static_tokens + estimate_tokens(user),
+        )
+
+    def _session(self, session_id: str) -> _SessionPrefix:
+        session = self._sessions.get(session_id) if session_id else None
+        return session if session is not None else self._default
+
+    @staticmethod
+    def _context_section(session: _SessionPrefix, turns: List[dict]) -> str:
+        if not turns:
+            return ""
+        key = tuple((t["original"], t["corrected"]) for t in turns)
+        if key != session.context_key:
+            session.context_key = key
+            session.context_section = CONTEXT_SECTION.format(
+                "\n".join(CONTEXT_LINE.format(*pair) for pair in key)
+            )
+        return session.context_section
@@ -0,0 +1,126 @@
+#
+# VoxFlame LLM Correction Extension
+# Copyright (c) 2025 VoxFlame. All rights reserved.
+#
+import asyncio
+from dataclasses import asdict, dataclass
+from typing import Awaitable, Callable, Dict, Optional
+
+from .cache import normalize_text
+
+
+@dataclass
+class SpeculationStats:
+    """Outcome counters of speculative corrections"""
+
+    hits: int = 0  # Final matched a finished speculation
+    joined: int = 0  # Final matched a speculation still in flight
+    mismatches: int = 0  # Final differed from the speculated hypothesis
+    cancelled: int = 0  # Hypothesis changed before the final arrived
+    failed: int = 0
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+@dataclass
+class _Speculation:
+    key: str
+    task: Optional[asyncio.Task] = None
+    started: bool = False  # Past the stability wait, LLM request running
+
+
+class Speculator:
+    """
+    Corrects interim ASR hypotheses ahead of the final result.
+
+    Each client has at most one speculation. It waits until the hypothesis
+    has been stable for stable_s, then runs the correction. A changed
+    hypothesis cancels it; an unchanged one (after normalization) keeps it.
+    When the final arrives, take() returns the speculated correction if the
+    final matches, so the LLM latency overlaps the user's trailing speech.
+    """
+
+    def __init__(self, stable_s: float = 0.3):
+        self.stable_s = stable_s
+        self.stats = SpeculationStats()
+        self._pending: Dict[str, _Speculation] = {}
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def update(
+        self, client_id: str, text: str, correct: Callable[[], Awaitable[str]]
+    ) -> None:
+        """Track a new interim hypothesis of a client"""
+        key = normalize_text(text)
+        current = self._pending.get(client_id)
+        if current is not None:
+            if current.key == key:
+                return
+            self._cancel(current)
+        if not key:
+            self._pending.pop(client_id, None)
+            return
+
+        speculation = _Speculation(key=key)
+        speculation.task = asyncio.create_task(self._run(speculation, correct))
+        # Failures surface through take(); don't warn about dropped ones
+        speculation.task.add_done_callback(
+            lambda t: t.cancelled() or t.exception()
+        )
+        self._pending[client_id] = speculation
+
+    async def take(self, client_id: str, text: str) -> Optional[str]:
+        """
+        Correction speculated for this final text, or None.
+
+        A matching speculation that has not reached the LLM yet is dropped,
+        since the regular path is no slower.
+        """
+        speculation = self._pending.pop(client_id, None)
+        if speculation is None:
+            return None
+        if speculation.key != normalize_text(text):
+            self._cancel(speculation)
+            self.stats.mismatches += 1
+            return None
+        if not speculation.started:
+            self._cancel(speculation)
+            return None
+
+        if speculation.task.done():
+            self.stats.hits += 1
+        else:
+            self.stats.joined += 1
+        try:
+            return await speculation.task
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self.stats.failed += 1
+            return None
+
+    def cancel(self, client_id: Optional[str] = None) -> None:
+        """Drop the speculation of a client, or all of them"""
+        if client_id is None:
+            for speculation in self._pending.values():
+                self._cancel(speculation)
+            self._pending.clear()
+            return
+        speculation = self._pending.pop(client_id, None)
+        if speculation is not None:
+            self._cancel(speculation)
+
+    def _cancel(self, speculation: _Speculation) -> None:
+        if not speculation.task.done():
+            speculation.task.cancel()
+            if speculation.started:
+                self.stats.cancelled += 1
+
+    async def _run(
+        self, speculation: _Speculation, correct: Callable[[], Awaitable[str]]
+    ) -> str:
+        await asyncio.sleep(self.stable_s)
+        speculation.started = True
+        return await correct()
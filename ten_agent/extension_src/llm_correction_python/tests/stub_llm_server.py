@@ -0,0 +1,130 @@
+#
+# VoxFlame LLM Correction Extension
+# Copyright (c) 2025 VoxFlame. All rights reserved.
+#
+"""
+Minimal OpenAI-compatible chat completions server for tests
+
+Answers POST .../chat/completions, streamed (SSE) or not, after a
+configurable delay, so backends can be made slow or failing:
+
+    server = StubLLMServer(reply="我要喝水", delay_s=0.2)
+    await server.start()
+    client = AsyncOpenAI(api_key="test", base_url=server.base_url)
+"""
+
+import asyncio
+import json
+from typing import Optional
+
+
+class StubLLMServer:
+    def __init__(
+        self,
+        reply: str = "ok",
+        delay_s: float = 0.0,
+        status: int = 200,
+        chunk_chars: int = 2,
+    ):
+        self.reply = reply
+        self.delay_s = delay_s
+        self.status = status
+        self.chunk_chars = chunk_chars
+        self.requests: list = []
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    @property
+    def base_url(self) -> str:
+        port = self._server.sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{port}/v1"
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = 0
+            for line in head.decode("latin-1").split("\r\n")[1:]:
+                name, _, value = line.partition(":")
+                if name.strip().lower() == "content-length":
+                    length = int(value)
+            body = json.loads(await reader.readexactly(length) or b"{}")
+            self.requests.append(body)
+
+            await asyncio.sleep(self.delay_s)
+            if self.status != 200:
+                payload = json.dumps({"error": {"message": "stub failure"}})
+                await self._respond(writer, self.status, "application/json", payload)
+            elif body.get("stream"):
+                await self._respond_stream(writer, body.get("model", ""))
+            else:
+                payload = json.dumps(
+                    {
+                        "id": "stub",
+                        "object": "chat.completion",
+                        "created": 0,
+                        "model": body.get("model", ""),
+                        "choices": [
+                            {
+                                "index": 0,
+                                "finish_reason": "stop",
+                                "message": {"role": "assistant", "content": self.reply},
+                            }
+                        ],
+                    },
+                    ensure_ascii=False,
+                )
+                await self._respond(writer, 200, "application/json", payload)
+        except (asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+            # Client gave up (lost a hedge race) or the server is stopping
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(
+        self, writer: asyncio.StreamWriter, status: int, content_type: str, body: str
+    ) -> None:
+        data = body.encode("utf-8")
+        writer.write(
+            (
+                f"HTTP/1.1 {status} Stub\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {len(data)}\r\n"
+                "Connection: close\r\n\r\n"
+            ).encode("latin-1")
+            + data
+        )
+        await writer.drain()
+
+    async def _respond_stream(self, writer: asyncio.StreamWriter, model: str) -> None:
+        writer.write(
+            b"HTTP/1.1 200 OK\r\n"
+            b"Content-Type: text/event-stream\r\n"
+            b"Connection: close\r\n\r\n"
+        )
+        for i in range(0, len(self.reply), self.chunk_chars):
+            event = {
+                "id": "stub",
+                "object": "chat.completion.chunk",
+                "created": 0,
+                "model": model,
+                "choices": [
+                    {
+                        "index": 0,
+                        "finish_reason": None,
+                        "delta": {"content": self.reply[i:i + self.chunk_chars]},
+                    }
+                ],
+            }
+            writer.write(f"data: {json.dumps(event, ensure_ascii=False)}\n\n".encode())
+            await writer.drain()
+        writer.write(b"data: [DONE]\n\n")
+        await writer.drain()
@@ -0,0 +1,116 @@
+#
+# VoxFlame LLM Correction Extension
+# Copyright (c) 2025 VoxFlame. All rights reserved.
+#
+import asyncio
+import os
+import sys
+
+from openai import AsyncOpenAI
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from llm_correction_python.backends import Backend, BackendPool  # noqa: E402
+from stub_llm_server import StubLLMServer  # noqa: E402
+
+MESSAGES = [{"role": "user", "content": "我要喝睡"}]
+
+
+def _backend(name: str, server: StubLLMServer, timeout_s: float = 5.0) -> Backend:
+    client = AsyncOpenAI(api_key="test", base_url=server.base_url, max_retries=0)
+    return Backend(name=name, client=client, model=name, timeout_s=timeout_s)
+
+
+async def _with_servers(*servers: StubLLMServer, test):
+    for server in servers:
+        await server.start()
+    try:
+        await test()
+    finally:
+        for server in servers:
+            await server.stop()
+
+
+def test_hedged_request_uses_faster_backend():
+    slow = StubLLMServer(reply="slow", delay_s=1.0)
+    fast = StubLLMServer(reply="fast", delay_s=0.0)
+
+    async def test():
+        # Unmeasured backends hedge after half their timeout (0.1 s here);
+        # both are unmeasured, so "slow" goes first and "fast" is the hedge
+        pool = BackendPool(
+            [_backend("slow", slow, timeout_s=0.2), _backend("fast", fast)],
+            hedge_min_delay_s=0.05,
+        )
+        response, backend = await pool.complete(messages=MESSAGES)
+        assert backend.name == "fast"
+        assert response.choices[0].message.content == "fast"
+        assert pool.backends[0].stats.hedges == 1
+        assert len(slow.requests) == 1 and len(fast.requests) == 1
+
+        # The slow backend now has the higher EWMA and is tried second
+        assert [b.name for b in pool.ranked()] == ["fast", "slow"]
+
+    asyncio.run(_with_servers(slow, fast, test=test))
+
+
+def test_failed_backend_fails_over():
+    broken = StubLLMServer(status=500)
+    healthy = StubLLMServer(reply="我要喝水")
+
+    async def test():
+        pool = BackendPool(
+            [_backend("broken", broken), _backend("healthy", healthy)], hedge=False
+        )
+        response, backend = await pool.complete(messages=MESSAGES)
+        assert backend.name == "healthy"
+        assert response.choices[0].message.content == "我要喝水"
+        assert pool.backends[0].stats.failures == 1
+
+    asyncio.run(_with_servers(broken, healthy, test=test))
+
+
+def test_stream_returns_first_event():
+    server = StubLLMServer(reply="我要喝水。", chunk_chars=2)
+
+    async def test():
+        pool = BackendPool([_backend("stub", server)])
+        stream, first, backend = await pool.stream(messages=MESSAGES)
+        text = first.choices[0].delta.content
+        async for event in stream:
+            text += event.choices[0].delta.content or ""
+        await stream.close()
+        assert text == "我要喝水。"
+        assert backend.latency.ewma is not None
+
+    asyncio.run(_with_servers(server, test=test))
+
+
+def test_hedge_cancelled_early_does_not_look_fast():
+    primary = StubLLMServer(reply="primary", delay_s=0.17)
+    hedge = StubLLMServer(reply="hedge", delay_s=1.0)
+    measured = StubLLMServer(reply="measured", delay_s=1.0)
+
+    async def test():
+        # The hedge goes out after 0.15 s, just before the primary answers
+        pool = BackendPool(
+            [_backend("primary", primary, timeout_s=0.3), _backend("hedge", hedge)],
+            hedge_min_delay_s=0.1,
+        )
+        _, backend = await pool.complete(messages=MESSAGES)
+        assert backend.name == "primary"
+        assert pool.backends[1].stats.requests == 1
+        assert pool.backends[1].latency.ewma is None
+
+        # A measured backend keeps its EWMA too
+        pool = BackendPool(
+            [_backend("primary", primary, timeout_s=0.3), _backend("measured", measured)],
+            hedge_min_delay_s=0.1,
+        )
+        pool.backends[0].latency.observe(0.01)
+        pool.backends[1].latency.observe(1.0)
+        _, backend = await pool.complete(messages=MESSAGES)
+        assert backend.name == "primary"
+        assert pool.backends[1].latency.ewma == 1.0
+
+    asyncio.run(_with_servers(primary, hedge, measured, test=test))
@@ -0,0 +1,55 @@
+#
+# VoxFlame LLM Correction Extension
+# Copyright (c) 2025 VoxFlame. All rights reserved.
+#
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from llm_correction_python.batcher import CorrectionBatcher  # noqa: E402
+
+
+def test_concurrent_prompts_share_one_request():
+    batches = []
+
+    async def run_batch(items):
+        batches.append([item.request for item in items])
+        return {item.id: item.request.upper() for item in items}
+
+    async def run_single(request):
+        raise AssertionError("no fallback expected")
+
+    async def test():
+        batcher = CorrectionBatcher(run_batch, run_single, window_s=0.02)
+        results = await asyncio.gather(*(batcher.submit(p) for p in ("a", "b", "c")))
+        assert results == ["A", "B", "C"]
+        assert batches == [["a", "b", "c"]]
+        assert batcher.stats.requests == 1
+
+    asyncio.run(test())
+
+
+def test_missing_results_fall_back_to_single_requests():
+    singles = []
+
+    async def run_batch(items):
+        # Only the first item could be parsed
+        return {items[0].id: "first"}
+
+    async def run_single(request):
+        singles.append(request)
+        return f"single {request}"
+
+    async def test():
+        batcher = CorrectionBatcher(run_batch, run_single, window_s=0.02, max_batch=2)
+        results = await asyncio.gather(batcher.submit("a"), batcher.submit("b"))
+        assert results == ["first", "single b"]
+        assert singles == ["b"]
+        assert batcher.stats.fallbacks == 1
+
+        # A lone prompt skips the batch format entirely
+        assert await batcher.submit("c") == "single c"
+
+    asyncio.run(test())
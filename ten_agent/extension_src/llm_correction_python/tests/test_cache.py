@@ -0,0 +1,83 @@
+#
+# VoxFlame LLM Correction Extension
+# Copyright (c) 2025 VoxFlame. All rights reserved.
+#
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from llm_correction_python.cache import (  # noqa: E402
+    CorrectionCache,
+    make_cache_key,
+    normalize_text,
+)
+from llm_correction_python.phrase_bank import PhraseBank  # noqa: E402
+
+
+def test_normalize_text_ignores_width_case_and_punctuation():
+    assert normalize_text("我要喝水。") == "我要喝水"
+    assert normalize_text(" 我要，喝水！ ") == "我要喝水"
+    assert normalize_text("ＯＫ，Ｔｈａｎｋｓ") == "okthanks"
+    assert normalize_text("Call   me_later?") == "callmelater"
+    assert normalize_text("我要喝水") != normalize_text("我要喝睡")
+
+
+def test_key_matches_texts_that_only_differ_in_punctuation():
+    assert make_cache_key("我要喝水。") == make_cache_key("我要 喝水")
+
+
+def test_key_changes_with_profile_vocabulary_and_phrase_bank():
+    profile = "昵称: 小明"
+    bank = PhraseBank(["我要喝水"])
+    # As LLMCorrector._cache_key builds it: vocabulary plus the bank's fingerprint
+    key = make_cache_key("我要喝睡", profile, [["康复"], bank.fingerprint])
+
+    assert key == make_cache_key("我要喝睡", profile, [["康复"], bank.fingerprint])
+    assert key != make_cache_key("我要喝睡", "昵称: 小红", [["康复"], bank.fingerprint])
+    assert key != make_cache_key("我要喝睡", profile, [["康复", "喝水"], bank.fingerprint])
+
+    bank.add("我要睡觉")
+    assert key != make_cache_key("我要喝睡", profile, [["康复"], bank.fingerprint])
+    assert PhraseBank(["我要喝水"]).fingerprint != bank.fingerprint
+
+
+def test_key_includes_last_turn_when_given():
+    turn = {"original": "我要喝睡", "corrected": "我要喝水"}
+    assert make_cache_key("好的") != make_cache_key("好的", last_turn=turn)
+
+
+def test_lru_eviction():
+    cache = CorrectionCache(max_entries=2, ttl_s=0)
+    cache.put("a", "A")
+    cache.put("b", "B")
+    assert cache.get("a") == "A"  # a is now the most recent
+    cache.put("c", "C")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "A"
+    assert cache.get("c") == "C"
+    assert len(cache) == 2
+    stats = cache.stats.to_dict()
+    assert stats["evictions"] == 1
+    assert stats["hits"] == 3 and stats["misses"] == 1
+    assert stats["hit_rate"] == 0.75
+    assert stats["size"] == 2
+
+
+def test_ttl_expiry():
+    cache = CorrectionCache(max_entries=8, ttl_s=0.05)
+    cache.put("a", "A")
+    assert cache.get("a") == "A"
+    time.sleep(0.1)
+
+    assert cache.get("a") is None
+    assert cache.stats.expirations == 1
+    assert len(cache) == 0
+
+    # ttl_s=0 never expires
+    forever = CorrectionCache(max_entries=8, ttl_s=0)
+    forever.put("a", "A")
+    time.sleep(0.06)
+    assert forever.get("a") == "A"
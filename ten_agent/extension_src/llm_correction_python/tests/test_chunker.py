@@ -0,0 +1,67 @@
+#
+# VoxFlame LLM Correction Extension
+# Copyright (c) 2025 VoxFlame. All rights reserved.
+#
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from llm_correction_python.corrector import ClauseChunker  # noqa: E402
+
+
+def _feed(chunker, *deltas):
+    chunks = []
+    for delta in deltas:
+        chunks.extend(chunker.feed(delta))
+    return chunks
+
+
+def test_prefix_split_across_deltas_is_stripped():
+    chunker = ClauseChunker()
+    # Nothing is emitted while the text could still be a prefix
+    assert _feed(chunker, "纠正", "后的", "文本：") == []
+    assert chunker.feed("“我要喝水，") == ["我要喝水，"]
+    assert _feed(chunker, "谢谢。") == []
+    assert chunker.finish() == "谢谢。"
+
+
+def test_text_that_only_looks_like_a_prefix_is_kept():
+    chunker = ClauseChunker()
+    assert _feed(chunker, "纠正", "错误，你好吗？") == ["纠正错误，", "你好吗？"]
+
+    chunker = ClauseChunker()
+    assert chunker.feed("纠正") == []
+    assert chunker.finish() == "纠正"
+
+
+def test_chunks_are_at_least_min_chars():
+    chunker = ClauseChunker(min_chars=4)
+    assert _feed(chunker, "好，我", "要喝水。嗯") == ["好，我要喝水。"]
+    assert chunker.finish() == "嗯"
+
+    chunker = ClauseChunker(min_chars=1)
+    assert _feed(chunker, "好，我要喝水。") == ["好，", "我要喝水。"]
+
+
+def test_stops_at_first_newline():
+    chunker = ClauseChunker()
+    assert _feed(chunker, "我要喝水。\n", "解释：把“睡”改成了“水”。") == ["我要喝水。"]
+    assert chunker.done
+    assert chunker.feed("更多说明，") == []
+    assert chunker.finish() is None
+
+    # Leading blank lines do not end the correction
+    chunker = ClauseChunker()
+    assert _feed(chunker, "\n\n我要", "喝水\n说明") == []
+    assert chunker.finish() == "我要喝水"
+
+
+def test_finish_strips_trailing_quotes():
+    chunker = ClauseChunker()
+    assert _feed(chunker, "「我要喝水", "」 ") == []
+    assert chunker.finish() == "我要喝水"
+
+    chunker = ClauseChunker()
+    assert _feed(chunker, "纠正：") == []
+    assert chunker.finish() is None
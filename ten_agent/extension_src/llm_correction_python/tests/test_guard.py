@@ -0,0 +1,37 @@
+#
+# VoxFlame LLM Correction Extension
+# Copyright (c) 2025 VoxFlame. All rights reserved.
+#
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from llm_correction_python.guard import CorrectionGuard  # noqa: E402
+from llm_correction_python.phrase_bank import PhraseBank  # noqa: E402
+
+
+def test_skips_confident_or_known_text():
+    guard = CorrectionGuard(skip_confidence=0.9)
+    bank = PhraseBank(["我要喝水"])
+
+    assert guard.should_skip("我要喝睡", confidence=0.95)
+    assert guard.should_skip("我要喝水。", confidence=0.5, phrase_bank=bank)
+    assert not guard.should_skip("我要喝睡", confidence=0.5, phrase_bank=bank)
+    assert guard.stats.skipped_confidence == 1
+    assert guard.stats.skipped_exact == 1
+
+
+def test_rejects_rewrites_but_not_misheard_words():
+    guard = CorrectionGuard()
+
+    assert guard.accept("我要喝睡", "我要喝水")
+    assert guard.accept("我要喝水", "我要喝水。")
+    assert not guard.accept("我要喝睡", "今天天气很好，我们出去散步吧")
+    assert guard.stats.to_dict() == {
+        "skipped_confidence": 0,
+        "skipped_exact": 0,
+        "accepted": 1,
+        "unchanged": 1,
+        "rejected": 1,
+    }
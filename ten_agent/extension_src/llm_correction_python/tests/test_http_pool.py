@@ -0,0 +1,51 @@
+#
+# VoxFlame LLM Correction Extension
+# Copyright (c) 2025 VoxFlame. All rights reserved.
+#
+import asyncio
+import os
+import sys
+
+from openai import AsyncOpenAI
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from llm_correction_python.http_pool import HttpPool  # noqa: E402
+from stub_llm_server import StubLLMServer  # noqa: E402
+
+MESSAGES = [{"role": "user", "content": "我要喝睡"}]
+
+
+def test_pool_tracks_requests_in_flight():
+    server = StubLLMServer(reply="我要喝水", delay_s=0.1)
+    warnings = []
+
+    async def test():
+        await server.start()
+        pool = HttpPool(max_connections=4, on_near_limit=warnings.append)
+        client = AsyncOpenAI(
+            api_key="test", base_url=server.base_url, max_retries=0,
+            http_client=pool.client,
+        )
+        try:
+            assert await pool.warm_up([client], connections=2) == 2
+            assert pool.stats.in_flight == 0
+
+            await asyncio.gather(
+                *(
+                    client.chat.completions.create(model="m", messages=MESSAGES)
+                    for _ in range(4)
+                )
+            )
+            stats = pool.stats.to_dict()
+            assert stats["requests"] == 6
+            assert stats["in_flight"] == 0
+            assert stats["peak_in_flight"] == 4
+            assert stats["peak_utilization"] == 1.0
+            # Crossing 80% of the limit is reported once per rise
+            assert stats["near_limit_events"] == 1 and len(warnings) == 1
+        finally:
+            await pool.aclose()
+            await server.stop()
+
+    asyncio.run(test())
@@ -0,0 +1,51 @@
+#
+# VoxFlame LLM Correction Extension
+# Copyright (c) 2025 VoxFlame. All rights reserved.
+#
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from llm_correction_python import local_model  # noqa: E402
+from llm_correction_python.local_model import LocalModel, LocalModelUnavailable  # noqa: E402
+
+
+class FakeLlama:
+    """Stands in for llama_cpp.Llama: echoes the user message"""
+
+    def __init__(self, **kwargs):
+        pass
+
+    def create_chat_completion(self, messages, max_tokens, temperature=0.3):
+        time.sleep(0.02)
+        return {"choices": [{"message": {"content": messages[-1]["content"]}}]}
+
+
+def test_full_queue_rejects_instead_of_waiting(monkeypatch):
+    monkeypatch.setattr(local_model, "Llama", FakeLlama)
+    monkeypatch.setattr(local_model, "LLAMA_AVAILABLE", True)
+
+    async def test():
+        model = LocalModel("model.gguf", max_queue=2, max_batch=4)
+        with pytest.raises(LocalModelUnavailable):
+            await model.complete("system", "not loaded")
+        await model.load()
+        try:
+            results = await asyncio.gather(
+                *(model.complete("system", f"text {i}") for i in range(4)),
+                return_exceptions=True,
+            )
+            assert results[:2] == ["text 0", "text 1"]
+            assert all(isinstance(r, LocalModelUnavailable) for r in results[2:])
+            # Both queued requests went to the thread together
+            assert model.stats.batches == 1
+            assert model.stats.rejected == 3
+        finally:
+            model.close()
+
+    asyncio.run(test())
@@ -0,0 +1,120 @@
+#
+# VoxFlame LLM Correction Extension
+# Copyright (c) 2025 VoxFlame. All rights reserved.
+#
+import itertools
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from llm_correction_python import phrase_bank  # noqa: E402
+from llm_correction_python.phrase_bank import (  # noqa: E402
+    PhraseBank,
+    _BKTree,
+    _collapse,
+    _edit_distance,
+    phonetic_key,
+)
+
+requires_pinyin = pytest.mark.skipif(
+    not phrase_bank.PINYIN_AVAILABLE, reason="pypinyin is not installed"
+)
+
+
+@pytest.mark.parametrize(
+    "syllable, collapsed",
+    [
+        ("zhi", "zi"),
+        ("chi", "ci"),
+        ("shui", "sui"),
+        ("nan", "lan"),
+        ("lan", "lan"),
+        ("zhang", "zan"),
+        ("neng", "len"),
+        ("ling", "lin"),
+        ("he", "he"),
+    ],
+)
+def test_collapse(syllable, collapsed):
+    assert _collapse(syllable) == collapsed
+
+
+@requires_pinyin
+def test_sound_alike_finds_known_phrase():
+    bank = PhraseBank(["我要喝水", "我要睡觉", "打开电视"])
+    matches = bank.lookup("我要喝睡")
+
+    assert matches[0].phrase == "我要喝水"
+    assert matches[0].distance == 0
+    assert matches[0].confidence == 1.0
+    assert "打开电视" not in [m.phrase for m in matches]
+
+
+@requires_pinyin
+def test_initial_and_final_confusions_are_free():
+    # zh/z, l/n, ang/an
+    assert phonetic_key("知道") == phonetic_key("资道")
+    assert phonetic_key("奶奶") == phonetic_key("来来")
+    assert phonetic_key("帮忙") == phonetic_key("班忙")
+    assert PhraseBank(["老师"]).lookup("脑丝")[0].confidence == 1.0
+
+
+def test_exact_membership_ignores_punctuation():
+    bank = PhraseBank(["我要喝水", " 我要喝水 ", ""])
+    assert len(bank) == 1
+    assert "我要喝水。" in bank
+    assert "我要喝睡" not in bank
+
+
+def test_bk_tree_search_stays_within_bounds():
+    calls = []
+
+    def distance(a, b):
+        calls.append(1)
+        return _edit_distance(a, b)
+
+    tree = _BKTree(distance)
+    keys = [tuple(p) for p in itertools.product("abc", repeat=4)]
+    for i, key in enumerate(keys):
+        tree.add(key, f"p{i}")
+
+    query = tuple("abca")
+    for max_distance in (0, 1, 2):
+        calls.clear()
+        found = {
+            (d, phrase)
+            for d, phrases in tree.search(query, max_distance)
+            for phrase in phrases
+        }
+        expected = {
+            (_edit_distance(query, key), f"p{i}")
+            for i, key in enumerate(keys)
+            if _edit_distance(query, key) <= max_distance
+        }
+        assert found == expected
+        # The triangle inequality prunes most of the tree
+        if max_distance < 2:
+            assert len(calls) < len(keys)
+
+    assert _BKTree(distance).search(query, 2) == []
+
+
+def test_max_distance_limits_matches():
+    bank = PhraseBank(["我要喝水"], max_distance=1)
+    assert bank.lookup("他要吃饭") == []
+    assert bank.lookup("") == []
+    assert PhraseBank().lookup("我要喝水") == []
+
+
+def test_falls_back_to_characters_without_pypinyin(monkeypatch):
+    monkeypatch.setattr(phrase_bank, "lazy_pinyin", None)
+    assert phonetic_key("我要，喝水！") == ("我", "要", "喝", "水")
+
+    bank = PhraseBank(["我要喝水", "打开电视"])
+    (match,) = bank.lookup("我要喝睡")
+    assert match.phrase == "我要喝水"
+    assert match.distance == 1
+    assert match.confidence == 0.75
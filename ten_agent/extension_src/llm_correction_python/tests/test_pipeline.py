@@ -0,0 +1,81 @@
+#
+# VoxFlame LLM Correction Extension
+# Copyright (c) 2025 VoxFlame. All rights reserved.
+#
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from llm_correction_python.pipeline import CorrectionPipeline  # noqa: E402
+
+
+def _job(name, delay_s, llm_done, output):
+    async def job(turn):
+        await asyncio.sleep(delay_s)  # The LLM call
+        llm_done.append(name)
+        await turn()
+        output.append(name)
+
+    return job
+
+
+def test_output_keeps_session_order_when_calls_overlap():
+    llm_done, output = [], []
+
+    async def test():
+        pipeline = CorrectionPipeline(max_in_flight=4)
+        tasks = [
+            pipeline.submit("a", _job("a1", 0.05, llm_done, output)),
+            pipeline.submit("a", _job("a2", 0.01, llm_done, output)),
+            pipeline.submit("b", _job("b1", 0.02, llm_done, output)),
+        ]
+        await asyncio.gather(*tasks)
+
+        # a2's call finished first, but it is sent after a1
+        assert llm_done.index("a2") < llm_done.index("a1")
+        assert [name for name in output if name.startswith("a")] == ["a1", "a2"]
+        # Other sessions are not held up
+        assert output.index("b1") < output.index("a1")
+        assert pipeline.stats.peak_in_flight == 3
+        assert len(pipeline) == 0
+
+    asyncio.run(test())
+
+
+def test_cancel_only_cancels_that_session():
+    llm_done, output = [], []
+
+    async def test():
+        pipeline = CorrectionPipeline(max_in_flight=4)
+        a = [pipeline.submit("a", _job(f"a{i}", 0.05, llm_done, output)) for i in range(2)]
+        b = pipeline.submit("b", _job("b1", 0.05, llm_done, output))
+        await asyncio.sleep(0.01)
+
+        assert pipeline.cancel("a") == 2
+        await asyncio.gather(*a, b, return_exceptions=True)
+        assert all(task.cancelled() for task in a)
+        assert output == ["b1"]
+        assert pipeline.stats.cancelled == 2 and pipeline.stats.completed == 1
+
+    asyncio.run(test())
+
+
+def test_single_slot_runs_every_job():
+    llm_done, output = [], []
+
+    async def test():
+        pipeline = CorrectionPipeline(max_in_flight=1)
+        tasks = [
+            pipeline.submit(session, _job(f"{session}{i}", 0.01, llm_done, output))
+            for i in range(3)
+            for session in ("a", "b")
+        ]
+        await asyncio.wait_for(asyncio.gather(*tasks), timeout=2)
+
+        assert [name for name in output if name.startswith("a")] == ["a0", "a1", "a2"]
+        assert [name for name in output if name.startswith("b")] == ["b0", "b1", "b2"]
+        assert pipeline.stats.peak_in_flight == 1
+
+    asyncio.run(test())
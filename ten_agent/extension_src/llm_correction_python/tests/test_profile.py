@@ -0,0 +1,92 @@
+#
+# VoxFlame LLM Correction Extension
+# Copyright (c) 2025 VoxFlame. All rights reserved.
+#
+import json
+import os
+import re
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from llm_correction_python.corrector import LLMCorrector  # noqa: E402
+
+EXTENSION_SRC = os.path.join(os.path.dirname(__file__), "..", "..")
+APP_DIR = os.path.join(EXTENSION_SRC, "..")
+
+
+class _Env:
+    def __getattr__(self, name):
+        if not name.startswith("log_"):
+            raise AttributeError(name)
+        return lambda msg: None
+
+
+def _load(*path):
+    with open(os.path.join(*path), encoding="utf-8") as f:
+        return f.read()
+
+
+def _graph():
+    app = json.loads(_load(APP_DIR, "property.json"))
+    return app["ten"]["predefined_graphs"][0]["graph"]
+
+
+def test_update_profile_is_routed_to_the_corrector():
+    # The destination main_control sends update_profile to
+    source = _load(EXTENSION_SRC, "voxflame_main_python", "extension.py")
+    (dest,) = re.findall(r'send_cmd\(ten_env, "update_profile", "(\w+)"', source)
+
+    graph = _graph()
+    nodes = {node["name"]: node["addon"] for node in graph["nodes"]}
+    assert nodes[dest] == "llm_correction_python"
+    routes = [
+        d["extension"]
+        for connection in graph["connections"]
+        if connection["extension"] == "main_control"
+        for cmd in connection.get("cmd", [])
+        if cmd["name"] == "update_profile"
+        for d in cmd["dest"]
+    ]
+    assert routes == [dest]
+
+    manifest = json.loads(_load(EXTENSION_SRC, "llm_correction_python", "manifest.json"))
+    (cmd,) = [c for c in manifest["api"]["cmd_in"] if c["name"] == "update_profile"]
+    assert cmd["property"]["client_id"]["type"] == "string"
+
+
+def test_profile_reaches_only_that_clients_prompts():
+    corrector = LLMCorrector(
+        api_key="test",
+        base_url="http://127.0.0.1:1/v1",
+        model="test",
+        max_tokens=64,
+        temperature=0.0,
+        system_prompt="纠正语音识别结果",
+        user_profile="",
+        vocabulary=["康复"],
+        ten_env=_Env(),
+    )
+    # As main_control sends it from system_init, through the cmd's JSON
+    payload = json.loads(
+        json.dumps(
+            {
+                "user_profile": {
+                    "email": "a@example.com",
+                    "name": "小明",
+                    "vocabulary": ["喝水"],
+                },
+                "client_id": "10.0.0.1:40000",
+            }
+        )
+    )
+    corrector.update_user_profile(payload["user_profile"], payload["client_id"])
+
+    prompt = corrector.prompts.build("我要喝睡", session_id="10.0.0.1:40000")
+    assert "邮箱: a@example.com" in prompt.system
+    assert "昵称: 小明" in prompt.system
+    assert "喝水、康复" in prompt.system
+
+    other = corrector.prompts.build("我要喝睡", session_id="10.0.0.1:40001")
+    assert "a@example.com" not in other.system
+    assert "喝水" not in other.system
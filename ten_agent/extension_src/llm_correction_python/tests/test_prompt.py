@@ -0,0 +1,135 @@
+#
+# VoxFlame LLM Correction Extension
+# Copyright (c) 2025 VoxFlame. All rights reserved.
+#
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from llm_correction_python.prompt import (  # noqa: E402
+    ASR_SECTION,
+    CONTEXT_LINE,
+    CONTEXT_SECTION,
+    HINTS_SECTION,
+    PromptBuilder,
+    estimate_tokens,
+)
+
+TURNS = [
+    {"original": "我要喝睡", "corrected": "我要喝水"},
+    {"original": "打开电丝", "corrected": "打开电视"},
+    {"original": "我想水觉", "corrected": "我想睡觉"},
+]
+HINTS = ["我要喝水", "我要睡觉"]
+
+
+def _builder(max_prompt_tokens=100000, **kwargs):
+    return PromptBuilder(
+        "纠正语音识别结果",
+        vocabulary=["康复"],
+        user_profile="昵称: 小明",
+        max_prompt_tokens=max_prompt_tokens,
+        **kwargs,
+    )
+
+
+
+def _budget_for(asr_text, turns, hints):
+    """Smallest max_prompt_tokens that keeps these turns and hints"""
+    builder = _builder()
+    context = CONTEXT_SECTION.format(
+        "\n".join(CONTEXT_LINE.format(t["original"], t["corrected"]) for t in turns)
+    )
+    hints = HINTS_SECTION.format("\n".join(f"- {h}" for h in hints))
+    return (
+        builder.system_tokens
+        + estimate_tokens(builder.build(asr_text).static)
+        + estimate_tokens(ASR_SECTION.format(asr_text))
+        + estimate_tokens((context if turns else "") + hints)
+    )
+
+
+def test_everything_fits_within_budget():
+    prompt = _builder().build("我要喝睡", TURNS, HINTS)
+    assert prompt.system.startswith("纠正语音识别结果\n\n## 用户信息\n昵称: 小明")
+    assert "康复" in prompt.static
+    for turn in TURNS:
+        assert turn["original"] in prompt.user
+    assert "- 我要睡觉" in prompt.user
+    assert prompt.user.endswith("## 语音识别结果\n我要喝睡\n\n## 纠正后的文本")
+
+
+def test_oldest_turns_are_dropped_first():
+    budget = _budget_for("我要喝睡", TURNS[1:], HINTS)
+    prompt = _builder(budget).build("我要喝睡", TURNS, HINTS)
+
+    assert "我要喝睡 ->" not in prompt.user  # The oldest turn
+    assert "打开电丝" in prompt.user and "我想水觉" in prompt.user
+    assert "- 我要喝水" in prompt.user
+
+    budget = _budget_for("我要喝睡", [], HINTS)
+    prompt = _builder(budget).build("我要喝睡", TURNS, HINTS)
+    assert "## 最近对话" not in prompt.user
+    assert "## 可能的常用短语" in prompt.user
+
+
+def test_hints_are_dropped_after_all_turns():
+    budget = _budget_for("我要喝睡", [], HINTS) - 1
+    prompt = _builder(budget).build("我要喝睡", TURNS, HINTS)
+
+    assert "## 最近对话" not in prompt.user
+    assert "## 可能的常用短语" not in prompt.user
+    # The system part and the ASR text are never dropped
+    assert prompt.system.startswith("纠正语音识别结果")
+    assert "我要喝睡" in prompt.user
+
+    tiny = _builder(1).build("我要喝睡", TURNS, HINTS)
+    assert tiny.tokens > 1
+    assert tiny.user == "## 语音识别结果\n我要喝睡\n\n## 纠正后的文本"
+
+
+def test_only_recent_turns_are_used():
+    prompt = _builder(max_context_turns=2).build("好的", TURNS)
+    assert "我要喝睡 ->" not in prompt.user
+    assert "打开电丝" in prompt.user
+
+
+def test_update_session_only_invalidates_that_session():
+    builder = _builder()
+    builder.update_session("a", profile="昵称: 小红")
+    builder.update_session("b", profile="昵称: 小刚", vocabulary=["散步"])
+    b_prompt = builder.build("你好", session_id="b")
+    b_prefix = builder._session("b")
+
+    builder.update_session("a", vocabulary=["喝水"])
+
+    a_prompt = builder.build("你好", session_id="a")
+    assert "昵称: 小红" in a_prompt.system  # Profile kept
+    assert "喝水" in a_prompt.system and "康复" not in a_prompt.system
+    # b keeps its prefix object and the static text built for it
+    assert builder._session("b") is b_prefix
+    assert builder.build("你好", session_id="b").system == b_prompt.system
+    assert "小红" not in b_prompt.system
+    # Unknown sessions use the default prefix
+    assert builder.build("你好", session_id="c").system == builder.build("你好").system
+
+
+def test_default_session_update_does_not_touch_client_sessions():
+    builder = _builder()
+    builder.update_session("a", profile="昵称: 小红")
+    builder.update_session(profile="昵称: 默认")
+
+    assert builder.profile() == "昵称: 默认"
+    assert builder.profile("a") == "昵称: 小红"
+    assert builder.profile("unknown") == "昵称: 默认"
+
+
+def test_sessions_beyond_max_sessions_are_evicted():
+    builder = _builder(max_sessions=2)
+    for session_id in ("a", "b", "c"):
+        builder.update_session(session_id, profile=f"昵称: {session_id}")
+
+    assert builder.profile("a") == "昵称: 小明"  # Back to the default
+    assert builder.profile("b") == "昵称: b"
+    assert builder.profile("c") == "昵称: c"
@@ -0,0 +1,48 @@
+#
+# VoxFlame LLM Correction Extension
+# Copyright (c) 2025 VoxFlame. All rights reserved.
+#
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from llm_correction_python.speculation import Speculator  # noqa: E402
+
+
+def test_final_reuses_speculation_of_stable_interim():
+    calls = []
+
+    async def correct(text):
+        calls.append(text)
+        return "我要喝水"
+
+    async def test():
+        speculator = Speculator(stable_s=0.01)
+        # Interims as main_control forwards them; repeats keep the speculation
+        for interim in ("我要", "我要喝睡", "我要喝睡"):
+            speculator.update("a", interim, lambda t=interim: correct(t))
+        await asyncio.sleep(0.05)
+
+        assert await speculator.take("a", "我要喝睡。") == "我要喝水"
+        assert calls == ["我要喝睡"]
+        assert speculator.stats.hits == 1
+
+    asyncio.run(test())
+
+
+def test_changed_final_does_not_reuse_speculation():
+    async def correct():
+        return "我要喝水"
+
+    async def test():
+        speculator = Speculator(stable_s=0.01)
+        speculator.update("a", "我要喝睡", correct)
+        await asyncio.sleep(0.05)
+
+        assert await speculator.take("a", "我要睡觉") is None
+        assert await speculator.take("b", "我要喝睡") is None
+        assert speculator.stats.mismatches == 1
+
+    asyncio.run(test())
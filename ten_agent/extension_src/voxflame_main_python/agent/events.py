@@ -49,6 +49,15 @@ class CorrectedTextEvent(AgentEventBase):
     name: Literal["corrected_text"] = "corrected_text"
     original_text: str
     corrected_text: str
+    # Streaming: partials carry the new clause in chunk
+    is_final: bool = True
+    chunk: str = ""
+    utterance_id: str = ""
+    streamed: bool = False
+    # Latency budget: ASR text sent in place of the correction, which
+    # follows as a display-only update
+    budget_exceeded: bool = False
+    is_update: bool = False
     metadata: Dict[str, Any] = {}
 
 
@@ -3,7 +3,7 @@
 #
 
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Optional, List, Literal
 
 
 class VoxFlameMainConfig(BaseModel):
@@ -17,11 +17,24 @@ class VoxFlameMainConfig(BaseModel):
 
     # LLM correction settings
     enable_correction: bool = True
+    # Also forward interim ASR results (is_final=False), so a corrector with
+    # speculative on can correct stable hypotheses before the final arrives.
+    # Off by default; enable both in the graph to use speculation.
+    forward_interim: bool = False
 
     # Interrupt settings - interrupt TTS when user speaks
     enable_interrupt: bool = True
     interrupt_threshold_ms: int = 200  # Min speech duration to trigger interrupt
 
+    # Per-client sessions
+    max_history_length: int = 10  # Conversation turns kept per session
+    session_idle_timeout_s: int = 1800  # Drop disconnected sessions idle this long
+
+    # Logging (voxflame_common.log)
+    log_level: Literal["debug", "info", "warn", "error"] = "info"
+    log_frame_summaries: bool = True  # Per-message lines at debug, summarized at info
+    log_summary_interval_s: float = 10.0
+
     # User profile for personalization
     user_id: str = ""
     user_name: str = ""
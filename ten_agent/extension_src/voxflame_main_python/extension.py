@@ -6,6 +6,7 @@
 import asyncio
 import time
 import json
+import uuid
 from typing import Optional, Dict, Any
 
 from ten_runtime import (
@@ -17,8 +18,24 @@ from ten_runtime import (
     StatusCode,
 )
 
+from voxflame_common.log import Log
+from voxflame_common.metrics import registry
+from voxflame_common.tracing import ASR_FINAL, TTS_REQUEST, TraceContext
+
 from .config import VoxFlameMainConfig
 from .helper import send_cmd, send_data, broadcast_data
+from .session import Session, SessionRegistry
+
+TTS_FLUSHES = registry.counter(
+    "voxflame_tts_flushes_total", "TTS playback interrupted by user speech"
+)
+ASR_FINALS = registry.counter(
+    "voxflame_asr_final_total", "Final ASR results handled"
+)
+ERRORS = registry.counter(
+    "voxflame_errors_total", "Errors caught by the extensions",
+    extension="main_control",
+)
 
 
 class VoxFlameMainExtension(AsyncExtension):
@@ -29,7 +46,7 @@ class VoxFlameMainExtension(AsyncExtension):
     1. Coordinate data flow between ASR -> Corrector -> TTS
     2. Handle user speech interruption (flush TTS when user speaks)
     3. Send transcripts to WebSocket for frontend display
-    4. Manage conversation state and history
+    4. Manage per-client conversation state and history (SessionRegistry)
     """
 
     def __init__(self, name: str):
@@ -37,19 +54,11 @@ class VoxFlameMainExtension(AsyncExtension):
         self.ten_env: AsyncTenEnv = None
         self.config: VoxFlameMainConfig = None
         self.stopped: bool = False
+        self.log: Optional[Log] = None
 
-        # State tracking
-        self.is_tts_playing: bool = False
-        self.current_tts_request_id: Optional[str] = None
-        self.last_user_speech_time: int = 0
-        self.user_connected: bool = False
-
-        # Conversation history for context
-        self.conversation_history: list = []
-        self.max_history_length: int = 10
-
-        # User profile from authentication
-        self.user_profile: Optional[Dict[str, Any]] = None
+        # Per-client state (history, TTS playback, profile) keyed by client_id
+        self.sessions: SessionRegistry = SessionRegistry()
+        self._session_gc_task: Optional[asyncio.Task] = None
 
     async def on_init(self, ten_env: AsyncTenEnv) -> None:
         """Initialize the extension."""
@@ -66,14 +75,37 @@ class VoxFlameMainExtension(AsyncExtension):
             ten_env.log_warn(f"[VoxFlameMain] Failed to load config, using defaults: {e}")
             self.config = VoxFlameMainConfig()
 
+        self.log = Log(
+            ten_env,
+            level=self.config.log_level,
+            prefix="[VoxFlameMain] ",
+            frame_summaries=self.config.log_frame_summaries,
+            summary_interval_s=self.config.log_summary_interval_s,
+        )
+        self.sessions = SessionRegistry(
+            max_history_length=self.config.max_history_length,
+            idle_timeout_s=self.config.session_idle_timeout_s,
+        )
+
     async def on_start(self, ten_env: AsyncTenEnv) -> None:
         """Called when extension starts."""
+        self._session_gc_task = asyncio.create_task(self._session_gc_loop(ten_env))
+        sessions = self.sessions
+        registry.gauge_func(
+            "voxflame_sessions", "Client sessions held by main_control",
+            lambda: len(sessions),
+        )
         ten_env.log_info("[VoxFlameMain] Started")
 
     async def on_stop(self, ten_env: AsyncTenEnv) -> None:
         """Called when extension stops."""
         ten_env.log_info("[VoxFlameMain] Stopping...")
         self.stopped = True
+        if self._session_gc_task:
+            self._session_gc_task.cancel()
+            self._session_gc_task = None
+        if self.log:
+            self.log.flush()
 
     async def on_deinit(self, ten_env: AsyncTenEnv) -> None:
         """Cleanup resources."""
@@ -86,6 +118,7 @@ class VoxFlameMainExtension(AsyncExtension):
         Supported commands:
         - on_user_connected: User connected via WebSocket
         - on_user_disconnected: User disconnected
+        - system_init: User context forwarded by websocket_server
         - flush: Interrupt current TTS playback
         """
         cmd_name = cmd.get_name()
@@ -93,15 +126,23 @@ class VoxFlameMainExtension(AsyncExtension):
 
         try:
             if cmd_name == "on_user_connected":
-                await self._handle_user_connected(ten_env)
+                await self._handle_user_connected(ten_env, self._get_cmd_client_id(cmd))
                 await ten_env.return_result(CmdResult.create(StatusCode.OK, cmd))
 
             elif cmd_name == "on_user_disconnected":
-                await self._handle_user_disconnected(ten_env)
+                await self._handle_user_disconnected(ten_env, self._get_cmd_client_id(cmd))
+                await ten_env.return_result(CmdResult.create(StatusCode.OK, cmd))
+
+            elif cmd_name == "system_init":
+                cmd_json, _ = cmd.get_property_to_json(None)
+                init_data = json.loads(cmd_json) if cmd_json else {}
+                await self._handle_system_init(
+                    ten_env, init_data, self._get_cmd_client_id(cmd)
+                )
                 await ten_env.return_result(CmdResult.create(StatusCode.OK, cmd))
 
             elif cmd_name == "flush":
-                await self._handle_flush(ten_env)
+                await self._handle_flush(ten_env, self._get_cmd_client_id(cmd))
                 await ten_env.return_result(CmdResult.create(StatusCode.OK, cmd))
 
             else:
@@ -109,6 +150,7 @@ class VoxFlameMainExtension(AsyncExtension):
                 await ten_env.return_result(CmdResult.create(StatusCode.OK, cmd))
 
         except Exception as e:
+            ERRORS.inc()
             ten_env.log_error(f"[VoxFlameMain] Error handling cmd {cmd_name}: {e}")
             await ten_env.return_result(CmdResult.create(StatusCode.ERROR, cmd))
 
@@ -140,63 +182,94 @@ class VoxFlameMainExtension(AsyncExtension):
                 await self._handle_tts_end(ten_env, data)
 
             elif data_name == "system_init":
-                await self._handle_system_init(ten_env, data)
+                data_json, _ = data.get_property_to_json(None)
+                init_data = json.loads(data_json) if data_json else {}
+                await self._handle_system_init(
+                    ten_env, init_data, self._get_client_id(init_data)
+                )
 
             else:
-                ten_env.log_debug(f"[VoxFlameMain] Unhandled data: {data_name}")
+                self.log.debug("Unhandled data: %s", data_name)
 
         except Exception as e:
+            ERRORS.inc()
             ten_env.log_error(f"[VoxFlameMain] Error handling data {data_name}: {e}")
 
     # ========================================
     # Command Handlers
     # ========================================
 
-    async def _handle_user_connected(self, ten_env: AsyncTenEnv) -> None:
+    async def _handle_user_connected(
+        self, ten_env: AsyncTenEnv, client_id: Optional[str] = None
+    ) -> None:
         """Handle user connection."""
-        ten_env.log_info("[VoxFlameMain] User connected")
-        self.user_connected = True
-        self.conversation_history = []
+        # A reconnect with the same client_id starts a fresh conversation
+        self.sessions.remove(client_id)
+        session = self.sessions.get_or_create(client_id)
+        session.connected = True
+        ten_env.log_info(
+            f"[VoxFlameMain] User connected: {client_id} (sessions: {len(self.sessions)})"
+        )
 
         # Send greeting if enabled
         if self.config.enable_greeting and self.config.greeting:
             ten_env.log_info(f"[VoxFlameMain] Sending greeting: {self.config.greeting}")
             # Send greeting text to TTS
-            await self._send_text_to_tts(ten_env, self.config.greeting)
+            await self._send_text_to_tts(ten_env, self.config.greeting, client_id)
             # Also send to WebSocket for display
-            await self._send_to_websocket(ten_env, "assistant", self.config.greeting, is_final=True)
+            await self._send_to_websocket(
+                ten_env, "assistant", self.config.greeting, is_final=True, client_id=client_id
+            )
 
-    async def _handle_user_disconnected(self, ten_env: AsyncTenEnv) -> None:
+    async def _handle_user_disconnected(
+        self, ten_env: AsyncTenEnv, client_id: Optional[str] = None
+    ) -> None:
         """Handle user disconnection."""
-        ten_env.log_info("[VoxFlameMain] User disconnected")
-        self.user_connected = False
+        session = self.sessions.get(client_id)
+        if session is None:
+            ten_env.log_info(f"[VoxFlameMain] User disconnected: {client_id} (no session)")
+            return
 
-        # Flush any ongoing TTS
-        if self.is_tts_playing:
-            await self._flush_tts(ten_env)
+        # Flush any ongoing TTS and pending corrections of this user only
+        await self._flush_tts(ten_env, session)
+        await self._cancel_corrections(ten_env, session)
+        self.sessions.remove(client_id)
+        ten_env.log_info(
+            f"[VoxFlameMain] User disconnected: {client_id} (sessions: {len(self.sessions)})"
+        )
 
-    async def _handle_flush(self, ten_env: AsyncTenEnv) -> None:
-        """Handle flush command - interrupt TTS."""
-        ten_env.log_info("[VoxFlameMain] Flush command received")
-        await self._flush_tts(ten_env)
+    async def _handle_flush(
+        self, ten_env: AsyncTenEnv, client_id: Optional[str] = None
+    ) -> None:
+        """Handle flush command - interrupt TTS of one client, or of all."""
+        ten_env.log_info(f"[VoxFlameMain] Flush command received: {client_id or 'all'}")
+        if client_id:
+            session = self.sessions.get(client_id)
+            if session is not None:
+                await self._flush_tts(ten_env, session)
+            return
+        for session in self.sessions:
+            await self._flush_tts(ten_env, session)
 
     # ========================================
     # Data Handlers
     # ========================================
 
-    async def _handle_system_init(self, ten_env: AsyncTenEnv, data: Data) -> None:
+    async def _handle_system_init(
+        self,
+        ten_env: AsyncTenEnv,
+        init_data: Dict[str, Any],
+        client_id: Optional[str] = None,
+    ) -> None:
         """
         Handle system initialization with user context.
         Received from Backend Proxy upon connection.
         """
         try:
-            data_json, _ = data.get_property_to_json(None)
-            init_data = json.loads(data_json) if data_json else {}
-
             user = init_data.get("user")
             if user:
-                # Store user profile
-                self.user_profile = user
+                # Store user profile on the client's session
+                self.sessions.get_or_create(client_id).user_profile = user
 
                 email = user.get('email', 'unknown')
                 name = user.get('name', '')
@@ -210,14 +283,16 @@ class VoxFlameMainExtension(AsyncExtension):
 
                 # Update LLM Corrector with user profile
                 try:
-                    await send_cmd(ten_env, "update_profile", "llm_correction_python", {
-                        "user_profile": user
+                    await send_cmd(ten_env, "update_profile", "corrector", {
+                        "user_profile": user,
+                        "client_id": client_id or "",
                     })
                     ten_env.log_info("[VoxFlameMain] Sent user profile to LLM Corrector")
                 except Exception as e:
                     ten_env.log_warn(f"[VoxFlameMain] Failed to update LLM Corrector profile: {e}")
 
         except Exception as e:
+            ERRORS.inc()
             ten_env.log_error(f"[VoxFlameMain] Error handling system_init: {e}")
 
     async def _handle_asr_result(self, ten_env: AsyncTenEnv, data: Data) -> None:
@@ -226,7 +301,8 @@ class VoxFlameMainExtension(AsyncExtension):
 
         Key logic:
         1. If user is speaking and TTS is playing -> Interrupt TTS
-        2. Forward ASR result to corrector for LLM correction
+        2. Forward ASR result to corrector for LLM correction (interims
+           too with forward_interim, for speculative correction)
         3. Send interim results to WebSocket for real-time display
         """
         try:
@@ -235,37 +311,53 @@ class VoxFlameMainExtension(AsyncExtension):
 
             text = asr_data.get("text", "")
             is_final = asr_data.get("is_final", asr_data.get("final", False))
+            client_id = self._get_client_id(asr_data)
 
             if not text:
                 return
 
-            ten_env.log_info(f"[VoxFlameMain] ASR result: '{text}' (final={is_final})")
+            self.log.frame("asr_result", "ASR result: '%s' (final=%s)", text, is_final)
 
-            # Update last speech time
-            self.last_user_speech_time = int(time.time() * 1000)
+            session = self.sessions.get_or_create(client_id)
+            session.last_user_speech_time = int(time.time() * 1000)
 
-            # Check if we should interrupt TTS
-            if self.config.enable_interrupt and self.is_tts_playing:
+            # Only this user's own TTS is interrupted
+            if self.config.enable_interrupt and session.is_tts_playing:
                 ten_env.log_info("[VoxFlameMain] User speaking while TTS playing - interrupting")
-                await self._flush_tts(ten_env)
+                await self._flush_tts(ten_env, session)
 
             # Send interim text to WebSocket for real-time display
-            await self._send_to_websocket(ten_env, "user", text, is_final=is_final)
+            await self._send_to_websocket(
+                ten_env, "user", text, is_final=is_final, client_id=client_id
+            )
+
+            if is_final:
+                ASR_FINALS.inc()
 
             # If final result, forward to corrector
             if is_final and self.config.enable_correction:
                 ten_env.log_info(f"[VoxFlameMain] Forwarding to corrector: '{text}'")
-                await self._forward_to_corrector(ten_env, text, asr_data)
+                # STT echoes the trace websocket_server put on the audio;
+                # without it the trace starts here
+                trace = (TraceContext.find(asr_data) or TraceContext.new()).mark(ASR_FINAL)
+                await self._forward_to_corrector(
+                    ten_env, text, asr_data, client_id, trace
+                )
 
                 # Add to conversation history
-                self.conversation_history.append({
-                    "role": "user",
-                    "content": text,
-                    "timestamp": self.last_user_speech_time
-                })
-                self._trim_history()
+                session.add_history("user", text)
+            elif (
+                not is_final
+                and self.config.enable_correction
+                and self.config.forward_interim
+            ):
+                # Lets the corrector start on a stable hypothesis early
+                await self._forward_to_corrector(
+                    ten_env, text, asr_data, client_id, is_final=False
+                )
 
         except Exception as e:
+            ERRORS.inc()
             ten_env.log_error(f"[VoxFlameMain] Error handling ASR result: {e}")
 
     async def _handle_corrected_text(self, ten_env: AsyncTenEnv, data: Data) -> None:
@@ -275,6 +367,14 @@ class VoxFlameMainExtension(AsyncExtension):
         Forward to:
         1. TTS for speech synthesis
         2. WebSocket for frontend display
+
+        A streaming corrector sends partials (is_final=False) carrying one
+        clause in ``chunk``; those are spoken right away under one TTS
+        request per utterance, which the final message then closes.
+
+        Corrections that missed the corrector's latency budget arrive as
+        updates (is_update=True) after the ASR text was already spoken;
+        they only replace the displayed text.
         """
         try:
             data_json, _ = data.get_property_to_json(None)
@@ -282,14 +382,43 @@ class VoxFlameMainExtension(AsyncExtension):
 
             original_text = corrected_data.get("original_text", "")
             corrected_text = corrected_data.get("corrected_text", "")
+            client_id = self._get_client_id(corrected_data)
 
             if not corrected_text:
                 return
 
+            session = self.sessions.get_or_create(client_id)
+            if not corrected_data.get("is_final", True):
+                await self._handle_correction_chunk(
+                    ten_env, session, corrected_data, client_id
+                )
+                return
+
+            if corrected_data.get("is_update"):
+                await self._handle_correction_update(
+                    ten_env, session, corrected_data, client_id
+                )
+                return
+
             ten_env.log_info(f"[VoxFlameMain] Corrected: '{original_text}' -> '{corrected_text}'")
 
-            # Send corrected text to TTS
-            await self._send_text_to_tts(ten_env, corrected_text)
+            if corrected_data.get("streamed"):
+                # The chunks were already spoken; close the TTS request
+                request_id = session.stream_requests.pop(
+                    corrected_data.get("utterance_id", ""), None
+                )
+                if request_id:
+                    await self._send_text_to_tts(
+                        ten_env, "", client_id, request_id=request_id
+                    )
+            else:
+                # Send corrected text to TTS
+                await self._send_text_to_tts(
+                    ten_env,
+                    corrected_text,
+                    client_id,
+                    trace=TraceContext.find(corrected_data),
+                )
 
             # Send to WebSocket for display (as assistant response showing correction)
             await self._send_to_websocket(
@@ -297,21 +426,87 @@ class VoxFlameMainExtension(AsyncExtension):
                 "assistant",
                 corrected_text,
                 is_final=True,
-                metadata={"original": original_text, "type": "correction"}
+                metadata={"original": original_text, "type": "correction"},
+                client_id=client_id,
             )
 
             # Add to conversation history
-            self.conversation_history.append({
-                "role": "assistant",
-                "content": corrected_text,
-                "original": original_text,
-                "timestamp": int(time.time() * 1000)
-            })
-            self._trim_history()
+            session.add_history("assistant", corrected_text, original=original_text)
 
         except Exception as e:
+            ERRORS.inc()
             ten_env.log_error(f"[VoxFlameMain] Error handling corrected text: {e}")
 
+    async def _handle_correction_update(
+        self,
+        ten_env: AsyncTenEnv,
+        session: Session,
+        corrected_data: dict,
+        client_id: Optional[str],
+    ) -> None:
+        """Show a late correction in place of the ASR text already spoken."""
+        original_text = corrected_data.get("original_text", "")
+        corrected_text = corrected_data.get("corrected_text", "")
+        ten_env.log_info(
+            f"[VoxFlameMain] Late correction: '{original_text}' -> '{corrected_text}'"
+        )
+
+        await self._send_to_websocket(
+            ten_env,
+            "assistant",
+            corrected_text,
+            is_final=True,
+            metadata={
+                "original": original_text,
+                "type": "correction_update",
+                "utterance_id": corrected_data.get("utterance_id", ""),
+            },
+            client_id=client_id,
+        )
+
+        for entry in reversed(session.conversation_history):
+            if entry["role"] == "assistant" and entry.get("original") == original_text:
+                entry["content"] = corrected_text
+                break
+
+    async def _handle_correction_chunk(
+        self,
+        ten_env: AsyncTenEnv,
+        session: Session,
+        corrected_data: dict,
+        client_id: Optional[str],
+    ) -> None:
+        """Speak one streamed clause and show the text corrected so far."""
+        utterance_id = corrected_data.get("utterance_id", "")
+        chunk = corrected_data.get("chunk", "")
+
+        if chunk:
+            if utterance_id not in session.stream_requests:
+                session.stream_requests[utterance_id] = self._new_request_id()
+            request_id = session.stream_requests[utterance_id]
+            # None: the user interrupted this utterance, keep it silent
+            if request_id:
+                await self._send_text_to_tts(
+                    ten_env,
+                    chunk,
+                    client_id,
+                    request_id=request_id,
+                    text_input_end=False,
+                    trace=TraceContext.find(corrected_data),
+                )
+
+        await self._send_to_websocket(
+            ten_env,
+            "assistant",
+            corrected_data.get("corrected_text", ""),
+            is_final=False,
+            metadata={
+                "original": corrected_data.get("original_text", ""),
+                "type": "correction",
+            },
+            client_id=client_id,
+        )
+
     async def _handle_interim_text(self, ten_env: AsyncTenEnv, data: Data) -> None:
         """Handle interim (non-final) ASR text for real-time display."""
         try:
@@ -320,9 +515,13 @@ class VoxFlameMainExtension(AsyncExtension):
 
             text = interim_data.get("text", "")
             if text:
-                await self._send_to_websocket(ten_env, "user", text, is_final=False)
+                await self._send_to_websocket(
+                    ten_env, "user", text, is_final=False,
+                    client_id=self._get_client_id(interim_data),
+                )
 
         except Exception as e:
+            ERRORS.inc()
             ten_env.log_error(f"[VoxFlameMain] Error handling interim text: {e}")
 
     async def _handle_tts_start(self, ten_env: AsyncTenEnv, data: Data) -> None:
@@ -331,65 +530,181 @@ class VoxFlameMainExtension(AsyncExtension):
             data_json, _ = data.get_property_to_json(None)
             tts_data = json.loads(data_json) if data_json else {}
 
-            self.is_tts_playing = True
-            self.current_tts_request_id = tts_data.get("request_id", "")
-            ten_env.log_info(f"[VoxFlameMain] TTS started: {self.current_tts_request_id}")
+            session = self._get_tts_session(tts_data)
+            if session is None:
+                ten_env.log_debug(f"[VoxFlameMain] TTS start for unknown session: {tts_data}")
+                return
+            session.is_tts_playing = True
+            session.current_tts_request_id = tts_data.get("request_id", "")
+            ten_env.log_info(
+                f"[VoxFlameMain] TTS started: {session.current_tts_request_id} "
+                f"(client {session.client_id or '-'})"
+            )
 
         except Exception as e:
+            ERRORS.inc()
             ten_env.log_error(f"[VoxFlameMain] Error handling TTS start: {e}")
 
     async def _handle_tts_end(self, ten_env: AsyncTenEnv, data: Data) -> None:
         """Handle TTS playback end."""
         try:
-            self.is_tts_playing = False
-            self.current_tts_request_id = None
-            ten_env.log_info("[VoxFlameMain] TTS ended")
+            data_json, _ = data.get_property_to_json(None)
+            tts_data = json.loads(data_json) if data_json else {}
+
+            session = self._get_tts_session(tts_data)
+            self.sessions.release_request(tts_data.get("request_id"))
+            if session is None:
+                return
+            # Later sentences of the same session may still be queued
+            if not session.tts_requests:
+                session.is_tts_playing = False
+                session.current_tts_request_id = None
+            ten_env.log_info(f"[VoxFlameMain] TTS ended (client {session.client_id or '-'})")
 
         except Exception as e:
+            ERRORS.inc()
             ten_env.log_error(f"[VoxFlameMain] Error handling TTS end: {e}")
 
     # ========================================
     # Helper Methods
     # ========================================
 
-    async def _flush_tts(self, ten_env: AsyncTenEnv) -> None:
-        """Send flush command to TTS to interrupt playback."""
-        if not self.is_tts_playing:
+    async def _flush_tts(self, ten_env: AsyncTenEnv, session: Session) -> None:
+        """Send flush command to TTS to interrupt one session's playback."""
+        if not session.is_tts_playing:
             return
 
-        ten_env.log_info("[VoxFlameMain] Flushing TTS...")
+        ten_env.log_info(f"[VoxFlameMain] Flushing TTS for {session.client_id or '-'}...")
         try:
-            # Send flush command to TTS extension
-            await send_cmd(ten_env, "flush", "tts")
-            self.is_tts_playing = False
-            self.current_tts_request_id = None
+            # client_id/request_id let TTS scope the flush to this session
+            await send_cmd(ten_env, "flush", "tts", {
+                "client_id": session.client_id,
+                "request_id": session.current_tts_request_id or "",
+            })
+            TTS_FLUSHES.inc()
+            session.is_tts_playing = False
+            session.current_tts_request_id = None
+            for request_id in list(session.tts_requests):
+                self.sessions.release_request(request_id)
+            # Chunks of interrupted utterances that are still streaming in
+            # must not restart playback
+            for utterance_id in session.stream_requests:
+                session.stream_requests[utterance_id] = None
         except Exception as e:
+            ERRORS.inc()
             ten_env.log_error(f"[VoxFlameMain] Error flushing TTS: {e}")
 
-    async def _send_text_to_tts(self, ten_env: AsyncTenEnv, text: str) -> None:
-        """Send text to TTS for synthesis."""
-        request_id = f"voxflame_{int(time.time() * 1000)}"
-        ten_env.log_info(f"[VoxFlameMain] Sending to TTS: '{text}' (request_id={request_id})")
+        # Corrections still in flight would talk over the interruption
+        await self._cancel_corrections(ten_env, session)
+
+    async def _cancel_corrections(self, ten_env: AsyncTenEnv, session: Session) -> None:
+        """Cancel the corrector's in-flight corrections of one session."""
         try:
-            # Use send_data to directly send to TTS extension
-            await send_data(ten_env, "tts_text_input", "tts", {
+            await send_cmd(ten_env, "flush", "corrector", {"client_id": session.client_id})
+        except Exception as e:
+            ERRORS.inc()
+            ten_env.log_error(f"[VoxFlameMain] Error flushing corrector: {e}")
+
+    def _get_tts_session(self, tts_data: dict) -> Optional[Session]:
+        """Find the session a tts_audio_start/end belongs to."""
+        session = self.sessions.session_for_request(tts_data.get("request_id"))
+        if session is None:
+            session = self.sessions.get(self._get_client_id(tts_data))
+        return session
+
+    async def _session_gc_loop(self, ten_env: AsyncTenEnv) -> None:
+        """Drop sessions whose client went away without a disconnect."""
+        interval = max(1.0, self.config.session_idle_timeout_s / 10)
+        while not self.stopped:
+            await asyncio.sleep(interval)
+            expired = self.sessions.expire_idle()
+            if expired:
+                ten_env.log_info(
+                    f"[VoxFlameMain] Expired {len(expired)} idle sessions "
+                    f"(remaining: {len(self.sessions)})"
+                )
+
+    @staticmethod
+    def _new_request_id() -> str:
+        # Unique across sessions, so TTS events map back to their session
+        return f"voxflame_{int(time.time() * 1000)}_{uuid.uuid4().hex[:8]}"
+
+    async def _send_text_to_tts(
+        self,
+        ten_env: AsyncTenEnv,
+        text: str,
+        client_id: Optional[str] = None,
+        request_id: Optional[str] = None,
+        text_input_end: bool = True,
+        trace: Optional[TraceContext] = None,
+    ) -> None:
+        """
+        Send text to TTS for synthesis.
+
+        Streamed corrections reuse one request_id per utterance and only set
+        text_input_end on the last (possibly empty) piece.
+        """
+        if trace is not None:
+            trace.mark(TTS_REQUEST)
+        request_id = request_id or self._new_request_id()
+        self.sessions.bind_request(request_id, self.sessions.get_or_create(client_id))
+        self.log.frame(
+            "tts_text", "Sending to TTS: '%s' (request_id=%s)", text, request_id
+        )
+        try:
+            # Use send_data to directly send to TTS extension.
+            # metadata.client_id is echoed on the TTS audio frames so that
+            # websocket_server can route the audio to the owning socket;
+            # metadata.trace lets it finish the utterance's latency trace.
+            payload = {
                 "text": text,
-                "text_input_end": True,
+                "text_input_end": text_input_end,
                 "request_id": request_id
-            })
-            ten_env.log_info(f"[VoxFlameMain] TTS data sent successfully")
+            }
+            metadata = {}
+            if client_id:
+                metadata["client_id"] = client_id
+            if trace is not None:
+                metadata["trace"] = trace.to_dict()
+            if metadata:
+                payload["metadata"] = metadata
+            await send_data(ten_env, "tts_text_input", "tts", payload)
+            self.log.debug("TTS data sent successfully")
         except Exception as e:
+            ERRORS.inc()
             ten_env.log_error(f"[VoxFlameMain] Error sending to TTS: {e}")
 
-    async def _forward_to_corrector(self, ten_env: AsyncTenEnv, text: str, metadata: dict) -> None:
-        """Forward ASR result to LLM corrector."""
+    async def _forward_to_corrector(
+        self,
+        ten_env: AsyncTenEnv,
+        text: str,
+        metadata: dict,
+        client_id: Optional[str] = None,
+        trace: Optional[TraceContext] = None,
+        is_final: bool = True,
+    ) -> None:
+        """
+        Forward ASR result to LLM corrector.
+
+        Interim results are only used for speculative correction; they are
+        already on the frontend, so the corrector must not echo them back
+        (display=False).
+        """
         try:
-            await broadcast_data(ten_env, "asr_result", {
+            payload = {
                 "text": text,
-                "is_final": True,
+                "is_final": is_final,
                 "metadata": metadata
-            })
+            }
+            if not is_final:
+                payload["display"] = False
+            if client_id:
+                payload["client_id"] = client_id
+            if trace is not None:
+                payload["trace"] = trace.to_dict()
+            await broadcast_data(ten_env, "asr_result", payload)
         except Exception as e:
+            ERRORS.inc()
             ten_env.log_error(f"[VoxFlameMain] Error forwarding to corrector: {e}")
 
     async def _send_to_websocket(
@@ -398,7 +713,8 @@ class VoxFlameMainExtension(AsyncExtension):
         role: str,
         text: str,
         is_final: bool = True,
-        metadata: dict = None
+        metadata: dict = None,
+        client_id: Optional[str] = None
     ) -> None:
         """Send transcript to WebSocket for frontend display."""
         try:
@@ -411,13 +727,39 @@ class VoxFlameMainExtension(AsyncExtension):
             }
             if metadata:
                 payload["metadata"] = metadata
+            # Without client_id websocket_server falls back to broadcasting
+            if client_id:
+                payload["client_id"] = client_id
 
             await send_data(ten_env, "transcript", "websocket_server", payload)
         except Exception as e:
+            ERRORS.inc()
             ten_env.log_error(f"[VoxFlameMain] Error sending to WebSocket: {e}")
 
-    
-    def _trim_history(self) -> None:
-        """Trim conversation history to max length."""
-        if len(self.conversation_history) > self.max_history_length:
-            self.conversation_history = self.conversation_history[-self.max_history_length:]
+    @staticmethod
+    def _get_client_id(payload: dict) -> Optional[str]:
+        """
+        Extract the originating WebSocket client_id from a data payload.
+
+        websocket_server stamps client_id into the audio frame metadata; STT
+        echoes that metadata on asr_result, and the corrector copies it to
+        the top level of its outputs.
+        """
+        client_id = payload.get("client_id")
+        if client_id:
+            return client_id
+        metadata = payload.get("metadata")
+        if isinstance(metadata, dict):
+            return metadata.get("client_id") or None
+        return None
+
+    @staticmethod
+    def _get_cmd_client_id(cmd: Cmd) -> Optional[str]:
+        """Read the client_id property set by websocket_server on a cmd."""
+        try:
+            client_id, err = cmd.get_property_string("client_id")
+            if err is None and client_id:
+                return client_id
+        except Exception:
+            pass
+        return None
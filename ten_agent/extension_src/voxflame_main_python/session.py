@@ -0,0 +1,130 @@
+#
+# VoxFlame Session Registry
+# Per-client conversation state for the main control extension
+#
+
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, Optional
+
+
+# Session used for messages that carry no client_id (single-user setups)
+DEFAULT_SESSION_ID = ""
+
+
+@dataclass
+class Session:
+    """State of one connected WebSocket client."""
+
+    client_id: str
+    max_history_length: int = 10
+    connected: bool = False
+
+    # TTS playback state, used for interruption
+    is_tts_playing: bool = False
+    current_tts_request_id: Optional[str] = None
+    last_user_speech_time: int = 0
+
+    # User profile from system_init
+    user_profile: Optional[Dict[str, Any]] = None
+
+    last_active: float = field(default_factory=time.monotonic)
+
+    def __post_init__(self) -> None:
+        # Bounded, so trimming is implicit
+        self.conversation_history: deque = deque(maxlen=self.max_history_length)
+        # TTS requests sent for this session that have not ended yet
+        self.tts_requests: set = set()
+        # Streamed corrections: utterance_id -> TTS request_id (None once
+        # the utterance was interrupted)
+        self.stream_requests: Dict[str, Optional[str]] = {}
+
+    def add_history(self, role: str, content: str, **extra: Any) -> None:
+        self.conversation_history.append(
+            {
+                "role": role,
+                "content": content,
+                "timestamp": int(time.time() * 1000),
+                **extra,
+            }
+        )
+
+
+class SessionRegistry:
+    """
+    Sessions keyed by client_id.
+
+    Sessions are kept in least-recently-active order, so lookups are O(1)
+    and expiring idle sessions only looks at the ones that are actually
+    idle. TTS request ids map back to their session for tts_audio_start/end.
+    """
+
+    def __init__(self, max_history_length: int = 10, idle_timeout_s: float = 600):
+        self.max_history_length = max_history_length
+        self.idle_timeout_s = idle_timeout_s
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self._requests: Dict[str, Session] = {}
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __iter__(self) -> Iterator[Session]:
+        return iter(list(self._sessions.values()))
+
+    def get(self, client_id: Optional[str]) -> Optional[Session]:
+        return self._sessions.get(client_id or DEFAULT_SESSION_ID)
+
+    def get_or_create(self, client_id: Optional[str]) -> Session:
+        """Look up a session and mark it active, creating it if needed."""
+        key = client_id or DEFAULT_SESSION_ID
+        session = self._sessions.get(key)
+        if session is None:
+            session = Session(client_id=key, max_history_length=self.max_history_length)
+            self._sessions[key] = session
+        else:
+            self._sessions.move_to_end(key)
+        session.last_active = time.monotonic()
+        return session
+
+    def remove(self, client_id: Optional[str]) -> Optional[Session]:
+        session = self._sessions.pop(client_id or DEFAULT_SESSION_ID, None)
+        if session is not None:
+            for request_id in session.tts_requests:
+                self._requests.pop(request_id, None)
+            session.tts_requests.clear()
+        return session
+
+    def bind_request(self, request_id: str, session: Session) -> None:
+        """Remember which session a TTS request belongs to."""
+        self._requests[request_id] = session
+        session.tts_requests.add(request_id)
+
+    def session_for_request(self, request_id: Optional[str]) -> Optional[Session]:
+        if not request_id:
+            return None
+        return self._requests.get(request_id)
+
+    def release_request(self, request_id: Optional[str]) -> None:
+        session = self._requests.pop(request_id, None) if request_id else None
+        if session is not None:
+            session.tts_requests.discard(request_id)
+
+    def expire_idle(self, now: Optional[float] = None) -> list:
+        """
+        Remove and return disconnected sessions idle for longer than
+        idle_timeout_s. Connected clients keep their session however long
+        they stay quiet; disconnects remove theirs right away, so this
+        catches orphans (missed disconnects, data without a connect).
+        """
+        now = time.monotonic() if now is None else now
+        expired = []
+        for session in list(self._sessions.values()):
+            if now - session.last_active < self.idle_timeout_s:
+                break
+            if session.connected:
+                # A quiet user is still a user
+                continue
+            self.remove(session.client_id)
+            expired.append(session)
+        return expired
@@ -0,0 +1,165 @@
+"""
+Audio codecs at the WebSocket boundary
+
+The graph always works on raw PCM (``pcm_frame`` AudioFrames). Clients may
+instead send and receive Opus, which cuts a 16 kHz mono stream from
+256 kbps down to ~24 kbps. Opus goes through ``opuslib`` (ctypes bindings
+to the system libopus, a pure software codec). It is optional
+(requirements-opus.txt): when it or libopus is missing only PCM is
+available and ``OPUS_UNAVAILABLE_REASON`` says why.
+
+An Opus payload (binary frame with codec OPUS, or the base64 ``audio``
+field of a JSON message) is a sequence of length-prefixed packets:
+
+    [uint16 length][packet bytes] [uint16 length][packet bytes] ...
+"""
+
+import logging
+import struct
+from typing import Optional, Union
+
+from .protocol import CodecId
+
+OPUS_UNAVAILABLE_REASON: Optional[str] = None
+try:
+    import opuslib
+except Exception as e:  # optional dependency
+    # opuslib raises a bare Exception when it cannot find libopus
+    opuslib = None
+    OPUS_UNAVAILABLE_REASON = f"{type(e).__name__}: {e}"
+    logging.getLogger(__name__).warning(
+        "Opus disabled, only PCM is available (%s)", OPUS_UNAVAILABLE_REASON
+    )
+
+
+OPUS_AVAILABLE = opuslib is not None
+
+PACKET_LENGTH = struct.Struct("!H")
+
+# Largest Opus frame is 120 ms
+MAX_OPUS_FRAME_MS = 120
+
+CODEC_NAMES = {
+    "pcm": CodecId.PCM_S16LE,
+    "pcm_s16le": CodecId.PCM_S16LE,
+    "opus": CodecId.OPUS,
+}
+
+
+class CodecError(ValueError):
+    """Raised for unknown, unavailable or undecodable codecs"""
+
+
+def codec_from_name(name: str) -> CodecId:
+    """Map a codec name from system_init / JSON messages to a CodecId"""
+    try:
+        codec = CODEC_NAMES[str(name).lower()]
+    except KeyError:
+        raise CodecError(f"Unknown codec: {name}") from None
+    if codec is CodecId.OPUS and not OPUS_AVAILABLE:
+        raise CodecError("Opus requested but opuslib is not installed")
+    return codec
+
+
+def split_packets(payload: Union[bytes, memoryview]) -> list[memoryview]:
+    """Split a length-prefixed Opus payload into packets"""
+    view = memoryview(payload)
+    packets = []
+    offset = 0
+    while offset < len(view):
+        if offset + PACKET_LENGTH.size > len(view):
+            raise CodecError("Truncated Opus packet length")
+        (length,) = PACKET_LENGTH.unpack_from(view, offset)
+        offset += PACKET_LENGTH.size
+        if offset + length > len(view):
+            raise CodecError("Truncated Opus packet")
+        packets.append(view[offset:offset + length])
+        offset += length
+    return packets
+
+
+def join_packets(packets: list[bytes]) -> bytes:
+    """Build a length-prefixed Opus payload"""
+    return b"".join(PACKET_LENGTH.pack(len(p)) + p for p in packets)
+
+
+class OpusDecoder:
+    """Per-client Opus → PCM decoder"""
+
+    def __init__(self, sample_rate: int, channels: int):
+        if not OPUS_AVAILABLE:
+            raise CodecError("opuslib is not installed")
+        self._decoder = opuslib.Decoder(sample_rate, channels)
+        self._max_frame_size = sample_rate * MAX_OPUS_FRAME_MS // 1000
+
+    def decode(self, payload: Union[bytes, memoryview]) -> bytes:
+        try:
+            return b"".join(
+                self._decoder.decode(bytes(packet), self._max_frame_size)
+                for packet in split_packets(payload)
+            )
+        except CodecError:
+            raise
+        except Exception as e:
+            raise CodecError(f"Opus decode failed: {e}") from e
+
+
+class OpusEncoder:
+    """
+    Per-client PCM → Opus encoder.
+
+    Opus only encodes whole frames, so PCM that does not fill a frame is
+    kept until more audio arrives or ``flush`` pads it with silence.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int,
+        channels: int,
+        bytes_per_sample: int,
+        frame_ms: int = 20,
+        bitrate: int = 24000,
+    ):
+        if not OPUS_AVAILABLE:
+            raise CodecError("opuslib is not installed")
+        self._encoder = opuslib.Encoder(
+            sample_rate, channels, opuslib.APPLICATION_VOIP
+        )
+        self._encoder.bitrate = bitrate
+        self._frame_samples = sample_rate * frame_ms // 1000
+        self._frame_bytes = self._frame_samples * channels * bytes_per_sample
+        self._residual = bytearray()
+
+    @property
+    def has_residual(self) -> bool:
+        return bool(self._residual)
+
+    def encode(self, *pcm: Union[bytes, bytearray, memoryview]) -> Optional[bytes]:
+        """
+        Encode as many whole frames as possible; None if not enough PCM yet.
+        Several chunks (e.g. coalesced audio) can be passed without joining.
+        """
+        for chunk in pcm:
+            self._residual += chunk
+        return self._encode_frames()
+
+    def flush(self) -> Optional[bytes]:
+        """Pad the residual PCM to a full frame and encode it"""
+        if not self._residual:
+            return None
+        pad = -len(self._residual) % self._frame_bytes
+        self._residual += bytes(pad)
+        return self._encode_frames()
+
+    def _encode_frames(self) -> Optional[bytes]:
+        whole = len(self._residual) - len(self._residual) % self._frame_bytes
+        if not whole:
+            return None
+        view = memoryview(self._residual)
+        packets = [
+            self._encoder.encode(bytes(view[i:i + self._frame_bytes]), self._frame_samples)
+            for i in range(0, whole, self._frame_bytes)
+        ]
+        view.release()
+        del self._residual[:whole]
+        return join_packets(packets)
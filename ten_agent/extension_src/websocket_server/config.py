@@ -2,9 +2,10 @@
 WebSocket Server Extension Configuration
 """
 
+import socket
 from pathlib import Path
-from typing import Any
-from pydantic import BaseModel, Field
+from typing import Any, Literal
+from pydantic import BaseModel, Field, field_validator
 
 
 class WebSocketServerConfig(BaseModel):
@@ -14,6 +15,30 @@ class WebSocketServerConfig(BaseModel):
     port: int = Field(default=8765, description="WebSocket server port")
     host: str = Field(default="0.0.0.0", description="WebSocket server host")
 
+    # Sharded front-end (SO_REUSEPORT worker processes)
+    shards: int = Field(
+        default=1,
+        description="Worker processes sharing the port via SO_REUSEPORT; 1 serves in-process",
+    )
+    shard_ipc_path: str = Field(
+        default="",
+        description="Unix socket workers use to reach the graph (default: temp dir)",
+    )
+
+    # Outbound send settings
+    send_timeout_ms: int = Field(
+        default=2000,
+        description="Per-client send timeout; clients exceeding it are evicted",
+    )
+    outbound_queue_size: int = Field(
+        default=256,
+        description="Per-client outbound queue size before drop policies apply",
+    )
+    audio_coalesce_max_bytes: int = Field(
+        default=32000,
+        description="Maximum size of a coalesced outbound audio message",
+    )
+
     # Fixed audio parameters (16kHz mono 16-bit PCM)
     sample_rate: int = Field(
         default=16000, description="Audio sample rate in Hz"
@@ -23,6 +48,64 @@ class WebSocketServerConfig(BaseModel):
         default=2, description="Bytes per sample (2 for 16-bit)"
     )
 
+    # Opus codec (used when a client negotiates it in system_init)
+    opus_frame_ms: int = Field(
+        default=20, description="Opus frame duration for TTS downlink"
+    )
+    opus_bitrate: int = Field(
+        default=24000, description="Opus encoder bitrate in bits per second"
+    )
+
+    # Inbound re-chunking (jitter buffer)
+    frame_duration_ms: int = Field(
+        default=40,
+        description="Duration of AudioFrames sent to STT; 0 forwards client chunks as-is",
+    )
+    jitter_reorder_window: int = Field(
+        default=8,
+        description="Out-of-order chunks held back before a gap is skipped",
+    )
+    flush_idle_ms: int = Field(
+        default=300,
+        description="Flush a client's partial frame after this long without audio",
+    )
+
+    # Latency tracing (voxflame_common.tracing)
+    trace_enabled: bool = Field(
+        default=True,
+        description="Start a latency trace per utterance and record it when its TTS audio returns",
+    )
+    trace_utterance_gap_ms: int = Field(
+        default=600,
+        description="Audio after this long a pause starts a new utterance trace",
+    )
+
+    # Metrics (voxflame_common.metrics), shared with the other extensions
+    metrics_port: int = Field(
+        default=0,
+        description="Serve Prometheus metrics on http://metrics_host:metrics_port/metrics; 0 = off",
+    )
+    metrics_host: str = Field(default="0.0.0.0", description="Metrics endpoint host")
+    metrics_file: str = Field(
+        default="",
+        description="Also write the metrics to this file (e.g. for a textfile collector)",
+    )
+    metrics_file_interval_s: float = Field(
+        default=15.0, description="How often metrics_file is rewritten"
+    )
+
+    # Logging (voxflame_common.log)
+    log_level: Literal["debug", "info", "warn", "error"] = Field(
+        default="info", description="Lowest level logged; lower lines are never formatted"
+    )
+    log_frame_summaries: bool = Field(
+        default=True,
+        description="Log per-frame lines at debug and summarize them at info instead",
+    )
+    log_summary_interval_s: float = Field(
+        default=10.0, description="How often per-frame summaries are logged"
+    )
+
     # Debug settings
     dump: bool = Field(
         default=False, description="Enable audio dump for debugging"
@@ -31,11 +114,22 @@ class WebSocketServerConfig(BaseModel):
         default_factory=lambda: str(
             Path(__file__).parent / "websocket_server_dump.pcm"
         ),
-        description="Path to dump audio data",
+        description="Dump file name template; per-client files are created next to it",
     )
     dump_max_bytes: int = Field(
         default=50 * 1024 * 1024,
-        description="Maximum dump file size in bytes before truncation (default 50MB)",
+        description="Maximum dump file size in bytes before rotation (default 50MB)",
+    )
+    dump_rotate_seconds: int = Field(
+        default=0,
+        description="Rotate dump files after this many seconds (0 = size only)",
+    )
+    dump_max_files: int = Field(
+        default=50,
+        description="Dump files kept across all clients; the oldest are deleted (0 = keep all)",
+    )
+    dump_format: Literal["pcm", "wav"] = Field(
+        default="pcm", description="Write raw PCM or WAV dump files"
     )
 
     # Additional params (for future extensibility)
@@ -43,11 +137,24 @@ class WebSocketServerConfig(BaseModel):
         default_factory=dict, description="Additional parameters"
     )
 
+    @field_validator("dump_path", mode="before")
+    @classmethod
+    def _default_dump_path(cls, value: Any) -> Any:
+        # property.json ships with an empty dump_path
+        if not value:
+            return str(Path(__file__).parent / "websocket_server_dump.pcm")
+        return value
+
     def validate_config(self) -> None:
         """Validate configuration parameters"""
         if self.port < 1 or self.port > 65535:
             raise ValueError(f"Invalid port number: {self.port}")
 
+        if self.shards < 1:
+            raise ValueError(f"Invalid shards: {self.shards}")
+        if self.shards > 1 and not hasattr(socket, "SO_REUSEPORT"):
+            raise ValueError("shards > 1 requires SO_REUSEPORT support")
+
         if self.sample_rate <= 0:
             raise ValueError(f"Invalid sample rate: {self.sample_rate}")
 
@@ -58,8 +165,60 @@ class WebSocketServerConfig(BaseModel):
             raise ValueError(
                 f"Invalid bytes_per_sample: {self.bytes_per_sample} (must be 1, 2, or 4)"
             )
+        if self.send_timeout_ms <= 0:
+            raise ValueError(f"Invalid send_timeout_ms: {self.send_timeout_ms}")
+        if self.outbound_queue_size <= 0:
+            raise ValueError(
+                f"Invalid outbound_queue_size: {self.outbound_queue_size}"
+            )
+        if self.audio_coalesce_max_bytes <= 0:
+            raise ValueError(
+                f"Invalid audio_coalesce_max_bytes: {self.audio_coalesce_max_bytes}"
+            )
+        if self.opus_frame_ms not in [10, 20, 40, 60]:
+            raise ValueError(
+                f"Invalid opus_frame_ms: {self.opus_frame_ms} (must be 10, 20, 40 or 60)"
+            )
+        if self.opus_bitrate <= 0:
+            raise ValueError(f"Invalid opus_bitrate: {self.opus_bitrate}")
+        if self.frame_duration_ms < 0:
+            raise ValueError(
+                f"Invalid frame_duration_ms: {self.frame_duration_ms}"
+            )
+        if self.frame_duration_ms and (
+            self.sample_rate * self.frame_duration_ms // 1000 <= 0
+        ):
+            raise ValueError(
+                f"frame_duration_ms too small for sample rate: {self.frame_duration_ms}"
+            )
+        if self.jitter_reorder_window < 0:
+            raise ValueError(
+                f"Invalid jitter_reorder_window: {self.jitter_reorder_window}"
+            )
+        if self.trace_utterance_gap_ms <= 0:
+            raise ValueError(
+                f"Invalid trace_utterance_gap_ms: {self.trace_utterance_gap_ms}"
+            )
+        if not 0 <= self.metrics_port <= 65535:
+            raise ValueError(f"Invalid metrics_port: {self.metrics_port}")
+        if self.metrics_file and self.metrics_file_interval_s <= 0:
+            raise ValueError(
+                f"Invalid metrics_file_interval_s: {self.metrics_file_interval_s}"
+            )
+        if self.log_summary_interval_s <= 0:
+            raise ValueError(
+                f"Invalid log_summary_interval_s: {self.log_summary_interval_s}"
+            )
+        if self.flush_idle_ms <= 0:
+            raise ValueError(f"Invalid flush_idle_ms: {self.flush_idle_ms}")
         if self.dump_max_bytes <= 0:
             raise ValueError(f"Invalid dump_max_bytes: {self.dump_max_bytes}")
+        if self.dump_rotate_seconds < 0:
+            raise ValueError(
+                f"Invalid dump_rotate_seconds: {self.dump_rotate_seconds}"
+            )
+        if self.dump_max_files < 0:
+            raise ValueError(f"Invalid dump_max_files: {self.dump_max_files}")
 
     def to_str(self) -> str:
         """
@@ -0,0 +1,249 @@
+"""
+Asynchronous audio dump writer
+
+Uplink audio dumps are written by a background thread fed through a
+queue, so enabling ``dump`` never blocks the event loop on disk I/O.
+Each client gets its own file; files are rotated by size and/or age and
+only the newest ``max_files`` dump files are kept. Retention counts every
+client's files together: client ids are ``ip:port`` and change on every
+reconnect, so a per-client limit would not bound disk use. Files can
+optionally be written as WAV so they open directly in an audio editor.
+"""
+
+import queue
+import re
+import struct
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, BinaryIO, Optional, Union
+
+
+_CLOSE = object()
+_STOP = object()
+
+
+@dataclass
+class DumpStats:
+    """Counters of the dump writer thread"""
+
+    written_bytes: int = 0
+    dropped_chunks: int = 0
+    rotations: int = 0
+    errors: int = 0
+
+
+@dataclass
+class _DumpFile:
+    path: Path
+    handle: BinaryIO
+    opened_at: float
+    data_bytes: int = 0
+
+
+def _wav_header(
+    data_bytes: int, sample_rate: int, channels: int, bytes_per_sample: int
+) -> bytes:
+    byte_rate = sample_rate * channels * bytes_per_sample
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF",
+        36 + data_bytes,
+        b"WAVE",
+        b"fmt ",
+        16,
+        1,  # PCM
+        channels,
+        sample_rate,
+        byte_rate,
+        channels * bytes_per_sample,
+        bytes_per_sample * 8,
+        b"data",
+        data_bytes,
+    )
+
+
+class AudioDumpWriter:
+    """Writes per-client audio dumps from a background thread"""
+
+    def __init__(
+        self,
+        base_path: Path,
+        ten_env: Any,
+        max_bytes: int,
+        rotate_seconds: int = 0,
+        max_files: int = 50,
+        wav: bool = False,
+        sample_rate: int = 16000,
+        channels: int = 1,
+        bytes_per_sample: int = 2,
+        queue_size: int = 1024,
+    ):
+        self.directory = base_path.parent
+        self.stem = base_path.stem or "websocket_server_dump"
+        self.suffix = ".wav" if wav else ".pcm"
+        self.ten_env = ten_env
+        self.max_bytes = max_bytes
+        self.rotate_seconds = rotate_seconds
+        self.max_files = max_files
+        self.wav = wav
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.bytes_per_sample = bytes_per_sample
+        self.stats = DumpStats()
+
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._files: dict[str, _DumpFile] = {}
+        self._file_counter = 0
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._thread = threading.Thread(
+            target=self._run, name="audio-dump-writer", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Write out everything queued so far and close all files"""
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._thread = None
+
+    def write(self, client_id: str, pcm: Union[bytes, memoryview]) -> None:
+        """
+        Queue a chunk for writing; never blocks. The chunk must not be
+        mutated afterwards (bytes, or a view over immutable bytes).
+        """
+        try:
+            self._queue.put_nowait((client_id, pcm))
+        except queue.Full:
+            self.stats.dropped_chunks += 1
+
+    def close_client(self, client_id: str) -> None:
+        """Close a client's current file once its queued audio is written"""
+        try:
+            self._queue.put_nowait((client_id, _CLOSE))
+        except queue.Full:
+            self.stats.dropped_chunks += 1
+
+    # ---- writer thread ----
+
+    def _run(self) -> None:
+        while True:
+            try:
+                item = self._queue.get(timeout=1.0)
+            except queue.Empty:
+                # Idle: make the files readable without flushing per chunk
+                self._flush_all()
+                continue
+
+            if item is _STOP:
+                for client_id in list(self._files):
+                    self._close(client_id)
+                return
+
+            client_id, pcm = item
+            try:
+                if pcm is _CLOSE:
+                    self._close(client_id)
+                else:
+                    self._write(client_id, pcm)
+            except Exception as e:
+                self.stats.errors += 1
+                self.ten_env.log_error(f"Error writing dump for {client_id}: {e}")
+
+    def _write(self, client_id: str, pcm: Union[bytes, memoryview]) -> None:
+        dump = self._files.get(client_id)
+        if dump is not None and self._should_rotate(dump):
+            self._close(client_id)
+            self.stats.rotations += 1
+            dump = None
+        if dump is None:
+            dump = self._open(client_id)
+
+        dump.handle.write(pcm)
+        dump.data_bytes += len(pcm)
+        self.stats.written_bytes += len(pcm)
+
+    def _should_rotate(self, dump: _DumpFile) -> bool:
+        if dump.data_bytes >= self.max_bytes:
+            return True
+        return bool(
+            self.rotate_seconds
+            and time.monotonic() - dump.opened_at >= self.rotate_seconds
+        )
+
+    def _client_prefix(self, client_id: str) -> str:
+        safe_id = re.sub(r"[^A-Za-z0-9_.-]", "_", client_id)
+        return f"{self.stem}_{safe_id}_"
+
+    def _open(self, client_id: str) -> _DumpFile:
+        prefix = self._client_prefix(client_id)
+        timestamp = time.strftime("%Y%m%d-%H%M%S")
+        # The counter keeps names unique when rotating within one second
+        self._file_counter += 1
+        path = self.directory / f"{prefix}{timestamp}-{self._file_counter:04d}{self.suffix}"
+
+        handle = open(path, "wb")
+        if self.wav:
+            handle.write(
+                _wav_header(0, self.sample_rate, self.channels, self.bytes_per_sample)
+            )
+        dump = _DumpFile(path=path, handle=handle, opened_at=time.monotonic())
+        self._files[client_id] = dump
+        self._apply_retention()
+        return dump
+
+    def _close(self, client_id: str) -> None:
+        dump = self._files.pop(client_id, None)
+        if dump is None:
+            return
+        try:
+            if self.wav:
+                dump.handle.seek(0)
+                dump.handle.write(
+                    _wav_header(
+                        dump.data_bytes,
+                        self.sample_rate,
+                        self.channels,
+                        self.bytes_per_sample,
+                    )
+                )
+        finally:
+            dump.handle.close()
+
+    def _flush_all(self) -> None:
+        for dump in self._files.values():
+            try:
+                dump.handle.flush()
+            except Exception:
+                self.stats.errors += 1
+
+    def _apply_retention(self) -> None:
+        """Delete the oldest dump files of any client beyond max_files"""
+        if self.max_files <= 0:
+            return
+        open_paths = {dump.path for dump in self._files.values()}
+        files = []
+        for path in self.directory.glob(f"{self.stem}_*{self.suffix}"):
+            try:
+                files.append((path.stat().st_mtime_ns, path.name, path))
+            except OSError:
+                continue  # Deleted meanwhile
+        files.sort()
+        excess = len(files) - self.max_files
+        for _, _, path in files:
+            if excess <= 0:
+                break
+            if path in open_paths:
+                # Still being written by a connected client
+                continue
+            try:
+                path.unlink()
+                excess -= 1
+            except OSError:
+                self.stats.errors += 1
@@ -3,8 +3,11 @@
 # Licensed under the Apache License, Version 2.0.
 # See the LICENSE file for more information.
 #
+import asyncio
 import json
+import time
 from pathlib import Path
+from typing import Any, Optional, Union
 from ten_runtime import (
     AudioFrame,
     VideoFrame,
@@ -17,18 +20,60 @@ from ten_runtime import (
     AudioFrameDataFmt,
 )
 
+from voxflame_common.log import Log
+from voxflame_common.metrics import MetricsFileWriter, MetricsServer, registry
+from voxflame_common.tracing import (
+    AUDIO_OUT,
+    SPEECH_END,
+    SPEECH_START,
+    TRACE_PROPERTY,
+    TraceContext,
+    tracer,
+)
+
+from .codec import OPUS_AVAILABLE, OPUS_UNAVAILABLE_REASON
 from .config import WebSocketServerConfig
+from .dump_writer import AudioDumpWriter
+from .jitter_buffer import JitterBuffer
+from .outbound import MessageClass
+from .shard import ShardHub
 from .websocket_server import WebSocketServerManager, AudioData
 
+AUDIO_IN_BYTES = registry.counter(
+    "voxflame_ws_audio_in_bytes_total", "PCM bytes received from clients"
+)
+AUDIO_IN_CHUNKS = registry.counter(
+    "voxflame_ws_audio_in_chunks_total", "Audio messages received from clients"
+)
+AUDIO_OUT_BYTES = registry.counter(
+    "voxflame_ws_audio_out_bytes_total", "TTS PCM bytes forwarded to clients"
+)
+AUDIO_OUT_FRAMES = registry.counter(
+    "voxflame_ws_audio_out_frames_total", "TTS audio frames forwarded to clients"
+)
+DATA_OUT = registry.counter(
+    "voxflame_ws_data_out_total", "Text messages forwarded to clients"
+)
+ERRORS = registry.counter(
+    "voxflame_errors_total", "Errors caught by the extensions",
+    extension="websocket_server",
+)
+
 
 class WebsocketServerExtension(AsyncExtension):
     def __init__(self, name: str) -> None:
         super().__init__(name)
         self.config: WebSocketServerConfig = None
-        self.ws_server: WebSocketServerManager = None
-        self.dump_file = None
-        self.dump_bytes_written = 0
+        self.ws_server: Union[WebSocketServerManager, ShardHub] = None
+        self.dump_writer: Optional[AudioDumpWriter] = None
         self.ten_env: AsyncTenEnv = None
+        self.log: Optional[Log] = None
+        self.jitter_buffers: dict[str, JitterBuffer] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        # Latency trace of each client's current utterance
+        self.traces: dict[str, TraceContext] = {}
+        self.metrics_server: Optional[MetricsServer] = None
+        self.metrics_file: Optional[MetricsFileWriter] = None
 
     async def on_init(self, ten_env: AsyncTenEnv) -> None:
         # Store ten_env for later use
@@ -41,39 +86,55 @@ class WebsocketServerExtension(AsyncExtension):
             config_json, _ = await ten_env.get_property_to_json("")
             self.config = WebSocketServerConfig.model_validate_json(config_json)
             self.config.validate_config()
+            self.log = Log(
+                ten_env,
+                level=self.config.log_level,
+                frame_summaries=self.config.log_frame_summaries,
+                summary_interval_s=self.config.log_summary_interval_s,
+            )
 
             ten_env.log_info(f"Loaded config: {self.config.to_str()}")
         except Exception as e:
             ten_env.log_error(f"Failed to load configuration: {e}")
             raise
 
-        # Initialize dump file if enabled
+        # Start the background dump writer if enabled
         if self.config.dump:
             try:
                 dump_path = Path(self.config.dump_path)
-                dump_path.parent.mkdir(parents=True, exist_ok=True)
-                self.dump_file = open(dump_path, "wb")
-                self.dump_bytes_written = 0
-                ten_env.log_info(f"Audio dump enabled: {dump_path}")
+                self.dump_writer = AudioDumpWriter(
+                    base_path=dump_path,
+                    ten_env=ten_env,
+                    max_bytes=self.config.dump_max_bytes,
+                    rotate_seconds=self.config.dump_rotate_seconds,
+                    max_files=self.config.dump_max_files,
+                    wav=self.config.dump_format == "wav",
+                    sample_rate=self.config.sample_rate,
+                    channels=self.config.channels,
+                    bytes_per_sample=self.config.bytes_per_sample,
+                )
+                self.dump_writer.start()
+                ten_env.log_info(
+                    f"Audio dump enabled: {dump_path.parent} "
+                    f"(per-client {self.config.dump_format} files)"
+                )
             except Exception as e:
-                ten_env.log_error(f"Failed to open dump file: {e}")
-                self.dump_file = None
+                ten_env.log_error(f"Failed to start audio dump writer: {e}")
+                self.dump_writer = None
 
     async def on_start(self, ten_env: AsyncTenEnv) -> None:
         ten_env.log_info("WebSocket Server Extension starting...")
+        if not OPUS_AVAILABLE:
+            ten_env.log_warn(
+                f"Opus disabled, only PCM is available: {OPUS_UNAVAILABLE_REASON}"
+            )
 
         # Create and start WebSocket server
         try:
-            self.ws_server = WebSocketServerManager(
-                host=self.config.host,
-                port=self.config.port,
-                ten_env=ten_env,
-                on_audio_callback=self._on_audio_received,
-                on_cmd_callback=self._on_cmd_received,
-                on_client_connected=self._on_client_connected,
-                on_client_disconnected=self._on_client_disconnected,
-            )
+            self.ws_server = self._create_server(ten_env)
             await self.ws_server.start()
+            if self.config.frame_duration_ms > 0:
+                self._flush_task = asyncio.create_task(self._jitter_flush_loop())
             ten_env.log_info(
                 f"WebSocket server listening on ws://{self.config.host}:{self.config.port}"
             )
@@ -81,23 +142,135 @@ class WebsocketServerExtension(AsyncExtension):
             ten_env.log_error(f"Failed to start WebSocket server: {e}")
             raise
 
+        await self._start_metrics(ten_env)
+
+    async def _start_metrics(self, ten_env: AsyncTenEnv) -> None:
+        """Register this extension's gauges and expose the shared registry"""
+        ws_server = self.ws_server
+        registry.gauge_func(
+            "voxflame_ws_clients", "Connected WebSocket clients",
+            ws_server.get_client_count,
+        )
+        if isinstance(ws_server, WebSocketServerManager):
+            # Sharded workers keep their queues to themselves
+            registry.gauge_func(
+                "voxflame_ws_outbound_queue_depth", "Messages queued for all clients",
+                lambda: sum(s["depth"] for s in ws_server.get_client_stats().values()),
+            )
+            registry.gauge_func(
+                "voxflame_ws_outbound_queue_depth_max", "Deepest client outbound queue",
+                lambda: max(
+                    (s["depth"] for s in ws_server.get_client_stats().values()), default=0
+                ),
+            )
+            registry.counter_func(
+                "voxflame_ws_outbound_bytes_total", "Bytes sent to connected clients",
+                lambda: sum(s["sent_bytes"] for s in ws_server.get_client_stats().values()),
+            )
+        registry.gauge_func(
+            "voxflame_ws_jitter_buffered_bytes", "Inbound audio waiting to be framed",
+            lambda: sum(j.available for j in self.jitter_buffers.values()),
+        )
+
+        try:
+            if self.config.metrics_port:
+                self.metrics_server = MetricsServer(
+                    registry, self.config.metrics_host, self.config.metrics_port
+                )
+                await self.metrics_server.start()
+                ten_env.log_info(
+                    f"Metrics on http://{self.config.metrics_host}:"
+                    f"{self.config.metrics_port}/metrics"
+                )
+            if self.config.metrics_file:
+                self.metrics_file = MetricsFileWriter(
+                    registry,
+                    self.config.metrics_file,
+                    self.config.metrics_file_interval_s,
+                )
+                self.metrics_file.start()
+        except Exception as e:
+            # Metrics are not worth failing the voice path for
+            ten_env.log_error(f"Failed to start metrics export: {e}")
+
+    def _create_server(
+        self, ten_env: AsyncTenEnv
+    ) -> Union[WebSocketServerManager, ShardHub]:
+        """In-process server, or SO_REUSEPORT worker processes if shards > 1"""
+        callbacks = dict(
+            on_audio_callback=self._on_audio_received,
+            on_cmd_callback=self._on_cmd_received,
+            on_client_connected=self._on_client_connected,
+            on_client_disconnected=self._on_client_disconnected,
+        )
+        # Plain values only: they are pickled into the shard processes
+        options = dict(
+            send_timeout_ms=self.config.send_timeout_ms,
+            outbound_queue_size=self.config.outbound_queue_size,
+            audio_coalesce_max_bytes=self.config.audio_coalesce_max_bytes,
+            sample_rate=self.config.sample_rate,
+            channels=self.config.channels,
+            bytes_per_sample=self.config.bytes_per_sample,
+            opus_frame_ms=self.config.opus_frame_ms,
+            opus_bitrate=self.config.opus_bitrate,
+            log_level=self.config.log_level,
+            log_frame_summaries=self.config.log_frame_summaries,
+            log_summary_interval_s=self.config.log_summary_interval_s,
+        )
+        if self.config.shards > 1:
+            return ShardHub(
+                host=self.config.host,
+                port=self.config.port,
+                ten_env=ten_env,
+                shards=self.config.shards,
+                ipc_path=self.config.shard_ipc_path,
+                **callbacks,
+                **options,
+            )
+        return WebSocketServerManager(
+            host=self.config.host,
+            port=self.config.port,
+            ten_env=ten_env,
+            **callbacks,
+            **options,
+        )
+
     async def on_stop(self, ten_env: AsyncTenEnv) -> None:
         ten_env.log_info("WebSocket Server Extension stopping...")
 
+        if self._flush_task:
+            self._flush_task.cancel()
+            self._flush_task = None
+
+        if self.metrics_server:
+            await self.metrics_server.stop()
+            self.metrics_server = None
+        if self.metrics_file:
+            await self.metrics_file.stop()
+            self.metrics_file = None
+
+        if self.log:
+            self.log.flush()
+        if tracer.traces:
+            ten_env.log_info(
+                f"Utterance latency over {tracer.traces} traces (ms): "
+                f"{tracer.percentiles()}"
+            )
+
         # Stop WebSocket server
         if self.ws_server:
             await self.ws_server.stop()
             self.ws_server = None
 
-        # Close dump file
-        if self.dump_file:
+        # Drain and close dump files
+        if self.dump_writer:
             try:
-                self.dump_file.close()
-                ten_env.log_info("Audio dump file closed")
+                self.dump_writer.stop()
+                ten_env.log_info(f"Audio dump closed: {self.dump_writer.stats}")
             except Exception as e:
-                ten_env.log_error(f"Error closing dump file: {e}")
+                ten_env.log_error(f"Error closing dump files: {e}")
             finally:
-                self.dump_file = None
+                self.dump_writer = None
 
     async def on_deinit(self, ten_env: AsyncTenEnv) -> None:
         ten_env.log_info("WebSocket Server Extension deinitializing...")
@@ -118,7 +291,8 @@ class WebsocketServerExtension(AsyncExtension):
             # Broadcast to all WebSocket clients
             if self.ws_server:
                 message = {"type": "cmd", "name": cmd_name, "data": cmd_data}
-                await self.ws_server.broadcast(message)
+                failed = await self.ws_server.broadcast(message)
+                await self.ws_server.evict_clients(failed)
                 ten_env.log_debug(
                     f"Broadcasted command {cmd_name} to WebSocket clients"
                 )
@@ -138,28 +312,52 @@ class WebsocketServerExtension(AsyncExtension):
         Forward to WebSocket clients as JSON
         """
         data_name = data.get_name()
-        ten_env.log_debug(f"Received data: {data_name}")
+        self.log.debug("Received data: %s", data_name)
         try:
             # Handle various data types from the graph
             if data_name in ["text_data", "corrected_text", "interim_text", "transcript"]:
                 # Convert data to JSON
                 data_json, _ = data.get_property_to_json(None)
-                ten_env.log_info(f"Data [{data_name}]: {data_json}")
+                self.log.frame(
+                    "data_out", "Data [%s]: %s", data_name, data_json, size=len(data_json)
+                )
                 data_dict = json.loads(data_json)
 
-                # Broadcast to all WebSocket clients
                 if self.ws_server:
                     message = {
                         "type": "data",
                         "name": data_name,
                         "data": data_dict,
                     }
-                    await self.ws_server.broadcast(message)
-                    ten_env.log_debug(
-                        f"Broadcasted data {data_name} to WebSocket clients"
+                    # Route to the owning socket; only untagged data
+                    # (e.g. from older graph nodes) is broadcast.
+                    # Interim hypotheses may be dropped under backpressure,
+                    # final transcripts and corrections never are.
+                    is_interim = (
+                        data_name == "interim_text"
+                        or data_dict.get("is_final") is False
                     )
+                    kind = MessageClass.INTERIM if is_interim else MessageClass.FINAL
+                    client_id = self._get_client_id(data_dict)
+                    DATA_OUT.inc()
+                    if client_id:
+                        sent = await self.ws_server.send_to_client(
+                            client_id, message, kind
+                        )
+                        if not sent:
+                            self.log.debug(
+                                "Send to %s failed, dropped data %s", client_id, data_name
+                            )
+                            await self.ws_server.evict_clients([client_id])
+                    else:
+                        failed = await self.ws_server.broadcast(message, kind)
+                        await self.ws_server.evict_clients(failed)
+                        self.log.debug(
+                            "Broadcasted data %s to WebSocket clients", data_name
+                        )
 
         except Exception as e:
+            ERRORS.inc()
             ten_env.log_error(
                 f"Error forwarding data to WebSocket clients: {e}"
             )
@@ -169,10 +367,10 @@ class WebsocketServerExtension(AsyncExtension):
     ) -> None:
         """
         Handle audio frames from TEN graph (e.g., TTS output)
-        Sends audio to WebSocket clients as base64-encoded JSON
+        Sends audio to WebSocket clients as base64 JSON, binary PCM or Opus
         """
         audio_frame_name = audio_frame.get_name()
-        ten_env.log_debug(f"Received audio frame: {audio_frame_name}")
+        self.log.debug("Received audio frame: %s", audio_frame_name)
 
         if not self.ws_server:
             ten_env.log_warn(
@@ -181,21 +379,32 @@ class WebsocketServerExtension(AsyncExtension):
             return
 
         try:
-            # Get PCM data from audio frame
+            # The only copy of TTS audio on the way out: the buffer belongs
+            # to the frame, and the immutable copy is then shared by every
+            # client queue and copied again only into the outgoing message.
             buf = audio_frame.lock_buf()
-            pcm_data = bytes(buf)
-            audio_frame.unlock_buf(buf)
+            try:
+                pcm_data = bytes(buf)
+            finally:
+                audio_frame.unlock_buf(buf)
+            AUDIO_OUT_FRAMES.inc()
+            AUDIO_OUT_BYTES.inc(len(pcm_data))
 
             # Extract metadata if present
             metadata = {}
             try:
-                metadata_json = audio_frame.get_property_string("metadata")
-                if metadata_json:
-                    metadata = json.loads(metadata_json)
+                metadata_json, err = audio_frame.get_property_to_json("metadata")
+                if err is None and metadata_json:
+                    metadata = json.loads(metadata_json) or {}
             except Exception:
                 # No metadata or invalid JSON, continue without it
                 pass
 
+            # The trace is ours, not the client's
+            trace = TraceContext.from_dict(metadata.pop(TRACE_PROPERTY, None))
+            if trace is not None:
+                self._finish_trace(ten_env, trace)
+
             # Add audio properties to metadata
             metadata.update(
                 {
@@ -206,24 +415,51 @@ class WebsocketServerExtension(AsyncExtension):
                 }
             )
 
-            # Send to WebSocket clients
-            await self.ws_server.send_audio_to_clients(pcm_data, metadata)
-
-            ten_env.log_debug(
-                f"Forwarded {len(pcm_data)} bytes of audio to WebSocket clients"
+            # TTS echoes the request metadata, so client_id identifies the
+            # socket that asked for this audio.
+            client_id = self._get_client_id(metadata)
+            if client_id:
+                sent = await self.ws_server.send_audio_to_client(
+                    client_id, pcm_data, metadata
+                )
+                if not sent:
+                    await self.ws_server.evict_clients([client_id])
+            else:
+                failed = await self.ws_server.send_audio_to_clients(
+                    pcm_data, metadata
+                )
+                await self.ws_server.evict_clients(failed)
+
+            self.log.frame(
+                "audio_out",
+                "Forwarded %d bytes of audio to %s",
+                len(pcm_data),
+                client_id or "all WebSocket clients",
+                size=len(pcm_data),
             )
 
         except Exception as e:
+            ERRORS.inc()
             ten_env.log_error(
                 f"Error processing audio frame for WebSocket: {e}"
             )
 
+    @staticmethod
+    def _get_client_id(payload: dict[str, Any]) -> Optional[str]:
+        """Find the client_id a graph message belongs to, if any"""
+        client_id = payload.get("client_id")
+        if not client_id:
+            metadata = payload.get("metadata")
+            if isinstance(metadata, dict):
+                client_id = metadata.get("client_id")
+        return client_id or None
+
     async def on_video_frame(
         self, ten_env: AsyncTenEnv, video_frame: VideoFrame
     ) -> None:
         """Handle video frames (not typically used for this extension)"""
         video_frame_name = video_frame.get_name()
-        ten_env.log_debug(f"Received video frame: {video_frame_name}")
+        self.log.debug("Received video frame: %s", video_frame_name)
 
     async def _on_audio_received(self, audio_data: AudioData) -> None:
         """
@@ -234,69 +470,175 @@ class WebsocketServerExtension(AsyncExtension):
             audio_data: Audio data container with PCM data and metadata
         """
         try:
-            self.ten_env.log_info(f"Audio received: {len(audio_data.pcm_data)} bytes")
+            self.log.frame(
+                "audio_in",
+                "Audio received: %d bytes",
+                len(audio_data.pcm_data),
+                size=len(audio_data.pcm_data),
+            )
+            AUDIO_IN_CHUNKS.inc()
+            AUDIO_IN_BYTES.inc(len(audio_data.pcm_data))
             # Get ten_env (stored during initialization)
             ten_env = self.ten_env
 
-            # Dump audio if enabled
-            if self.dump_file:
-                try:
-                    self.dump_file.write(audio_data.pcm_data)
-                    self.dump_bytes_written += len(audio_data.pcm_data)
-                    # Truncate when exceeding configured max size
-                    if self.dump_bytes_written >= self.config.dump_max_bytes:
-                        self.dump_file.flush()
-                        self.dump_file.close()
-                        # Reopen same path in write mode to truncate
-                        dump_path = Path(self.config.dump_path)
-                        self.dump_file = open(dump_path, "wb")
-                        self.dump_bytes_written = 0
-                        ten_env.log_info(
-                            f"Audio dump truncated after reaching {self.config.dump_max_bytes} bytes"
-                        )
-                    else:
-                        self.dump_file.flush()
-                except Exception as e:
-                    ten_env.log_error(f"Error writing dump file: {e}")
-
-            # Create AudioFrame
-            audio_frame = AudioFrame.create("pcm_frame")
-
-            # Set fixed audio properties (16kHz mono 16-bit PCM)
-            audio_frame.set_sample_rate(self.config.sample_rate)
-            audio_frame.set_bytes_per_sample(self.config.bytes_per_sample)
-            audio_frame.set_number_of_channels(self.config.channels)
-            audio_frame.set_data_fmt(AudioFrameDataFmt.INTERLEAVE)
-
-            # Calculate number of samples
-            bytes_per_frame = (
-                self.config.bytes_per_sample * self.config.channels
-            )
-            samples_per_channel = len(audio_data.pcm_data) // bytes_per_frame
-            audio_frame.set_samples_per_channel(samples_per_channel)
+            # Dump audio if enabled (queued, written by a background thread)
+            if self.dump_writer:
+                self.dump_writer.write(audio_data.client_id, audio_data.pcm_data)
+
+            metadata = audio_data.metadata
+            trace = None
+            if self.config.trace_enabled:
+                trace = self._utterance_trace(audio_data.client_id).to_dict()
+                metadata = {**(metadata or {}), TRACE_PROPERTY: trace}
+
+            if self.config.frame_duration_ms <= 0:
+                # Re-chunking disabled: one AudioFrame per client message
+                await self._send_pcm_frame(audio_data.pcm_data, metadata)
+                return
+
+            jitter = self._get_jitter_buffer(audio_data.client_id)
+            if not jitter.metadata:
+                jitter.metadata = self._frame_metadata(metadata)
+            elif trace is not None:
+                jitter.metadata[TRACE_PROPERTY] = trace
+            jitter.push(audio_data.pcm_data, audio_data.sequence)
+            await self._drain_jitter_buffer(jitter)
 
-            # Allocate and fill buffer
-            audio_frame.alloc_buf(len(audio_data.pcm_data))
-            buf = audio_frame.lock_buf()
-            buf[:] = audio_data.pcm_data
-            audio_frame.unlock_buf(buf)
+        except Exception as e:
+            ERRORS.inc()
+            ten_env.log_error(f"Error processing audio from WebSocket: {e}")
+            raise
 
-            # Attach metadata if present
-            if audio_data.metadata:
-                metadata_json = json.dumps(audio_data.metadata)
-                audio_frame.set_property_from_json("metadata", metadata_json)
+    def _utterance_trace(self, client_id: str) -> TraceContext:
+        """
+        Trace of the utterance this audio belongs to.
 
-            # Send audio frame to TEN graph
-            await ten_env.send_audio_frame(audio_frame)
+        Audio after a pause of trace_utterance_gap_ms, or after the previous
+        utterance was answered, starts a new trace. Every chunk moves the
+        speech end forward; STT echoes the frame metadata, so the trace on
+        the final asr_result ends at the last audio STT had seen.
+        """
+        now = time.monotonic()
+        trace = self.traces.get(client_id)
+        gap = self.config.trace_utterance_gap_ms / 1000
+        if trace is None or now - trace.marks[SPEECH_END] > gap:
+            trace = TraceContext.new().mark(SPEECH_START, now)
+            self.traces[client_id] = trace
+        trace.marks[SPEECH_END] = now
+        return trace
+
+    def _finish_trace(self, ten_env: AsyncTenEnv, trace: TraceContext) -> None:
+        """Record an utterance at its first TTS audio frame"""
+        trace.mark(AUDIO_OUT)
+        spans = tracer.record(trace)
+        if spans is None:
+            return
+        for name, value in spans.items():
+            registry.histogram(
+                "voxflame_utterance_stage_seconds",
+                "Utterance latency per stage, from end of speech to first TTS audio",
+                stage=name,
+            ).observe(value / 1000)
+        for client_id, current in list(self.traces.items()):
+            if current.trace_id == trace.trace_id:
+                # Answered: the next audio is a new utterance
+                del self.traces[client_id]
+        ten_env.log_info(
+            f"Utterance {trace.trace_id} latency (ms): "
+            + ", ".join(f"{name}={value:.0f}" for name, value in spans.items())
+        )
+
+    def _create_pcm_frame(
+        self, num_bytes: int, metadata: Optional[dict[str, Any]]
+    ) -> AudioFrame:
+        """Create a pcm_frame AudioFrame with an allocated, unfilled buffer"""
+        audio_frame = AudioFrame.create("pcm_frame")
+
+        # Set fixed audio properties (16kHz mono 16-bit PCM)
+        audio_frame.set_sample_rate(self.config.sample_rate)
+        audio_frame.set_bytes_per_sample(self.config.bytes_per_sample)
+        audio_frame.set_number_of_channels(self.config.channels)
+        audio_frame.set_data_fmt(AudioFrameDataFmt.INTERLEAVE)
+
+        # Calculate number of samples
+        bytes_per_frame = self.config.bytes_per_sample * self.config.channels
+        audio_frame.set_samples_per_channel(num_bytes // bytes_per_frame)
+
+        audio_frame.alloc_buf(num_bytes)
+
+        # Attach metadata if present
+        if metadata:
+            audio_frame.set_property_from_json("metadata", json.dumps(metadata))
+
+        return audio_frame
+
+    async def _send_pcm_frame(
+        self, pcm_data: bytes, metadata: Optional[dict[str, Any]]
+    ) -> None:
+        """Send one client chunk to the TEN graph as-is"""
+        audio_frame = self._create_pcm_frame(len(pcm_data), metadata)
+        buf = audio_frame.lock_buf()
+        try:
+            buf[:] = pcm_data
+        finally:
+            audio_frame.unlock_buf(buf)
 
-            ten_env.log_debug(
-                f"Sent audio frame from {audio_data.client_id}: "
-                f"{len(audio_data.pcm_data)} bytes, {samples_per_channel} samples"
+        await self.ten_env.send_audio_frame(audio_frame)
+
+    def _get_jitter_buffer(self, client_id: str) -> JitterBuffer:
+        jitter = self.jitter_buffers.get(client_id)
+        if jitter is None:
+            frame_bytes = (
+                self.config.sample_rate * self.config.frame_duration_ms // 1000
+            ) * self.config.bytes_per_sample * self.config.channels
+            jitter = JitterBuffer(
+                frame_bytes=frame_bytes,
+                reorder_window=self.config.jitter_reorder_window,
             )
-
-        except Exception as e:
-            ten_env.log_error(f"Error processing audio from WebSocket: {e}")
-            raise
+            self.jitter_buffers[client_id] = jitter
+        return jitter
+
+    @staticmethod
+    def _frame_metadata(metadata: dict[str, Any]) -> dict[str, Any]:
+        """Per-chunk fields no longer apply once audio is re-chunked"""
+        return {
+            k: v for k, v in metadata.items() if k not in ("seq", "timestamp_ms")
+        }
+
+    async def _drain_jitter_buffer(
+        self, jitter: JitterBuffer, flush: bool = False
+    ) -> None:
+        """
+        Send every complete fixed-size frame to the TEN graph.
+        With flush=True the trailing partial frame is sent as well.
+        """
+        if flush:
+            jitter.flush()
+        while jitter.has_frame() or (flush and jitter.available):
+            audio_frame = self._create_pcm_frame(
+                min(jitter.available, jitter.frame_bytes), jitter.metadata
+            )
+            buf = audio_frame.lock_buf()
+            try:
+                jitter.read_into(buf)
+            finally:
+                audio_frame.unlock_buf(buf)
+            await self.ten_env.send_audio_frame(audio_frame)
+
+    async def _jitter_flush_loop(self) -> None:
+        """Flush buffered audio of clients that went quiet (end of speech)"""
+        idle = self.config.flush_idle_ms / 1000.0
+        while True:
+            await asyncio.sleep(idle / 2)
+            now = time.monotonic()
+            for jitter in list(self.jitter_buffers.values()):
+                if now - jitter.last_push < idle:
+                    continue
+                if jitter.available or jitter.held:
+                    try:
+                        await self._drain_jitter_buffer(jitter, flush=True)
+                    except Exception as e:
+                        self.ten_env.log_error(f"Error flushing jitter buffer: {e}")
 
     async def _on_client_connected(self, client_id: str) -> None:
         """
@@ -316,6 +658,17 @@ class WebsocketServerExtension(AsyncExtension):
         Callback when a WebSocket client disconnects.
         Sends on_user_disconnected command to main_control.
         """
+        if self.dump_writer:
+            self.dump_writer.close_client(client_id)
+
+        self.traces.pop(client_id, None)
+        jitter = self.jitter_buffers.pop(client_id, None)
+        if jitter is not None:
+            try:
+                await self._drain_jitter_buffer(jitter, flush=True)
+            except Exception as e:
+                self.ten_env.log_error(f"Error flushing audio of {client_id}: {e}")
+
         try:
             self.ten_env.log_info(f"Sending on_user_disconnected for client: {client_id}")
             cmd = Cmd.create("on_user_disconnected")
@@ -0,0 +1,142 @@
+"""
+Inbound audio jitter buffer
+
+Browsers send audio in whatever chunk size their capture pipeline
+produces. The jitter buffer reorders chunks by sequence number (binary
+frames only, see protocol.py), queues the PCM and hands it back out in
+fixed-size frames, so the STT node sees a steady frame rate instead of a
+mix of tiny and huge frames.
+"""
+
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Optional, Union
+
+from .protocol import SEQUENCE_MODULO
+
+
+@dataclass
+class JitterStats:
+    """Per-client reorder counters"""
+
+    reordered: int = 0
+    late_dropped: int = 0
+    gaps: int = 0
+
+
+@dataclass
+class JitterBuffer:
+    """Reorders uplink chunks and re-chunks them into fixed-size frames"""
+
+    frame_bytes: int
+    reorder_window: int = 8
+    metadata: dict[str, Any] = field(default_factory=dict)
+    stats: JitterStats = field(default_factory=JitterStats)
+
+    def __post_init__(self) -> None:
+        # In-order audio as views over the received messages; the only copy
+        # made is the one into the destination frame buffer.
+        self._segments: deque[memoryview] = deque()
+        self._head = 0
+        self._size = 0
+        self._pending: dict[int, memoryview] = {}
+        self._next_seq: Optional[int] = None
+        self.last_push = time.monotonic()
+
+    @property
+    def available(self) -> int:
+        """Bytes of in-order PCM waiting to be read"""
+        return self._size
+
+    @property
+    def held(self) -> int:
+        """Out-of-order chunks waiting for a gap to be filled"""
+        return len(self._pending)
+
+    def has_frame(self) -> bool:
+        return self._size >= self.frame_bytes
+
+    def push(
+        self, payload: Union[bytes, memoryview], sequence: Optional[int] = None
+    ) -> None:
+        """
+        Add a chunk. Chunks without a sequence number (legacy JSON clients)
+        are appended as they arrive.
+
+        The payload is referenced, not copied, so it must not be mutated
+        afterwards (websocket messages and decoded audio are immutable bytes).
+        """
+        self.last_push = time.monotonic()
+        payload = memoryview(payload)
+        if sequence is None:
+            self._append(payload)
+            return
+
+        if self._next_seq is None:
+            self._next_seq = sequence
+
+        offset = (sequence - self._next_seq) % SEQUENCE_MODULO
+        if offset >= SEQUENCE_MODULO // 2:
+            # Older than what we already emitted
+            self.stats.late_dropped += 1
+            return
+
+        if offset == 0:
+            self._append(payload)
+            self._next_seq = (sequence + 1) % SEQUENCE_MODULO
+        else:
+            # Hold on to it until the gap is filled
+            self._pending[sequence] = payload
+            self.stats.reordered += 1
+            if len(self._pending) > self.reorder_window:
+                # Give up on the missing chunk(s)
+                self.stats.gaps += 1
+                self._next_seq = min(
+                    self._pending,
+                    key=lambda seq: (seq - self._next_seq) % SEQUENCE_MODULO,
+                )
+        self._drain_pending()
+
+    def read_into(self, dest: memoryview, max_bytes: Optional[int] = None) -> int:
+        """
+        Copy the next frame (or up to ``max_bytes``) into ``dest``.
+
+        Copying straight into the destination (e.g. a locked AudioFrame
+        buffer) avoids an intermediate bytes object per frame.
+
+        Returns:
+            Number of bytes written
+        """
+        n = min(self._size, self.frame_bytes if max_bytes is None else max_bytes)
+        written = 0
+        while written < n:
+            segment = self._segments[0]
+            take = min(n - written, len(segment) - self._head)
+            dest[written:written + take] = segment[self._head:self._head + take]
+            written += take
+            self._head += take
+            if self._head == len(segment):
+                self._segments.popleft()
+                self._head = 0
+        self._size -= n
+        return n
+
+    def flush(self) -> None:
+        """Release held out-of-order chunks, skipping over missing ones"""
+        while self._pending:
+            self._next_seq = min(
+                self._pending,
+                key=lambda seq: (seq - self._next_seq) % SEQUENCE_MODULO,
+            )
+            self._drain_pending()
+
+    def _drain_pending(self) -> None:
+        while self._next_seq in self._pending:
+            self._append(self._pending.pop(self._next_seq))
+            self._next_seq = (self._next_seq + 1) % SEQUENCE_MODULO
+
+    def _append(self, payload: memoryview) -> None:
+        if len(payload):
+            self._segments.append(payload)
+            self._size += len(payload)
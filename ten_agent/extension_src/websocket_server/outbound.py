@@ -0,0 +1,180 @@
+"""
+Per-client outbound queue for the WebSocket server
+
+Every connection gets a bounded queue drained by its own writer task, so
+TEN callbacks only enqueue and never await a slow socket. Each message
+class has its own overflow policy:
+
+- CONTROL / FINAL: never dropped. The queue may grow past its nominal size
+  up to a hard limit; beyond that the client is considered stalled and
+  should be evicted.
+- INTERIM: the oldest queued interim transcript is dropped first.
+- AUDIO: consecutive queued audio chunks are coalesced into one message.
+"""
+
+import asyncio
+from collections import deque
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Optional, Union
+
+
+# Never-drop messages may overflow the nominal size up to this factor
+HARD_LIMIT_FACTOR = 4
+
+# Audio metadata describing one frame rather than the stream; ignored when
+# coalescing and recomputed for the merged chunk
+PER_FRAME_METADATA = ("samples_per_channel",)
+
+
+def stream_metadata(metadata: Optional[dict[str, Any]]) -> dict[str, Any]:
+    """Routing and format fields of audio metadata"""
+    if not metadata:
+        return {}
+    return {k: v for k, v in metadata.items() if k not in PER_FRAME_METADATA}
+
+
+def chunk_metadata(
+    metadata: Optional[dict[str, Any]], pcm_bytes: int
+) -> Optional[dict[str, Any]]:
+    """Metadata for a (possibly coalesced) chunk of pcm_bytes bytes"""
+    if not metadata or "samples_per_channel" not in metadata:
+        return metadata
+    frame_bytes = metadata.get("channels", 1) * metadata.get("bytes_per_sample", 2)
+    # Copied: the metadata dict is shared by every client's queue
+    return {**metadata, "samples_per_channel": pcm_bytes // max(frame_bytes, 1)}
+
+
+class MessageClass(str, Enum):
+    """Delivery class of an outbound message"""
+
+    CONTROL = "control"
+    FINAL = "final"
+    INTERIM = "interim"
+    AUDIO = "audio"
+
+
+@dataclass
+class OutboundMessage:
+    """
+    A queued outbound message.
+
+    Text/control messages are encoded once before queueing (``payload``).
+    Audio keeps its raw PCM chunks in ``pcm`` until the writer picks it up,
+    so that consecutive chunks can still be coalesced. Chunks are immutable
+    and shared between all clients receiving them; coalescing only appends
+    references, the PCM is copied once when the writer encodes it.
+    """
+
+    kind: MessageClass
+    payload: Optional[Union[str, bytes]] = None
+    pcm: Optional[list[bytes]] = None
+    pcm_bytes: int = 0
+    metadata: Optional[dict[str, Any]] = None
+
+
+@dataclass
+class OutboundStats:
+    """Per-client delivery counters"""
+
+    sent: int = 0
+    sent_bytes: int = 0
+    dropped_interim: int = 0
+    coalesced_audio: int = 0
+    overflows: int = 0
+    send_failures: int = 0
+    max_depth: int = 0
+
+    def to_dict(self) -> dict[str, int]:
+        return dict(self.__dict__)
+
+
+@dataclass
+class OutboundQueue:
+    """Bounded message queue with per-class drop/coalesce policies"""
+
+    max_size: int
+    audio_coalesce_max_bytes: int
+    stats: OutboundStats = field(default_factory=OutboundStats)
+
+    def __post_init__(self) -> None:
+        self._items: deque[OutboundMessage] = deque()
+        self._ready = asyncio.Event()
+        self._closed = False
+
+    @property
+    def depth(self) -> int:
+        return len(self._items)
+
+    @property
+    def hard_limit(self) -> int:
+        return self.max_size * HARD_LIMIT_FACTOR
+
+    def put(self, message: OutboundMessage) -> bool:
+        """
+        Enqueue a message without blocking.
+
+        Returns:
+            False if the client is stalled (hard limit reached) or the queue
+            is closed; the caller should evict the client.
+        """
+        if self._closed:
+            return False
+
+        if message.kind is MessageClass.AUDIO and self._coalesce(message):
+            return True
+
+        if len(self._items) >= self.max_size:
+            self._drop_oldest_interim()
+
+        if len(self._items) >= self.max_size:
+            if message.kind is MessageClass.INTERIM:
+                self.stats.dropped_interim += 1
+                return True
+            if len(self._items) >= self.hard_limit:
+                self.stats.overflows += 1
+                return False
+
+        self._items.append(message)
+        self.stats.max_depth = max(self.stats.max_depth, len(self._items))
+        self._ready.set()
+        return True
+
+    async def get(self) -> Optional[OutboundMessage]:
+        """Wait for the next message; returns None once the queue is closed"""
+        while not self._items:
+            if self._closed:
+                return None
+            self._ready.clear()
+            await self._ready.wait()
+        return self._items.popleft()
+
+    def close(self) -> None:
+        """Stop accepting messages and wake up the writer"""
+        self._closed = True
+        self._items.clear()
+        self._ready.set()
+
+    def _coalesce(self, message: OutboundMessage) -> bool:
+        """Append audio to the queued tail chunk if it is still waiting"""
+        if not self._items:
+            return False
+        tail = self._items[-1]
+        if tail.kind is not MessageClass.AUDIO or tail.pcm is None:
+            return False
+        if stream_metadata(tail.metadata) != stream_metadata(message.metadata):
+            return False
+        if tail.pcm_bytes + message.pcm_bytes > self.audio_coalesce_max_bytes:
+            return False
+        tail.pcm.extend(message.pcm)
+        tail.pcm_bytes += message.pcm_bytes
+        self.stats.coalesced_audio += 1
+        return True
+
+    def _drop_oldest_interim(self) -> bool:
+        for i, item in enumerate(self._items):
+            if item.kind is MessageClass.INTERIM:
+                del self._items[i]
+                self.stats.dropped_interim += 1
+                return True
+        return False
@@ -0,0 +1,128 @@
+"""
+Binary audio frame protocol for the WebSocket server
+
+Clients can stream audio as binary WebSocket messages instead of
+base64-encoded JSON. Each binary message is a fixed 16-byte header
+followed by the raw audio payload:
+
+    offset  size  field
+    0       1     version       (PROTOCOL_VERSION)
+    1       1     codec         (CodecId, 0 = 16-bit LE PCM, 1 = Opus)
+    2       2     flags         (reserved, must be 0)
+    4       4     sequence      (uint32, wraps around)
+    8       8     timestamp_ms  (uint64, client capture time)
+    16      ...   payload
+
+All header fields are big-endian (network byte order). Opus payloads are
+length-prefixed packets, see codec.py. Clients that negotiate Opus for the
+downlink (``system_init``) receive TTS audio in the same binary format.
+
+Text messages stay JSON and carry control messages such as
+``system_init``, plus the legacy ``{"audio": "<base64>"}`` format for
+clients that have not switched to binary frames yet.
+"""
+
+import struct
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Sequence, Union
+
+
+PROTOCOL_VERSION = 1
+
+# version, codec, flags, sequence, timestamp_ms
+FRAME_HEADER = struct.Struct("!BBHIQ")
+FRAME_HEADER_SIZE = FRAME_HEADER.size
+
+SEQUENCE_MODULO = 1 << 32
+
+
+class CodecId(IntEnum):
+    """Audio codec carried in a binary frame"""
+
+    PCM_S16LE = 0
+    OPUS = 1
+
+
+class ProtocolError(ValueError):
+    """Raised when a binary frame cannot be parsed"""
+
+
+@dataclass
+class FrameHeader:
+    """Decoded binary frame header"""
+
+    version: int
+    codec: int
+    flags: int
+    sequence: int
+    timestamp_ms: int
+
+
+BinaryMessage = Union[bytes, bytearray, memoryview]
+
+
+def parse_binary_frame(message: BinaryMessage) -> tuple[FrameHeader, memoryview]:
+    """
+    Split a binary WebSocket message into header and payload.
+
+    The payload is returned as a memoryview over ``message`` so that no copy
+    is made until the audio is written into its final destination.
+
+    Raises:
+        ProtocolError: If the message is too short, uses an unknown
+            protocol version or an unsupported codec.
+    """
+    view = memoryview(message)
+    if len(view) < FRAME_HEADER_SIZE:
+        raise ProtocolError(
+            f"Frame too short: {len(view)} bytes (header is {FRAME_HEADER_SIZE})"
+        )
+
+    version, codec, flags, sequence, timestamp_ms = FRAME_HEADER.unpack_from(view)
+    if version != PROTOCOL_VERSION:
+        raise ProtocolError(f"Unsupported protocol version: {version}")
+
+    try:
+        CodecId(codec)
+    except ValueError:
+        raise ProtocolError(f"Unsupported codec id: {codec}") from None
+
+    header = FrameHeader(
+        version=version,
+        codec=codec,
+        flags=flags,
+        sequence=sequence,
+        timestamp_ms=timestamp_ms,
+    )
+    return header, view[FRAME_HEADER_SIZE:]
+
+
+def build_binary_frame(
+    payload: Union[BinaryMessage, Sequence[BinaryMessage]],
+    sequence: int,
+    timestamp_ms: int,
+    codec: int = CodecId.PCM_S16LE,
+) -> bytearray:
+    """
+    Build a binary WebSocket message from a payload and header fields.
+
+    ``payload`` may be a list of chunks (e.g. coalesced audio); each chunk
+    is copied exactly once, straight into the outgoing message.
+    """
+    chunks = [payload] if isinstance(payload, (bytes, bytearray, memoryview)) else payload
+    frame = bytearray(FRAME_HEADER_SIZE + sum(len(c) for c in chunks))
+    FRAME_HEADER.pack_into(
+        frame,
+        0,
+        PROTOCOL_VERSION,
+        int(codec),
+        0,
+        sequence % SEQUENCE_MODULO,
+        timestamp_ms,
+    )
+    offset = FRAME_HEADER_SIZE
+    for chunk in chunks:
+        frame[offset:offset + len(chunk)] = chunk
+        offset += len(chunk)
+    return frame
@@ -0,0 +1,567 @@
+"""
+Sharded WebSocket front-end
+
+A single WebSocketServerManager shares the extension's event loop, so one
+core caps the number of concurrent streams. With ``shards > 1`` the
+extension instead starts that many worker processes, each running its own
+WebSocketServerManager on the same port with SO_REUSEPORT, and the kernel
+spreads incoming connections across them.
+
+Workers decode client audio and control messages locally and forward them
+to the ShardHub in the extension process over a Unix socket. The hub keeps
+a client_id -> shard map and routes replies back to the shard that owns the
+connection. Outbound queues, codecs and eviction stay in the workers.
+
+IPC messages are length-prefixed:
+
+    [uint32 header length][uint32 payload length][uint8 type][JSON header][payload]
+
+The payload carries raw PCM for audio messages and is empty otherwise.
+"""
+
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import shutil
+import sys
+import struct
+import tempfile
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any, Callable, Optional, Union
+
+from .outbound import MessageClass
+from .websocket_server import AudioData, WebSocketServerManager
+
+
+# header length, payload length, message type
+IPC_HEADER = struct.Struct("!IIB")
+
+# Refuse absurd lengths from a confused peer
+MAX_IPC_MESSAGE = 16 * 1024 * 1024
+
+# How often the hub checks for (and restarts) dead workers
+SUPERVISE_INTERVAL_S = 1.0
+
+# Time workers get to close their clients on shutdown
+SHUTDOWN_TIMEOUT_S = 3.0
+
+CONNECT_RETRIES = 20
+CONNECT_RETRY_DELAY_S = 0.1
+
+
+class ShardMessage(IntEnum):
+    """IPC message types"""
+
+    # worker -> hub
+    HELLO = 1
+    CONNECTED = 2
+    DISCONNECTED = 3
+    AUDIO = 4
+    CMD = 5
+    # hub -> worker
+    SEND = 10
+    SEND_AUDIO = 11
+    EVICT = 12
+
+
+def default_ipc_path(port: int) -> str:
+    return os.path.join(tempfile.gettempdir(), f"voxflame_ws_{port}.sock")
+
+
+async def write_message(
+    writer: asyncio.StreamWriter,
+    msg_type: ShardMessage,
+    header: dict[str, Any],
+    payload: Union[bytes, memoryview] = b"",
+) -> None:
+    """Write one IPC message; the payload is handed to the transport as-is"""
+    header_bytes = json.dumps(header).encode("utf-8")
+    writer.write(
+        IPC_HEADER.pack(len(header_bytes), len(payload), msg_type) + header_bytes
+    )
+    if payload:
+        writer.write(payload)
+    await writer.drain()
+
+
+async def read_message(
+    reader: asyncio.StreamReader,
+) -> tuple[ShardMessage, dict[str, Any], bytes]:
+    """
+    Read one IPC message.
+
+    Raises:
+        asyncio.IncompleteReadError: When the peer closed the connection
+        ValueError: On a malformed message
+    """
+    header_len, payload_len, msg_type = IPC_HEADER.unpack(
+        await reader.readexactly(IPC_HEADER.size)
+    )
+    if header_len + payload_len > MAX_IPC_MESSAGE:
+        raise ValueError(f"IPC message too large: {header_len + payload_len} bytes")
+    header = json.loads(await reader.readexactly(header_len))
+    payload = await reader.readexactly(payload_len) if payload_len else b""
+    return ShardMessage(msg_type), header, payload
+
+
+# ---- worker process ----
+
+
+class _ShardLog:
+    """Stands in for ten_env in workers; the manager only uses it to log"""
+
+    def __init__(self, shard_id: int):
+        self._logger = logging.getLogger(f"websocket_server.shard{shard_id}")
+
+    def log_debug(self, msg: str) -> None:
+        self._logger.debug(msg)
+
+    def log_info(self, msg: str) -> None:
+        self._logger.info(msg)
+
+    def log_warn(self, msg: str) -> None:
+        self._logger.warning(msg)
+
+    def log_error(self, msg: str) -> None:
+        self._logger.error(msg)
+
+
+class _ShardWorker:
+    """One worker: a WebSocketServerManager bridged to the hub"""
+
+    def __init__(self, shard_id: int, ipc_path: str, manager_kwargs: dict[str, Any]):
+        self.shard_id = shard_id
+        self.ipc_path = ipc_path
+        self.log = _ShardLog(shard_id)
+        self.manager = WebSocketServerManager(
+            ten_env=self.log,
+            on_audio_callback=self._on_audio,
+            on_cmd_callback=self._on_cmd,
+            on_client_connected=self._on_client_connected,
+            on_client_disconnected=self._on_client_disconnected,
+            reuse_port=True,
+            **manager_kwargs,
+        )
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._write_lock = asyncio.Lock()
+        self._tasks: set[asyncio.Task] = set()
+
+    async def run(self) -> None:
+        reader, self._writer = await self._connect()
+        await self._send(ShardMessage.HELLO, {"shard": self.shard_id, "pid": os.getpid()})
+        await self.manager.start()
+        try:
+            while True:
+                msg_type, header, payload = await read_message(reader)
+                await self._handle(msg_type, header, payload)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            self.log.log_info("Hub connection closed, shutting down")
+        finally:
+            await self.manager.stop()
+            self._writer.close()
+
+    async def _connect(
+        self,
+    ) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        for _ in range(CONNECT_RETRIES - 1):
+            try:
+                return await asyncio.open_unix_connection(self.ipc_path)
+            except OSError:
+                await asyncio.sleep(CONNECT_RETRY_DELAY_S)
+        return await asyncio.open_unix_connection(self.ipc_path)
+
+    async def _send(
+        self,
+        msg_type: ShardMessage,
+        header: dict[str, Any],
+        payload: Union[bytes, memoryview] = b"",
+    ) -> None:
+        async with self._write_lock:
+            await write_message(self._writer, msg_type, header, payload)
+
+    async def _handle(
+        self, msg_type: ShardMessage, header: dict[str, Any], payload: bytes
+    ) -> None:
+        client_id = header.get("client_id")
+        if msg_type is ShardMessage.SEND:
+            kind = MessageClass(header["kind"])
+            if client_id:
+                if not await self.manager.send_to_client(
+                    client_id, header["message"], kind
+                ):
+                    self._evict([client_id])
+            else:
+                self._evict(await self.manager.broadcast(header["message"], kind))
+        elif msg_type is ShardMessage.SEND_AUDIO:
+            metadata = header.get("metadata")
+            if client_id:
+                if not await self.manager.send_audio_to_client(
+                    client_id, payload, metadata
+                ):
+                    self._evict([client_id])
+            else:
+                self._evict(
+                    await self.manager.send_audio_to_clients(payload, metadata)
+                )
+        elif msg_type is ShardMessage.EVICT:
+            self._evict(header.get("client_ids", []))
+        else:
+            self.log.log_warn(f"Unexpected IPC message from hub: {msg_type.name}")
+
+    def _evict(self, client_ids: list[str]) -> None:
+        # Closing sockets can take up to send_timeout; keep reading meanwhile
+        if not client_ids:
+            return
+        task = asyncio.create_task(self.manager.evict_clients(client_ids))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _on_audio(self, audio_data: AudioData) -> None:
+        await self._send(
+            ShardMessage.AUDIO,
+            {
+                "client_id": audio_data.client_id,
+                "metadata": audio_data.metadata,
+                "sequence": audio_data.sequence,
+                "timestamp_ms": audio_data.timestamp_ms,
+            },
+            audio_data.pcm_data,
+        )
+
+    async def _on_cmd(self, data: dict[str, Any], client_id: str) -> None:
+        await self._send(ShardMessage.CMD, {"client_id": client_id, "data": data})
+
+    async def _on_client_connected(self, client_id: str) -> None:
+        await self._send(ShardMessage.CONNECTED, {"client_id": client_id})
+
+    async def _on_client_disconnected(self, client_id: str) -> None:
+        await self._send(ShardMessage.DISCONNECTED, {"client_id": client_id})
+
+
+def run_shard(shard_id: int, ipc_path: str, manager_kwargs: dict[str, Any]) -> None:
+    """Entry point of a worker process"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format=f"%(asctime)s websocket_server[shard{shard_id}] %(levelname)s %(message)s",
+    )
+    try:
+        asyncio.run(_ShardWorker(shard_id, ipc_path, manager_kwargs).run())
+    except KeyboardInterrupt:
+        pass
+
+
+# ---- extension process ----
+
+
+@dataclass
+class _ShardLink:
+    """Hub side of the connection to one worker"""
+
+    shard_id: int
+    writer: asyncio.StreamWriter
+    clients: set[str] = field(default_factory=set)
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+
+def _python_executable() -> str:
+    # Embedded interpreters may report the host binary as sys.executable
+    name = os.path.basename(sys.executable or "")
+    if name.startswith("python"):
+        return sys.executable
+    return shutil.which("python3") or sys.executable
+
+
+class ShardHub:
+    """
+    Runs the sharded front-end from the extension process.
+
+    Offers the part of the WebSocketServerManager API the extension uses,
+    so the extension does not care whether clients are served in-process.
+    Overflowing clients are evicted by their worker, so the send methods
+    only report clients (or shards) that are gone.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        ten_env: Any,
+        shards: int,
+        ipc_path: str = "",
+        on_audio_callback: Optional[Callable[[AudioData], None]] = None,
+        on_cmd_callback: Optional[Callable[[dict, str], None]] = None,
+        on_client_connected: Optional[Callable[[str], None]] = None,
+        on_client_disconnected: Optional[Callable[[str], None]] = None,
+        **manager_kwargs: Any,
+    ):
+        self.host = host
+        self.port = port
+        self.ten_env = ten_env
+        self.shards = shards
+        self.ipc_path = ipc_path or default_ipc_path(port)
+        self.on_audio_callback = on_audio_callback
+        self.on_cmd_callback = on_cmd_callback
+        self.on_client_connected = on_client_connected
+        self.on_client_disconnected = on_client_disconnected
+        self.manager_kwargs = dict(host=host, port=port, **manager_kwargs)
+
+        self.client_shards: dict[str, _ShardLink] = {}
+        self.running = False
+        self._links: dict[int, _ShardLink] = {}
+        self._processes: dict[int, multiprocessing.Process] = {}
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._supervisor: Optional[asyncio.Task] = None
+        self._mp = multiprocessing.get_context("spawn")
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        if os.path.exists(self.ipc_path):
+            os.unlink(self.ipc_path)
+        self._server = await asyncio.start_unix_server(
+            self._handle_shard, path=self.ipc_path
+        )
+        self.running = True
+
+        self._mp.set_executable(_python_executable())
+        for shard_id in range(self.shards):
+            self._spawn(shard_id)
+        self._supervisor = asyncio.create_task(self._supervise())
+        self.ten_env.log_info(
+            f"WebSocket server started on ws://{self.host}:{self.port} "
+            f"with {self.shards} SO_REUSEPORT shards (ipc: {self.ipc_path})"
+        )
+
+    async def stop(self) -> None:
+        if not self.running:
+            return
+        self.running = False
+        if self._supervisor:
+            self._supervisor.cancel()
+            self._supervisor = None
+
+        # Like the in-process manager, stopping does not report every client
+        # as disconnected; forget them before the links go down.
+        self.client_shards.clear()
+        links = list(self._links.values())
+        self._links.clear()
+        for link in links:
+            link.clients.clear()
+            # EOF tells the worker to close its clients and exit
+            link.writer.close()
+        await asyncio.gather(
+            *(link.writer.wait_closed() for link in links), return_exceptions=True
+        )
+
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+
+        loop = asyncio.get_running_loop()
+        processes = list(self._processes.values())
+        self._processes.clear()
+        await asyncio.gather(
+            *(
+                loop.run_in_executor(None, p.join, SHUTDOWN_TIMEOUT_S)
+                for p in processes
+            )
+        )
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+        try:
+            os.unlink(self.ipc_path)
+        except OSError:
+            pass
+        self.ten_env.log_info("WebSocket shards stopped")
+
+    def _spawn(self, shard_id: int) -> None:
+        process = self._mp.Process(
+            target=run_shard,
+            args=(shard_id, self.ipc_path, self.manager_kwargs),
+            name=f"websocket-shard-{shard_id}",
+            daemon=True,
+        )
+        process.start()
+        self._processes[shard_id] = process
+
+    async def _supervise(self) -> None:
+        """Restart workers that died; their clients were already dropped"""
+        while self.running:
+            await asyncio.sleep(SUPERVISE_INTERVAL_S)
+            for shard_id, process in list(self._processes.items()):
+                if self.running and not process.is_alive():
+                    self.ten_env.log_warn(
+                        f"Shard {shard_id} exited with code {process.exitcode}, restarting"
+                    )
+                    try:
+                        self._spawn(shard_id)
+                    except Exception as e:
+                        self.ten_env.log_error(f"Failed to restart shard {shard_id}: {e}")
+
+    async def _handle_shard(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Serve one worker connection until it goes away"""
+        link = None
+        try:
+            msg_type, header, _ = await read_message(reader)
+            if msg_type is not ShardMessage.HELLO:
+                raise ValueError(f"Expected HELLO, got {msg_type.name}")
+            link = _ShardLink(shard_id=header["shard"], writer=writer)
+            self._links[link.shard_id] = link
+            self.ten_env.log_info(
+                f"Shard {link.shard_id} connected (pid {header.get('pid')})"
+            )
+
+            while True:
+                msg_type, header, payload = await read_message(reader)
+                await self._dispatch(link, msg_type, header, payload)
+
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except Exception as e:
+            self.ten_env.log_error(f"Shard connection error: {e}")
+        finally:
+            writer.close()
+            if link is not None:
+                if self._links.get(link.shard_id) is link:
+                    del self._links[link.shard_id]
+                for client_id in list(link.clients):
+                    await self._client_gone(link, client_id)
+                if self.running:
+                    self.ten_env.log_warn(f"Shard {link.shard_id} disconnected")
+
+    async def _dispatch(
+        self,
+        link: _ShardLink,
+        msg_type: ShardMessage,
+        header: dict[str, Any],
+        payload: bytes,
+    ) -> None:
+        client_id = header.get("client_id")
+        try:
+            if msg_type is ShardMessage.AUDIO:
+                if self.on_audio_callback:
+                    await self.on_audio_callback(
+                        AudioData(
+                            pcm_data=payload,
+                            client_id=client_id,
+                            metadata=header.get("metadata") or {},
+                            sequence=header.get("sequence"),
+                            timestamp_ms=header.get("timestamp_ms"),
+                        )
+                    )
+            elif msg_type is ShardMessage.CMD:
+                if self.on_cmd_callback:
+                    await self.on_cmd_callback(header["data"], client_id)
+            elif msg_type is ShardMessage.CONNECTED:
+                self.client_shards[client_id] = link
+                link.clients.add(client_id)
+                if self.on_client_connected:
+                    await self.on_client_connected(client_id)
+            elif msg_type is ShardMessage.DISCONNECTED:
+                await self._client_gone(link, client_id)
+            else:
+                self.ten_env.log_warn(
+                    f"Unexpected IPC message from shard {link.shard_id}: {msg_type.name}"
+                )
+        except Exception as e:
+            self.ten_env.log_error(f"Error handling {msg_type.name} from {client_id}: {e}")
+
+    async def _client_gone(self, link: _ShardLink, client_id: str) -> None:
+        link.clients.discard(client_id)
+        if self.client_shards.get(client_id) is link:
+            del self.client_shards[client_id]
+        if self.on_client_disconnected:
+            try:
+                await self.on_client_disconnected(client_id)
+            except Exception as e:
+                self.ten_env.log_error(f"Error in on_client_disconnected callback: {e}")
+
+    async def _send(
+        self,
+        link: _ShardLink,
+        msg_type: ShardMessage,
+        header: dict[str, Any],
+        payload: Union[bytes, memoryview] = b"",
+    ) -> bool:
+        try:
+            async with link.lock:
+                await write_message(link.writer, msg_type, header, payload)
+            return True
+        except Exception as e:
+            self.ten_env.log_error(f"Failed to reach shard {link.shard_id}: {e}")
+            return False
+
+    # ---- WebSocketServerManager-compatible API ----
+
+    async def broadcast(
+        self, message: dict[str, Any], kind: MessageClass = MessageClass.CONTROL
+    ) -> list[str]:
+        header = {"kind": kind.value, "message": message}
+        await asyncio.gather(
+            *(self._send(link, ShardMessage.SEND, header) for link in list(self._links.values()))
+        )
+        return []
+
+    async def send_to_client(
+        self,
+        client_id: str,
+        message: dict[str, Any],
+        kind: MessageClass = MessageClass.FINAL,
+    ) -> bool:
+        link = self.client_shards.get(client_id)
+        if link is None:
+            return False
+        return await self._send(
+            link,
+            ShardMessage.SEND,
+            {"client_id": client_id, "kind": kind.value, "message": message},
+        )
+
+    async def send_audio_to_clients(
+        self, pcm_data: bytes, metadata: Optional[dict[str, Any]] = None
+    ) -> list[str]:
+        header = {"metadata": metadata}
+        await asyncio.gather(
+            *(
+                self._send(link, ShardMessage.SEND_AUDIO, header, pcm_data)
+                for link in list(self._links.values())
+            )
+        )
+        return []
+
+    async def send_audio_to_client(
+        self,
+        client_id: str,
+        pcm_data: bytes,
+        metadata: Optional[dict[str, Any]] = None,
+    ) -> bool:
+        link = self.client_shards.get(client_id)
+        if link is None:
+            return False
+        return await self._send(
+            link,
+            ShardMessage.SEND_AUDIO,
+            {"client_id": client_id, "metadata": metadata},
+            pcm_data,
+        )
+
+    async def evict_clients(self, client_ids: list[str]) -> None:
+        by_shard: dict[int, list[str]] = {}
+        for client_id in client_ids:
+            link = self.client_shards.get(client_id)
+            if link is not None:
+                by_shard.setdefault(link.shard_id, []).append(client_id)
+        for shard_id, ids in by_shard.items():
+            link = self._links.get(shard_id)
+            if link is not None:
+                await self._send(link, ShardMessage.EVICT, {"client_ids": ids})
+
+    def get_client_count(self) -> int:
+        return len(self.client_shards)
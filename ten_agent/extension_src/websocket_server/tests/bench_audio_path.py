@@ -0,0 +1,289 @@
+#
+# This file is part of TEN Framework, an open source project.
+# Licensed under the Apache License, Version 2.0.
+# See the LICENSE file for more information.
+#
+"""
+Micro-benchmark: bytes allocated per second of audio on the hot path
+
+Compares the audio path as it was before the copy reductions (base64
+module, ring-buffer jitter buffer, one bytearray per client queue) with
+the current one, like for like:
+
+- uplink:   client message -> jitter buffer -> AudioFrame buffer,
+            for base64 JSON and for binary client messages
+- downlink: AudioFrame buffer -> outbound queue -> WebSocket payload,
+            for base64 JSON; binary PCM downlink is opt-in and new, so it
+            is listed on its own
+
+AudioFrame buffers are simulated with preallocated bytearrays, so the
+script runs without ten_runtime:
+
+    python tests/bench_audio_path.py
+"""
+
+import base64
+import binascii
+import importlib
+import json
+import os
+import sys
+import time
+import tracemalloc
+import types
+from typing import Optional
+
+SAMPLE_RATE = 16000
+BYTES_PER_SAMPLE = 2
+CLIENT_CHUNK_MS = 64  # typical browser capture chunk
+FRAME_MS = 40  # frame_duration_ms
+TTS_CHUNK_MS = 20
+SECONDS = 5
+CLIENTS = 4
+
+
+def _load_modules():
+    """Import the pure-Python helpers without the TEN addon package"""
+    pkg_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    pkg = types.ModuleType("ws_bench")
+    pkg.__path__ = [pkg_dir]
+    sys.modules["ws_bench"] = pkg
+    return (
+        importlib.import_module("ws_bench.protocol"),
+        importlib.import_module("ws_bench.jitter_buffer"),
+        importlib.import_module("ws_bench.outbound"),
+    )
+
+
+protocol, jitter_buffer, outbound = _load_modules()
+
+
+def _chunk_bytes(ms: int) -> int:
+    return SAMPLE_RATE * ms // 1000 * BYTES_PER_SAMPLE
+
+
+class RingJitterBuffer:
+    """
+    The previous JitterBuffer's in-order path: every chunk is copied into
+    a ring buffer, frames are copied out of it. The benchmark feeds chunks
+    in order, so reordering is left out.
+    """
+
+    def __init__(self, frame_bytes: int):
+        self.frame_bytes = frame_bytes
+        self._ring = bytearray(frame_bytes * 8)
+        self._read = 0
+        self._size = 0
+
+    def has_frame(self) -> bool:
+        return self._size >= self.frame_bytes
+
+    def push(self, payload, sequence: Optional[int] = None) -> None:
+        n = len(payload)
+        if self._size + n > len(self._ring):
+            self._grow(self._size + n)
+        ring = memoryview(self._ring)
+        data = memoryview(payload)
+        capacity = len(ring)
+        write = (self._read + self._size) % capacity
+        first = min(n, capacity - write)
+        ring[write:write + first] = data[:first]
+        if n > first:
+            ring[:n - first] = data[first:]
+        self._size += n
+
+    def read_into(self, dest: memoryview, max_bytes: Optional[int] = None) -> int:
+        n = min(self._size, self.frame_bytes if max_bytes is None else max_bytes)
+        ring = memoryview(self._ring)
+        capacity = len(ring)
+        first = min(n, capacity - self._read)
+        dest[:first] = ring[self._read:self._read + first]
+        if n > first:
+            dest[first:n] = ring[:n - first]
+        self._read = (self._read + n) % capacity
+        self._size -= n
+        return n
+
+    def _grow(self, needed: int) -> None:
+        ring = bytearray(max(len(self._ring) * 2, needed))
+        size = self._size
+        self.read_into(memoryview(ring), size)
+        self._ring = ring
+        self._read = 0
+        self._size = size
+
+
+# ---- uplink ----
+#
+# Each factory returns a step function fed one client message at a time.
+
+
+def _drain(jitter, frame_bytes: int) -> None:
+    while jitter.has_frame():
+        frame = bytearray(frame_bytes)  # AudioFrame.alloc_buf
+        jitter.read_into(memoryview(frame))
+
+
+def uplink_before_json(frame_bytes: int):
+    """base64.b64decode -> ring buffer copy -> frame"""
+    jitter = RingJitterBuffer(frame_bytes)
+
+    def step(message: str) -> None:
+        jitter.push(base64.b64decode(json.loads(message)["audio"]))
+        _drain(jitter, frame_bytes)
+
+    return step
+
+
+def uplink_current_json(frame_bytes: int):
+    """binascii.a2b_base64 on the str -> queued chunk -> frame"""
+    jitter = jitter_buffer.JitterBuffer(frame_bytes=frame_bytes)
+
+    def step(message: str) -> None:
+        jitter.push(binascii.a2b_base64(json.loads(message)["audio"]))
+        _drain(jitter, frame_bytes)
+
+    return step
+
+
+def uplink_before_binary(frame_bytes: int):
+    """memoryview payload -> ring buffer copy -> frame"""
+    jitter = RingJitterBuffer(frame_bytes)
+
+    def step(message: bytes) -> None:
+        header, payload = protocol.parse_binary_frame(message)
+        jitter.push(payload, header.sequence)
+        _drain(jitter, frame_bytes)
+
+    return step
+
+
+def uplink_current_binary(frame_bytes: int):
+    """memoryview payload queued as-is -> straight into the frame buffer"""
+    jitter = jitter_buffer.JitterBuffer(frame_bytes=frame_bytes)
+
+    def step(message: bytes) -> None:
+        header, payload = protocol.parse_binary_frame(message)
+        jitter.push(payload, header.sequence)
+        _drain(jitter, frame_bytes)
+
+    return step
+
+
+# ---- downlink ----
+
+
+def downlink_before_json():
+    """bytes(buf) -> bytearray per client queue -> base64 -> JSON"""
+
+    def step(buf: bytearray) -> None:
+        pcm = bytes(buf)
+        for _ in range(CLIENTS):
+            queued = bytearray(pcm)
+            json.dumps(
+                {"type": "audio", "audio": base64.b64encode(queued).decode("utf-8")}
+            )
+
+    return step
+
+
+def downlink_current_json():
+    """bytes(buf) shared by all queues -> b2a_base64 -> JSON"""
+
+    def step(buf: bytearray) -> None:
+        pcm = bytes(buf)
+        for _ in range(CLIENTS):
+            message = outbound.OutboundMessage(
+                kind=outbound.MessageClass.AUDIO, pcm=[pcm], pcm_bytes=len(pcm)
+            )
+            chunk = message.pcm[0]
+            json.dumps(
+                {
+                    "type": "audio",
+                    "audio": binascii.b2a_base64(chunk, newline=False).decode("ascii"),
+                }
+            )
+
+    return step
+
+
+def downlink_current_binary():
+    """bytes(buf) shared by all queues -> one copy into a binary frame"""
+    sequence = 0
+
+    def step(buf: bytearray) -> None:
+        nonlocal sequence
+        pcm = bytes(buf)
+        for _ in range(CLIENTS):
+            message = outbound.OutboundMessage(
+                kind=outbound.MessageClass.AUDIO, pcm=[pcm], pcm_bytes=len(pcm)
+            )
+            protocol.build_binary_frame(message.pcm, sequence=sequence, timestamp_ms=0)
+        sequence += 1
+
+    return step
+
+
+def measure(step, items: list) -> tuple[int, float]:
+    """
+    Return (bytes allocated, seconds) for feeding ``items`` one by one.
+
+    The transient peak of every call is summed, so short-lived copies
+    count even though they are freed before the next message.
+    """
+    allocated = 0
+    tracemalloc.start()
+    start = time.perf_counter()
+    for item in items:
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        step(item)
+        allocated += tracemalloc.get_traced_memory()[1] - base
+    elapsed = time.perf_counter() - start
+    tracemalloc.stop()
+    return allocated, elapsed
+
+
+def _report(name: str, allocated: int, elapsed: float, audio_seconds: float) -> None:
+    print(
+        f"{name:<28} {allocated / audio_seconds / 1024:>10.1f} KiB allocated"
+        f" per second of audio"
+        f"   {elapsed * 1000:>8.2f} ms"
+    )
+
+
+def main() -> None:
+    chunk_bytes = _chunk_bytes(CLIENT_CHUNK_MS)
+    frame_bytes = _chunk_bytes(FRAME_MS)
+    audio = os.urandom(_chunk_bytes(SECONDS * 1000))
+
+    chunks = [audio[i:i + chunk_bytes] for i in range(0, len(audio), chunk_bytes)]
+    json_messages = [
+        json.dumps({"audio": base64.b64encode(c).decode("ascii")}) for c in chunks
+    ]
+    binary_messages = [
+        bytes(protocol.build_binary_frame(c, sequence=i, timestamp_ms=0))
+        for i, c in enumerate(chunks)
+    ]
+
+    tts_bytes = _chunk_bytes(TTS_CHUNK_MS)
+    tts_frames = [
+        bytearray(audio[i:i + tts_bytes]) for i in range(0, len(audio), tts_bytes)
+    ]
+
+    print(f"{SECONDS}s of 16 kHz mono PCM, {CLIENTS} downlink clients")
+    runs = [
+        ("uplink before (json)", uplink_before_json(frame_bytes), json_messages),
+        ("uplink current (json)", uplink_current_json(frame_bytes), json_messages),
+        ("uplink before (binary)", uplink_before_binary(frame_bytes), binary_messages),
+        ("uplink current (binary)", uplink_current_binary(frame_bytes), binary_messages),
+        ("downlink before (json)", downlink_before_json(), tts_frames),
+        ("downlink current (json)", downlink_current_json(), tts_frames),
+        ("downlink current (binary)", downlink_current_binary(), tts_frames),
+    ]
+    for name, step, items in runs:
+        _report(name, *measure(step, items), SECONDS)
+
+
+if __name__ == "__main__":
+    main()
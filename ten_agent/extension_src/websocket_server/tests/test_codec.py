@@ -0,0 +1,166 @@
+#
+# This file is part of TEN Framework, an open source project.
+# Licensed under the Apache License, Version 2.0.
+# See the LICENSE file for more information.
+#
+import asyncio
+import base64
+import json
+import math
+import struct
+
+import pytest
+
+from ws_modules import load
+
+codec = load("codec")
+protocol = load("protocol")
+websocket_server = load("websocket_server")
+CodecId = protocol.CodecId
+
+requires_opus = pytest.mark.skipif(
+    not codec.OPUS_AVAILABLE, reason=f"Opus unavailable: {codec.OPUS_UNAVAILABLE_REASON}"
+)
+
+
+class _Env:
+    def __getattr__(self, name):
+        if not name.startswith("log_"):
+            raise AttributeError(name)
+        return lambda msg: None
+
+
+class _Socket:
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, message):
+        self.sent.append(message)
+
+
+def _manager(received):
+    async def on_audio(audio_data):
+        received.append(audio_data)
+
+    return websocket_server.WebSocketServerManager(
+        host="127.0.0.1", port=0, ten_env=_Env(), on_audio_callback=on_audio
+    )
+
+
+def _connect(manager, client_id):
+    socket = _Socket()
+    manager.clients[client_id] = websocket_server.ClientConnection(
+        client_id=client_id,
+        websocket=socket,
+        queue=websocket_server.OutboundQueue(8, 32000),
+    )
+    return socket
+
+
+def _tone(ms, sample_rate=16000):
+    samples = sample_rate * ms // 1000
+    return b"".join(
+        struct.pack("<h", int(8000 * math.sin(2 * math.pi * 440 * i / sample_rate)))
+        for i in range(samples)
+    )
+
+
+def test_codec_names():
+    assert codec.codec_from_name("PCM") is CodecId.PCM_S16LE
+    assert codec.codec_from_name("pcm_s16le") is CodecId.PCM_S16LE
+    with pytest.raises(codec.CodecError, match="Unknown codec"):
+        codec.codec_from_name("mp3")
+
+
+def test_packet_framing():
+    payload = codec.join_packets([b"abc", b"", b"de"])
+    assert [bytes(p) for p in codec.split_packets(payload)] == [b"abc", b"", b"de"]
+    with pytest.raises(codec.CodecError, match="Truncated Opus packet"):
+        codec.split_packets(payload[:-1])
+    with pytest.raises(codec.CodecError, match="length"):
+        codec.split_packets(b"\x00")
+
+
+def test_pcm_passes_through_untouched():
+    received = []
+    manager = _manager(received)
+    socket = _connect(manager, "c1")
+    pcm = _tone(20)
+    frame = protocol.build_binary_frame(pcm, sequence=3, timestamp_ms=5)
+
+    asyncio.run(manager._process_message(bytes(frame), socket, "c1"))
+
+    assert socket.sent == []
+    assert len(received) == 1
+    assert received[0].pcm_data == pcm
+    assert received[0].sequence == 3
+    assert manager.clients["c1"].decoder is None
+
+
+def test_negotiation_falls_back_to_pcm_without_opus(monkeypatch):
+    monkeypatch.setattr(codec, "OPUS_AVAILABLE", False)
+    manager = _manager([])
+    socket = _connect(manager, "c1")
+
+    asyncio.run(
+        manager._process_message(
+            json.dumps({"type": "system_init", "codec": "opus"}), socket, "c1"
+        )
+    )
+
+    conn = manager.clients["c1"]
+    assert conn.uplink_codec is CodecId.PCM_S16LE
+    assert conn.downlink_codec is CodecId.PCM_S16LE
+    assert conn.encoder is None
+    assert json.loads(socket.sent[0]) == {
+        "type": "error",
+        "error": "Opus requested but opuslib is not installed",
+    }
+    with pytest.raises(codec.CodecError):
+        codec.OpusDecoder(16000, 1)
+
+
+@requires_opus
+def test_opus_round_trip():
+    pcm = _tone(100)
+    encoder = codec.OpusEncoder(16000, 1, 2, frame_ms=20)
+    decoder = codec.OpusDecoder(16000, 1)
+
+    # 30 ms: one frame encoded, 10 ms kept back
+    first = encoder.encode(pcm[:960])
+    assert len(codec.split_packets(first)) == 1
+    assert encoder.has_residual
+    rest = encoder.encode(pcm[960:])
+    tail = encoder.flush()
+    assert tail is None and not encoder.has_residual
+
+    decoded = decoder.decode(first) + decoder.decode(rest)
+    assert len(decoded) == len(pcm)
+    assert len(first) + len(rest) < len(pcm) // 4
+
+
+@requires_opus
+def test_negotiated_opus_uplink_is_decoded():
+    received = []
+    manager = _manager(received)
+    socket = _connect(manager, "c1")
+    encoder = codec.OpusEncoder(16000, 1, 2)
+    payload = encoder.encode(_tone(40))
+
+    async def test():
+        await manager._process_message(
+            json.dumps({"type": "system_init", "codec": "opus"}), socket, "c1"
+        )
+        await manager._process_message(
+            json.dumps({"audio": base64.b64encode(payload).decode()}),
+            socket,
+            "c1",
+        )
+
+    asyncio.run(test())
+
+    conn = manager.clients["c1"]
+    assert conn.uplink_codec is CodecId.OPUS
+    assert conn.encoder is not None
+    assert socket.sent == []
+    assert len(received[0].pcm_data) == 16000 * 40 // 1000 * 2
@@ -0,0 +1,111 @@
+#
+# This file is part of TEN Framework, an open source project.
+# Licensed under the Apache License, Version 2.0.
+# See the LICENSE file for more information.
+#
+import os
+import time
+import wave
+
+from ws_modules import load
+
+dump_writer = load("dump_writer")
+
+
+class _Env:
+    def __init__(self):
+        self.errors = []
+
+    def log_error(self, msg):
+        self.errors.append(msg)
+
+
+def _writer(tmp_path, **kwargs):
+    kwargs.setdefault("max_bytes", 1 << 20)
+    return dump_writer.AudioDumpWriter(tmp_path / "dump.pcm", _Env(), **kwargs)
+
+
+def _dumps(tmp_path, suffix=".pcm"):
+    return sorted(tmp_path.glob(f"dump_*{suffix}"))
+
+
+def _age(path, seconds):
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns - int(seconds * 1e9)))
+
+
+def test_rotates_by_size(tmp_path):
+    writer = _writer(tmp_path, max_bytes=1000, max_files=0)
+    writer.start()
+    for _ in range(5):
+        writer.write("127.0.0.1:5000", b"\x00" * 400)
+    writer.stop()
+
+    # 400 + 400 + 400 crosses 1000, then a new file
+    assert [p.stat().st_size for p in _dumps(tmp_path)] == [1200, 800]
+    assert writer.stats.rotations == 1
+    assert writer.stats.written_bytes == 2000
+    assert all(p.name.startswith("dump_127.0.0.1_5000_") for p in _dumps(tmp_path))
+
+
+def test_rotates_by_time(tmp_path):
+    # Driven directly instead of through the thread to control the clock
+    writer = _writer(tmp_path, rotate_seconds=60, max_files=0)
+    writer._write("c1", b"\x00" * 10)
+    writer._write("c1", b"\x00" * 10)
+    assert writer.stats.rotations == 0
+
+    writer._files["c1"].opened_at = time.monotonic() - 61
+    writer._write("c1", b"\x00" * 10)
+    writer._close("c1")
+
+    assert writer.stats.rotations == 1
+    assert [p.stat().st_size for p in _dumps(tmp_path)] == [20, 10]
+
+
+def test_retention_spans_client_ids(tmp_path):
+    writer = _writer(tmp_path, max_files=3)
+    # Every reconnect gets a new ip:port client id
+    for i in range(5):
+        client_id = f"10.0.0.1:{40000 + i}"
+        writer._write(client_id, b"\x00" * 10)
+        writer._close(client_id)
+        for path in _dumps(tmp_path):
+            _age(path, 1)
+
+    kept = [p.name for p in _dumps(tmp_path)]
+    assert len(kept) == 3
+    for port in (40002, 40003, 40004):
+        assert any(name.startswith(f"dump_10.0.0.1_{port}_") for name in kept)
+
+
+def test_retention_keeps_open_files(tmp_path):
+    writer = _writer(tmp_path, max_files=2)
+    writer._write("connected", b"\x00" * 10)
+    _age(_dumps(tmp_path)[0], 100)
+    for i in range(3):
+        writer._write(f"gone{i}", b"\x00" * 10)
+        writer._close(f"gone{i}")
+
+    names = [p.name for p in _dumps(tmp_path)]
+    assert len(names) == 2
+    assert any(name.startswith("dump_connected_") for name in names)
+    writer._close("connected")
+
+
+def test_wav_header_has_data_length(tmp_path):
+    writer = _writer(tmp_path, wav=True, sample_rate=16000, channels=1)
+    writer.start()
+    writer.write("c1", b"\x01\x00" * 300)
+    writer.write("c1", memoryview(b"\x02\x00" * 200))
+    writer.close_client("c1")
+    writer.stop()
+
+    (path,) = _dumps(tmp_path, ".wav")
+    assert path.stat().st_size == 44 + 1000
+    with wave.open(str(path), "rb") as wav:
+        assert wav.getnframes() == 500
+        assert wav.getframerate() == 16000
+        assert wav.getnchannels() == 1
+        assert wav.getsampwidth() == 2
+        assert wav.readframes(1) == b"\x01\x00"
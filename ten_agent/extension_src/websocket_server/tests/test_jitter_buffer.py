@@ -0,0 +1,105 @@
+#
+# This file is part of TEN Framework, an open source project.
+# Licensed under the Apache License, Version 2.0.
+# See the LICENSE file for more information.
+#
+from ws_modules import load
+
+jitter_buffer = load("jitter_buffer")
+SEQUENCE_MODULO = load("protocol").SEQUENCE_MODULO
+
+
+def _read_all(buffer, max_bytes=None):
+    frames = []
+    while buffer.has_frame() or (max_bytes and buffer.available):
+        dest = bytearray(buffer.frame_bytes)
+        n = buffer.read_into(memoryview(dest), max_bytes)
+        frames.append(bytes(dest[:n]))
+    return frames
+
+
+def test_rechunks_into_fixed_frames():
+    buffer = jitter_buffer.JitterBuffer(frame_bytes=4)
+    for chunk in (b"ab", b"cdefg", b"", b"hijklm"):
+        buffer.push(chunk)
+
+    assert buffer.available == 13
+    assert _read_all(buffer) == [b"abcd", b"efgh", b"ijkl"]
+    assert buffer.available == 1 and not buffer.has_frame()
+
+    # The tail is handed out on request, e.g. at end of stream
+    dest = bytearray(4)
+    assert buffer.read_into(memoryview(dest), max_bytes=buffer.available) == 1
+    assert dest[:1] == b"m"
+    assert buffer.available == 0
+
+
+def test_reorders_by_sequence():
+    buffer = jitter_buffer.JitterBuffer(frame_bytes=2)
+    buffer.push(b"aa", sequence=10)
+    buffer.push(b"cc", sequence=12)
+    buffer.push(b"dd", sequence=13)
+    assert buffer.held == 2
+    assert buffer.available == 2
+
+    buffer.push(b"bb", sequence=11)
+    assert buffer.held == 0
+    assert _read_all(buffer) == [b"aa", b"bb", b"cc", b"dd"]
+    assert buffer.stats.reordered == 2
+
+
+def test_late_chunks_are_dropped():
+    buffer = jitter_buffer.JitterBuffer(frame_bytes=2)
+    buffer.push(b"aa", sequence=5)
+    buffer.push(b"bb", sequence=6)
+    buffer.push(b"xx", sequence=5)
+
+    assert _read_all(buffer) == [b"aa", b"bb"]
+    assert buffer.stats.late_dropped == 1
+
+
+def test_sequence_wraps_around():
+    buffer = jitter_buffer.JitterBuffer(frame_bytes=2)
+    buffer.push(b"aa", sequence=SEQUENCE_MODULO - 1)
+    buffer.push(b"cc", sequence=1)
+    buffer.push(b"bb", sequence=0)
+
+    assert _read_all(buffer) == [b"aa", b"bb", b"cc"]
+    assert buffer.stats.late_dropped == 0
+
+
+def test_gap_is_skipped_once_window_is_full():
+    buffer = jitter_buffer.JitterBuffer(frame_bytes=2, reorder_window=2)
+    buffer.push(b"aa", sequence=0)
+    # 1 never arrives
+    buffer.push(b"cc", sequence=2)
+    buffer.push(b"dd", sequence=3)
+    assert buffer.held == 2
+
+    buffer.push(b"ee", sequence=4)
+    assert buffer.stats.gaps == 1
+    assert buffer.held == 0
+    assert _read_all(buffer) == [b"aa", b"cc", b"dd", b"ee"]
+
+    # The missing chunk is now late
+    buffer.push(b"bb", sequence=1)
+    assert buffer.stats.late_dropped == 1
+
+
+def test_flush_releases_held_chunks_in_order():
+    buffer = jitter_buffer.JitterBuffer(frame_bytes=2)
+    buffer.push(b"aa", sequence=0)
+    buffer.push(b"ee", sequence=4)
+    buffer.push(b"cc", sequence=2)
+
+    buffer.flush()
+    assert buffer.held == 0
+    assert _read_all(buffer) == [b"aa", b"cc", b"ee"]
+
+
+def test_accepts_views_into_larger_messages():
+    message = b"\x00\x01" * 4
+    buffer = jitter_buffer.JitterBuffer(frame_bytes=4)
+    buffer.push(memoryview(message)[2:], sequence=0)
+
+    assert _read_all(buffer, max_bytes=4) == [b"\x00\x01\x00\x01", b"\x00\x01"]
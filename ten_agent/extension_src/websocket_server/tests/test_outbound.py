@@ -0,0 +1,128 @@
+#
+# This file is part of TEN Framework, an open source project.
+# Licensed under the Apache License, Version 2.0.
+# See the LICENSE file for more information.
+#
+import asyncio
+
+from ws_modules import load
+
+outbound = load("outbound")
+MessageClass = outbound.MessageClass
+OutboundMessage = outbound.OutboundMessage
+
+META = {"sample_rate": 16000, "channels": 1, "bytes_per_sample": 2}
+
+
+def _text(kind, text):
+    return OutboundMessage(kind=kind, payload=text)
+
+
+def _audio(pcm, **metadata):
+    return OutboundMessage(
+        kind=MessageClass.AUDIO,
+        pcm=[pcm],
+        pcm_bytes=len(pcm),
+        metadata={**META, "samples_per_channel": len(pcm) // 2, **metadata},
+    )
+
+
+def _drain(queue):
+    async def drain():
+        items = []
+        while queue.depth:
+            items.append(await queue.get())
+        return items
+
+    return asyncio.run(drain())
+
+
+def test_full_queue_drops_oldest_interim():
+    queue = outbound.OutboundQueue(max_size=3, audio_coalesce_max_bytes=1024)
+    assert queue.put(_text(MessageClass.INTERIM, "i1"))
+    assert queue.put(_text(MessageClass.FINAL, "f1"))
+    assert queue.put(_text(MessageClass.INTERIM, "i2"))
+    assert queue.put(_text(MessageClass.INTERIM, "i3"))
+
+    assert [m.payload for m in _drain(queue)] == ["f1", "i2", "i3"]
+    assert queue.stats.dropped_interim == 1
+
+
+def test_interim_is_dropped_when_nothing_else_can_go():
+    queue = outbound.OutboundQueue(max_size=2, audio_coalesce_max_bytes=1024)
+    queue.put(_text(MessageClass.FINAL, "f1"))
+    queue.put(_text(MessageClass.CONTROL, "c1"))
+    assert queue.put(_text(MessageClass.INTERIM, "i1"))
+
+    assert queue.depth == 2
+    assert queue.stats.dropped_interim == 1
+
+
+def test_control_and_final_grow_to_hard_limit():
+    queue = outbound.OutboundQueue(max_size=2, audio_coalesce_max_bytes=1024)
+    assert queue.hard_limit == 2 * outbound.HARD_LIMIT_FACTOR == 8
+    for i in range(queue.hard_limit):
+        kind = MessageClass.FINAL if i % 2 else MessageClass.CONTROL
+        assert queue.put(_text(kind, str(i)))
+    assert queue.depth == queue.hard_limit
+
+    # Stalled client: nothing is dropped, the caller evicts it
+    assert not queue.put(_text(MessageClass.FINAL, "late"))
+    assert queue.stats.overflows == 1
+    assert queue.stats.max_depth == queue.hard_limit
+    assert [m.payload for m in _drain(queue)] == [str(i) for i in range(8)]
+
+
+def test_closed_queue_rejects_messages():
+    queue = outbound.OutboundQueue(max_size=2, audio_coalesce_max_bytes=1024)
+    queue.put(_text(MessageClass.FINAL, "f1"))
+    queue.close()
+
+    assert not queue.put(_text(MessageClass.FINAL, "f2"))
+    assert asyncio.run(queue.get()) is None
+
+
+def test_audio_coalesces_only_with_same_stream():
+    queue = outbound.OutboundQueue(max_size=8, audio_coalesce_max_bytes=1024)
+    queue.put(_audio(b"\x01" * 320))
+    # Only samples_per_channel differs: same stream
+    queue.put(_audio(b"\x02" * 640))
+    # Different sample rate: new message
+    queue.put(_audio(b"\x03" * 320, sample_rate=24000))
+    # Another client session routed through the same queue
+    queue.put(_audio(b"\x04" * 320, sample_rate=24000, session_id="other"))
+
+    first, second, third = _drain(queue)
+    assert first.pcm == [b"\x01" * 320, b"\x02" * 640]
+    assert first.pcm_bytes == 960
+    assert second.pcm == [b"\x03" * 320]
+    assert third.pcm == [b"\x04" * 320]
+    assert queue.stats.coalesced_audio == 1
+
+
+def test_audio_does_not_coalesce_past_limit_or_across_text():
+    queue = outbound.OutboundQueue(max_size=8, audio_coalesce_max_bytes=640)
+    queue.put(_audio(b"\x01" * 320))
+    queue.put(_audio(b"\x02" * 320))
+    queue.put(_audio(b"\x03" * 320))  # 960 > 640
+    queue.put(_text(MessageClass.FINAL, "f1"))
+    queue.put(_audio(b"\x04" * 320))
+
+    assert [m.pcm_bytes for m in _drain(queue)] == [640, 320, 0, 320]
+
+
+def test_chunk_metadata_recomputes_samples_per_channel():
+    shared = {**META, "channels": 2, "samples_per_channel": 160}
+    merged = outbound.chunk_metadata(shared, 1280)
+
+    assert merged["samples_per_channel"] == 1280 // (2 * 2)
+    assert merged["sample_rate"] == 16000
+    # The shared dict is left alone
+    assert shared["samples_per_channel"] == 160
+    assert outbound.chunk_metadata(META, 1280) is META
+    assert outbound.chunk_metadata(None, 1280) is None
+
+
+def test_stream_metadata_ignores_per_frame_fields():
+    assert outbound.stream_metadata({**META, "samples_per_channel": 1}) == META
+    assert outbound.stream_metadata(None) == {}
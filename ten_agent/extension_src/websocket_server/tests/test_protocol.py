@@ -0,0 +1,81 @@
+#
+# This file is part of TEN Framework, an open source project.
+# Licensed under the Apache License, Version 2.0.
+# See the LICENSE file for more information.
+#
+import pytest
+
+from ws_modules import load
+
+protocol = load("protocol")
+
+
+def test_build_parse_round_trip():
+    payload = bytes(range(256)) * 4
+    frame = protocol.build_binary_frame(
+        payload, sequence=7, timestamp_ms=1_700_000_000_123, codec=protocol.CodecId.OPUS
+    )
+    assert len(frame) == protocol.FRAME_HEADER_SIZE + len(payload) == 16 + 1024
+
+    header, body = protocol.parse_binary_frame(bytes(frame))
+    assert header == protocol.FrameHeader(
+        version=protocol.PROTOCOL_VERSION,
+        codec=protocol.CodecId.OPUS,
+        flags=0,
+        sequence=7,
+        timestamp_ms=1_700_000_000_123,
+    )
+    assert isinstance(body, memoryview)
+    assert body == payload
+
+
+def test_build_joins_chunks_and_wraps_sequence():
+    frame = protocol.build_binary_frame(
+        [b"ab", bytearray(b"cd"), memoryview(b"ef")],
+        sequence=protocol.SEQUENCE_MODULO + 3,
+        timestamp_ms=0,
+    )
+    header, body = protocol.parse_binary_frame(frame)
+    assert header.sequence == 3
+    assert header.codec == protocol.CodecId.PCM_S16LE
+    assert body == b"abcdef"
+
+
+def test_header_only_frame_has_empty_payload():
+    frame = protocol.build_binary_frame(b"", sequence=0, timestamp_ms=0)
+    _, body = protocol.parse_binary_frame(frame)
+    assert len(body) == 0
+
+
+@pytest.mark.parametrize("size", [0, 1, protocol.FRAME_HEADER_SIZE - 1])
+def test_short_header_is_rejected(size):
+    frame = protocol.build_binary_frame(b"", sequence=0, timestamp_ms=0)
+    with pytest.raises(protocol.ProtocolError, match="too short"):
+        protocol.parse_binary_frame(frame[:size])
+
+
+def test_bad_version_is_rejected():
+    frame = protocol.build_binary_frame(b"\x00\x00", sequence=0, timestamp_ms=0)
+    frame[0] = protocol.PROTOCOL_VERSION + 1
+    with pytest.raises(protocol.ProtocolError, match="version"):
+        protocol.parse_binary_frame(frame)
+
+
+def test_bad_codec_is_rejected():
+    frame = protocol.build_binary_frame(b"\x00\x00", sequence=0, timestamp_ms=0)
+    frame[1] = 0xFF
+    with pytest.raises(protocol.ProtocolError, match="codec"):
+        protocol.parse_binary_frame(frame)
+
+
+def test_payload_length_follows_the_message():
+    # The header has no length field: the WebSocket message delimits the
+    # payload, so a truncated or padded message changes the payload, not
+    # the header.
+    frame = protocol.build_binary_frame(b"\x01\x02\x03\x04", sequence=1, timestamp_ms=2)
+    header, body = protocol.parse_binary_frame(frame[:-1])
+    assert header.sequence == 1
+    assert body == b"\x01\x02\x03"
+
+    header, body = protocol.parse_binary_frame(frame + b"\x05")
+    assert body == b"\x01\x02\x03\x04\x05"
@@ -0,0 +1,258 @@
+#
+# This file is part of TEN Framework, an open source project.
+# Licensed under the Apache License, Version 2.0.
+# See the LICENSE file for more information.
+#
+import asyncio
+import os
+
+import pytest
+
+from ws_modules import load
+
+shard = load("shard")
+ShardMessage = shard.ShardMessage
+
+
+class _Env:
+    def __init__(self):
+        self.lines = []
+
+    def __getattr__(self, name):
+        if not name.startswith("log_"):
+            raise AttributeError(name)
+        return lambda msg: self.lines.append((name[4:], msg))
+
+
+class _Writer:
+    """Collects what write_message writes"""
+
+    def __init__(self):
+        self.data = bytearray()
+
+    def write(self, data):
+        self.data += data
+
+    async def drain(self):
+        pass
+
+
+class _Process:
+    def __init__(self, alive=True, exitcode=None):
+        self.alive = alive
+        self.exitcode = exitcode
+        self.terminated = False
+
+    def is_alive(self):
+        return self.alive
+
+    def join(self, timeout=None):
+        pass
+
+    def terminate(self):
+        self.terminated = True
+        self.alive = False
+
+
+async def _until(condition, timeout=2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+def _reader(data, eof=True):
+    reader = asyncio.StreamReader()
+    reader.feed_data(bytes(data))
+    if eof:
+        reader.feed_eof()
+    return reader
+
+
+def test_message_framing_round_trip():
+    async def test():
+        writer = _Writer()
+        await shard.write_message(
+            writer, ShardMessage.AUDIO, {"client_id": "c1", "sequence": 7}, b"\x01\x02"
+        )
+        await shard.write_message(writer, ShardMessage.EVICT, {"client_ids": ["c1"]})
+        await shard.write_message(
+            writer, ShardMessage.CMD, {"data": {"text": "我要喝水"}}, memoryview(b"x")
+        )
+
+        reader = _reader(writer.data)
+        assert await shard.read_message(reader) == (
+            ShardMessage.AUDIO,
+            {"client_id": "c1", "sequence": 7},
+            b"\x01\x02",
+        )
+        assert await shard.read_message(reader) == (
+            ShardMessage.EVICT,
+            {"client_ids": ["c1"]},
+            b"",
+        )
+        assert await shard.read_message(reader) == (
+            ShardMessage.CMD,
+            {"data": {"text": "我要喝水"}},
+            b"x",
+        )
+        with pytest.raises(asyncio.IncompleteReadError):
+            await shard.read_message(reader)
+
+    asyncio.run(test())
+
+
+@pytest.mark.parametrize("cut", [1, shard.IPC_HEADER.size, -1])
+def test_truncated_message_raises_incomplete_read(cut):
+    async def test():
+        writer = _Writer()
+        await shard.write_message(writer, ShardMessage.AUDIO, {"client_id": "c1"}, b"pcm")
+        with pytest.raises(asyncio.IncompleteReadError):
+            await shard.read_message(_reader(writer.data[:cut]))
+
+    asyncio.run(test())
+
+
+def test_oversized_message_is_rejected():
+    async def test():
+        data = shard.IPC_HEADER.pack(2, shard.MAX_IPC_MESSAGE, ShardMessage.AUDIO)
+        with pytest.raises(ValueError, match="too large"):
+            await shard.read_message(_reader(data))
+
+    asyncio.run(test())
+
+
+@pytest.fixture
+def hub(tmp_path, monkeypatch):
+    """A hub whose workers are played by the test over the real IPC socket"""
+    events = []
+
+    async def on_connected(client_id):
+        events.append(("connected", client_id))
+
+    async def on_disconnected(client_id):
+        events.append(("disconnected", client_id))
+
+    async def on_audio(audio_data):
+        events.append(("audio", audio_data.client_id, bytes(audio_data.pcm_data)))
+
+    hub = shard.ShardHub(
+        host="127.0.0.1",
+        port=0,
+        ten_env=_Env(),
+        shards=2,
+        ipc_path=str(tmp_path / "hub.sock"),
+        on_audio_callback=on_audio,
+        on_client_connected=on_connected,
+        on_client_disconnected=on_disconnected,
+    )
+    hub.events = events
+    hub.spawned = []
+
+    def spawn(shard_id):
+        hub.spawned.append(shard_id)
+        hub._processes[shard_id] = _Process()
+
+    monkeypatch.setattr(hub, "_spawn", spawn)
+    monkeypatch.setattr(shard, "SUPERVISE_INTERVAL_S", 0.01)
+    return hub
+
+
+async def _connect_worker(hub, shard_id, *client_ids):
+    reader, writer = await asyncio.open_unix_connection(hub.ipc_path)
+    await shard.write_message(writer, ShardMessage.HELLO, {"shard": shard_id, "pid": 0})
+    for client_id in client_ids:
+        await shard.write_message(writer, ShardMessage.CONNECTED, {"client_id": client_id})
+    await _until(lambda: all(c in hub.client_shards for c in client_ids))
+    return reader, writer
+
+
+def test_hub_routes_to_owning_shard(hub):
+    async def test():
+        await hub.start()
+        try:
+            reader0, writer0 = await _connect_worker(hub, 0, "a")
+            reader1, writer1 = await _connect_worker(hub, 1, "b")
+            assert hub.get_client_count() == 2
+
+            assert await hub.send_to_client("b", {"text": "hi"})
+            assert await shard.read_message(reader1) == (
+                ShardMessage.SEND,
+                {"client_id": "b", "kind": "final", "message": {"text": "hi"}},
+                b"",
+            )
+            assert await hub.send_audio_to_client("a", b"\x00\x01", {"sample_rate": 16000})
+            msg_type, header, payload = await shard.read_message(reader0)
+            assert (msg_type, header["client_id"], payload) == (
+                ShardMessage.SEND_AUDIO,
+                "a",
+                b"\x00\x01",
+            )
+            # Nothing was sent to the other shard
+            for reader in (reader0, reader1):
+                with pytest.raises(asyncio.TimeoutError):
+                    await asyncio.wait_for(shard.read_message(reader), 0.05)
+            assert not await hub.send_to_client("unknown", {"text": "hi"})
+
+            # Uplink audio reaches the extension callback
+            await shard.write_message(writer0, ShardMessage.AUDIO, {"client_id": "a"}, b"pcm")
+            await _until(lambda: ("audio", "a", b"pcm") in hub.events)
+
+            await shard.write_message(writer1, ShardMessage.DISCONNECTED, {"client_id": "b"})
+            await _until(lambda: "b" not in hub.client_shards)
+            assert not await hub.send_to_client("b", {"text": "hi"})
+            writer0.close()
+            writer1.close()
+        finally:
+            await hub.stop()
+
+    asyncio.run(test())
+
+
+def test_dead_worker_drops_clients_and_is_restarted(hub):
+    async def test():
+        await hub.start()
+        try:
+            assert hub.spawned == [0, 1]
+            reader, writer = await _connect_worker(hub, 1, "a", "b")
+
+            # The worker process dies: its socket closes, its clients go
+            hub._processes[1].alive = False
+            hub._processes[1].exitcode = -9
+            writer.close()
+            await _until(lambda: hub.get_client_count() == 0)
+            assert ("disconnected", "a") in hub.events
+            assert ("disconnected", "b") in hub.events
+            assert 1 not in hub._links
+
+            await _until(lambda: hub.spawned == [0, 1, 1])
+            assert hub._processes[1].is_alive()
+            assert any("Shard 1 exited with code -9" in msg for _, msg in hub.ten_env.lines)
+        finally:
+            await hub.stop()
+
+    asyncio.run(test())
+
+
+def test_stop_closes_links_and_reaps_workers(hub):
+    async def test():
+        await hub.start()
+        reader, writer = await _connect_worker(hub, 0, "a")
+        processes = dict(hub._processes)
+
+        await hub.stop()
+
+        # The worker sees EOF, which makes it close its clients and exit
+        with pytest.raises(asyncio.IncompleteReadError):
+            await shard.read_message(reader)
+        assert hub.get_client_count() == 0
+        assert not hub._links and not hub._processes
+        assert all(p.terminated for p in processes.values())
+        assert not os.path.exists(hub.ipc_path)
+        # Stopping does not report clients as disconnected
+        assert ("disconnected", "a") not in hub.events
+
+        writer.close()
+        await hub.stop()  # idempotent
+
+    asyncio.run(test())
@@ -0,0 +1,27 @@
+#
+# This file is part of TEN Framework, an open source project.
+# Licensed under the Apache License, Version 2.0.
+# See the LICENSE file for more information.
+#
+"""
+Import the extension's modules for unit tests without the TEN addon
+
+The package __init__ registers the addon, which the fake app in conftest
+already does under its own name. Unit tests load the modules through a
+separate package instead, like tests/bench_audio_path.py.
+"""
+
+import importlib
+import os
+import sys
+import types
+
+PACKAGE = "ws_unit"
+
+
+def load(name: str) -> types.ModuleType:
+    if PACKAGE not in sys.modules:
+        pkg = types.ModuleType(PACKAGE)
+        pkg.__path__ = [os.path.dirname(os.path.dirname(os.path.abspath(__file__)))]
+        sys.modules[PACKAGE] = pkg
+    return importlib.import_module(f"{PACKAGE}.{name}")
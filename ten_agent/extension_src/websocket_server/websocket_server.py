@@ -1,25 +1,57 @@
 """
-WebSocket Server Manager for receiving audio data
+WebSocket Server Manager for receiving audio data (binary frames or base64 JSON)
 支持多客户端连接（每个客户端有独立的 ASR→LLM→TTS 会话）
 """
 
 import asyncio
 import json
-import base64
+import binascii
+import time
 import traceback
-from typing import Callable, Optional, Any, Dict
+from typing import Callable, Optional, Any, Dict, Union
 from dataclasses import dataclass
 import websockets
 from ten_runtime.async_ten_env import AsyncTenEnv
 
+from voxflame_common.log import Log
+
+from .codec import CodecError, OpusDecoder, OpusEncoder, codec_from_name
+from .outbound import MessageClass, OutboundMessage, OutboundQueue, chunk_metadata
+from .protocol import CodecId, ProtocolError, build_binary_frame, parse_binary_frame
+
+
+# Pad and send the last partial Opus frame after this much downlink silence
+OPUS_FLUSH_IDLE_S = 0.2
+
 
 @dataclass
 class AudioData:
-    """Container for audio data with metadata"""
+    """Container for audio data with metadata (always decoded to PCM)"""
 
-    pcm_data: bytes
+    pcm_data: Union[bytes, memoryview]
     client_id: str
     metadata: dict[str, Any]
+    # Only set for binary frames (see protocol.py)
+    sequence: Optional[int] = None
+    timestamp_ms: Optional[int] = None
+
+
+@dataclass
+class ClientConnection:
+    """A connected client: its socket, outbound queue and writer task"""
+
+    client_id: str
+    websocket: Any
+    queue: OutboundQueue
+    writer_task: Optional[asyncio.Task] = None
+    # Negotiated in system_init; binary frames may override the uplink codec
+    uplink_codec: CodecId = CodecId.PCM_S16LE
+    downlink_codec: CodecId = CodecId.PCM_S16LE
+    decoder: Optional[OpusDecoder] = None
+    encoder: Optional[OpusEncoder] = None
+    downlink_sequence: int = 0
+    # PCM downlink as binary frames instead of base64 JSON
+    binary_downlink: bool = False
 
 
 class WebSocketServerManager:
@@ -34,6 +66,18 @@ class WebSocketServerManager:
         on_cmd_callback: Optional[Callable[[dict, str], None]] = None,
         on_client_connected: Optional[Callable[[str], None]] = None,
         on_client_disconnected: Optional[Callable[[str], None]] = None,
+        send_timeout_ms: int = 2000,
+        outbound_queue_size: int = 256,
+        audio_coalesce_max_bytes: int = 32000,
+        sample_rate: int = 16000,
+        channels: int = 1,
+        bytes_per_sample: int = 2,
+        opus_frame_ms: int = 20,
+        opus_bitrate: int = 24000,
+        reuse_port: bool = False,
+        log_level: str = "info",
+        log_frame_summaries: bool = True,
+        log_summary_interval_s: float = 10.0,
     ):
         self.host = host
         self.port = port
@@ -42,10 +86,27 @@ class WebSocketServerManager:
         self.on_cmd_callback = on_cmd_callback
         self.on_client_connected = on_client_connected
         self.on_client_disconnected = on_client_disconnected
+        self.send_timeout = send_timeout_ms / 1000.0
+        self.outbound_queue_size = outbound_queue_size
+        self.audio_coalesce_max_bytes = audio_coalesce_max_bytes
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.bytes_per_sample = bytes_per_sample
+        self.opus_frame_ms = opus_frame_ms
+        self.opus_bitrate = opus_bitrate
+        # Set by shard workers so several processes can bind the same port
+        self.reuse_port = reuse_port
+        # Per-message and per-frame lines go through here, not ten_env
+        self.log = Log(
+            ten_env,
+            level=log_level,
+            frame_summaries=log_frame_summaries,
+            summary_interval_s=log_summary_interval_s,
+        )
 
         self.server = None
         # 改为支持多客户端
-        self.clients: Dict[str, Any] = {}  # client_id -> websocket
+        self.clients: Dict[str, ClientConnection] = {}
         self.running = False
         self._server_task: Optional[asyncio.Task] = None
         self._client_lock = asyncio.Lock()
@@ -60,6 +121,9 @@ class WebSocketServerManager:
                 self.ten_env.log_info(
                     f"WebSocket server: {len(self.clients)} clients connected"
                 )
+                for client_id, stats in self.get_client_stats().items():
+                    if stats["depth"] or stats["dropped_interim"] or stats["overflows"]:
+                        self.ten_env.log_info(f"Outbound queue {client_id}: {stats}")
             except Exception as e:
                 self.ten_env.log_error(f"Monitor error: {e}")
 
@@ -71,7 +135,10 @@ class WebSocketServerManager:
         self.running = True
         try:
             self.server = await websockets.serve(
-                self._handle_client, self.host, self.port
+                self._handle_client,
+                self.host,
+                self.port,
+                reuse_port=self.reuse_port or None,
             )
             self.ten_env.log_info(
                 f"WebSocket server started on ws://{self.host}:{self.port} (multi-client enabled)"
@@ -94,26 +161,39 @@ class WebSocketServerManager:
 
         # Close all client connections
         async with self._client_lock:
-            for client_id, ws in list(self.clients.items()):
-                try:
-                    await ws.close()
-                except:
-                    pass
+            clients = list(self.clients.values())
             self.clients.clear()
+        for conn in clients:
+            self._stop_writer(conn)
+        await asyncio.gather(
+            *(self._close_client(conn.websocket) for conn in clients),
+            return_exceptions=True,
+        )
 
         if self.server:
             self.server.close()
             await self.server.wait_closed()
 
+        self.log.flush()
         self.ten_env.log_info("WebSocket server stopped")
 
     async def _handle_client(self, websocket: Any) -> None:
         """Handle a WebSocket client connection"""
         client_id = f"{websocket.remote_address[0]}:{websocket.remote_address[1]}"
 
+        conn = ClientConnection(
+            client_id=client_id,
+            websocket=websocket,
+            queue=OutboundQueue(
+                max_size=self.outbound_queue_size,
+                audio_coalesce_max_bytes=self.audio_coalesce_max_bytes,
+            ),
+        )
+        conn.writer_task = asyncio.create_task(self._writer_loop(conn))
+
         # 添加到客户端列表
         async with self._client_lock:
-            self.clients[client_id] = websocket
+            self.clients[client_id] = conn
 
         self.ten_env.log_info(f"Client connected: {client_id} (total: {len(self.clients)})")
 
@@ -136,8 +216,10 @@ class WebSocketServerManager:
             self.ten_env.log_error(f"Error handling client {client_id}: {e}")
             await self._send_error(websocket, f"Server error: {str(e)}")
         finally:
+            self._stop_writer(conn)
             async with self._client_lock:
-                self.clients.pop(client_id, None)
+                if self.clients.get(client_id) is conn:
+                    del self.clients[client_id]
             self.ten_env.log_info(f"Client removed: {client_id} (remaining: {len(self.clients)})")
 
             # Notify about client disconnection
@@ -148,15 +230,20 @@ class WebSocketServerManager:
                     self.ten_env.log_error(f"Error in on_client_disconnected callback: {e}")
 
     async def _process_message(
-        self, message: str, websocket: Any, client_id: str
+        self, message: Union[str, bytes], websocket: Any, client_id: str
     ) -> None:
         """Process incoming message from client"""
+        if isinstance(message, (bytes, bytearray, memoryview)):
+            await self._process_binary_message(message, websocket, client_id)
+            return
+
         try:
-            self.ten_env.log_debug(f"Message from {client_id}: len={len(message)}")
+            self.log.debug("Message from %s: len=%d", client_id, len(message))
             data = json.loads(message)
 
             # Handle Command Messages (e.g. system_init)
             if data.get("type") == "system_init":
+                await self._apply_codec_settings(data, websocket, client_id)
                 if self.on_cmd_callback:
                     await self.on_cmd_callback(data, client_id)
                 return
@@ -166,30 +253,122 @@ class WebSocketServerManager:
                 return
 
             try:
-                pcm_data = base64.b64decode(data["audio"])
+                # a2b_base64 reads the ASCII str in place (no encode() copy)
+                pcm_data = binascii.a2b_base64(data["audio"])
             except Exception as e:
                 await self._send_error(websocket, f"Invalid base64: {e}")
                 return
 
+            try:
+                codec = (
+                    codec_from_name(data["codec"]) if "codec" in data else None
+                )
+                pcm_data = self._decode_audio(client_id, pcm_data, codec)
+            except CodecError as e:
+                await self._send_error(websocket, str(e))
+                return
+
             metadata = data.get("metadata", {})
             metadata["client_id"] = client_id
 
             audio_data = AudioData(
                 pcm_data=pcm_data, client_id=client_id, metadata=metadata
             )
-
-            if self.on_audio_callback:
-                try:
-                    await self.on_audio_callback(audio_data)
-                except Exception as e:
-                    self.ten_env.log_error(f"Audio callback error: {e}")
-                    await self._send_error(websocket, f"Processing error: {str(e)}")
+            await self._dispatch_audio(audio_data, websocket)
 
         except json.JSONDecodeError as e:
             await self._send_error(websocket, f"Invalid JSON: {e}")
         except Exception as e:
             self.ten_env.log_error(f"Error processing: {e}")
 
+    async def _process_binary_message(
+        self, message: bytes, websocket: Any, client_id: str
+    ) -> None:
+        """Process a binary audio frame (fixed header + raw PCM or Opus)"""
+        try:
+            header, payload = parse_binary_frame(message)
+            payload = self._decode_audio(client_id, payload, CodecId(header.codec))
+        except (ProtocolError, CodecError) as e:
+            await self._send_error(websocket, f"Invalid binary frame: {e}")
+            return
+
+        audio_data = AudioData(
+            pcm_data=payload,
+            client_id=client_id,
+            metadata={
+                "client_id": client_id,
+                "seq": header.sequence,
+                "timestamp_ms": header.timestamp_ms,
+            },
+            sequence=header.sequence,
+            timestamp_ms=header.timestamp_ms,
+        )
+        await self._dispatch_audio(audio_data, websocket)
+
+    async def _apply_codec_settings(
+        self, data: dict[str, Any], websocket: Any, client_id: str
+    ) -> None:
+        """
+        Read codec negotiation from system_init:
+        "codec" sets both directions, "uplink_codec"/"downlink_codec"
+        override one direction. Unknown codecs keep PCM and report an error.
+        "binary_downlink" sends PCM downlink audio as binary frames.
+        """
+        conn = self.clients.get(client_id)
+        if conn is None:
+            return
+        conn.binary_downlink = bool(data.get("binary_downlink", conn.binary_downlink))
+        try:
+            default = data.get("codec")
+            uplink = data.get("uplink_codec", default)
+            downlink = data.get("downlink_codec", default)
+            if uplink is not None:
+                conn.uplink_codec = codec_from_name(uplink)
+            if downlink is not None:
+                conn.downlink_codec = codec_from_name(downlink)
+                if conn.downlink_codec is CodecId.OPUS and conn.encoder is None:
+                    conn.encoder = OpusEncoder(
+                        self.sample_rate,
+                        self.channels,
+                        self.bytes_per_sample,
+                        frame_ms=self.opus_frame_ms,
+                        bitrate=self.opus_bitrate,
+                    )
+            self.ten_env.log_info(
+                f"Codecs for {client_id}: uplink={conn.uplink_codec.name}, "
+                f"downlink={conn.downlink_codec.name}"
+            )
+        except CodecError as e:
+            await self._send_error(websocket, str(e))
+
+    def _decode_audio(
+        self,
+        client_id: str,
+        payload: Union[bytes, memoryview],
+        codec: Optional[CodecId] = None,
+    ) -> Union[bytes, memoryview]:
+        """Turn an uplink payload into PCM using the frame's or client's codec"""
+        conn = self.clients.get(client_id)
+        if codec is None:
+            codec = conn.uplink_codec if conn else CodecId.PCM_S16LE
+        if codec is CodecId.PCM_S16LE:
+            return payload
+        if conn is None:
+            raise CodecError(f"Unknown client: {client_id}")
+        if conn.decoder is None:
+            conn.decoder = OpusDecoder(self.sample_rate, self.channels)
+        return conn.decoder.decode(payload)
+
+    async def _dispatch_audio(self, audio_data: AudioData, websocket: Any) -> None:
+        """Hand decoded audio to the extension callback"""
+        if not self.on_audio_callback:
+            return
+        try:
+            await self.on_audio_callback(audio_data)
+        except Exception as e:
+            self.ten_env.log_error(f"Audio callback error: {e}")
+            await self._send_error(websocket, f"Processing error: {str(e)}")
+
     async def _send_error(self, websocket: Any, error: str) -> None:
         """Send error message to client"""
         try:
@@ -197,53 +376,245 @@ class WebSocketServerManager:
         except:
             pass
 
-    async def broadcast(self, message: dict[str, Any]) -> None:
-        """Broadcast message to all connected clients"""
-        message_str = json.dumps(message)
-        self.ten_env.log_info(f"broadcast: Sending to {len(self.clients)} clients, message_len={len(message_str)}")
+    async def _snapshot_clients(self) -> list[ClientConnection]:
+        """Copy the client registry so no I/O ever runs under the lock"""
         async with self._client_lock:
-            for client_id, ws in list(self.clients.items()):
+            return list(self.clients.values())
+
+    async def _writer_loop(self, conn: ClientConnection) -> None:
+        """Drain one client's outbound queue onto its socket"""
+        queue = conn.queue
+        while True:
+            if conn.encoder is not None and conn.encoder.has_residual:
+                # Wait briefly for more TTS audio before padding the tail
                 try:
-                    self.ten_env.log_info(f"broadcast: Sending to client {client_id}")
-                    await ws.send(message_str)
-                    self.ten_env.log_info(f"broadcast: Successfully sent to {client_id}")
-                except Exception as e:
-                    self.ten_env.log_error(f"broadcast: Failed to send to {client_id}: {e}")
+                    message = await asyncio.wait_for(queue.get(), OPUS_FLUSH_IDLE_S)
+                except asyncio.TimeoutError:
+                    payload = self._opus_frame(conn, conn.encoder.flush())
+                    if not await self._send_payload(conn, payload):
+                        return
+                    continue
+            else:
+                message = await queue.get()
+            if message is None:
+                return
+            payload = self._encode_outbound(conn, message)
+            if payload is None:
+                continue
+            if not await self._send_payload(conn, payload):
+                return
+
+    async def _send_payload(
+        self, conn: ClientConnection, payload: Union[str, bytes]
+    ) -> bool:
+        """Send from the writer task; on failure close the connection"""
+        queue = conn.queue
+        if not await self._send_with_timeout(conn.client_id, conn.websocket, payload):
+            queue.stats.send_failures += 1
+            # Closing ends the reader loop, which runs the usual cleanup
+            queue.close()
+            await self._close_client(conn.websocket)
+            return False
+        queue.stats.sent += 1
+        queue.stats.sent_bytes += len(payload)
+        return True
+
+    def _stop_writer(self, conn: ClientConnection) -> None:
+        conn.queue.close()
+        if conn.writer_task and not conn.writer_task.done():
+            conn.writer_task.cancel()
+
+    def _encode_outbound(
+        self, conn: ClientConnection, message: OutboundMessage
+    ) -> Optional[Union[str, bytes]]:
+        """
+        Encode a queued message; audio is encoded only once coalesced.
+        Returns None when Opus is still waiting for a whole frame.
+        """
+        if message.pcm is None:
+            return message.payload
+        if conn.downlink_codec is CodecId.OPUS:
+            return self._opus_frame(conn, conn.encoder.encode(*message.pcm))
+        if conn.binary_downlink:
+            # Chunks are copied once, straight into the outgoing frame
+            frame = build_binary_frame(
+                message.pcm,
+                sequence=conn.downlink_sequence,
+                timestamp_ms=int(time.time() * 1000),
+            )
+            conn.downlink_sequence += 1
+            return frame
+        pcm = message.pcm[0] if len(message.pcm) == 1 else b"".join(message.pcm)
+        audio = {
+            "type": "audio",
+            "audio": binascii.b2a_base64(pcm, newline=False).decode("ascii"),
+        }
+        if message.metadata:
+            audio["metadata"] = chunk_metadata(message.metadata, message.pcm_bytes)
+        return json.dumps(audio)
+
+    @staticmethod
+    def _opus_frame(
+        conn: ClientConnection, payload: Optional[bytes]
+    ) -> Optional[bytes]:
+        """Wrap encoded Opus packets in a downlink binary frame"""
+        if payload is None:
+            return None
+        frame = build_binary_frame(
+            payload,
+            sequence=conn.downlink_sequence,
+            timestamp_ms=int(time.time() * 1000),
+            codec=CodecId.OPUS,
+        )
+        conn.downlink_sequence += 1
+        return frame
+
+    async def _send_with_timeout(
+        self, client_id: str, ws: Any, payload: Union[str, bytes]
+    ) -> bool:
+        """Send one pre-encoded message, giving up after send_timeout"""
+        try:
+            await asyncio.wait_for(ws.send(payload), timeout=self.send_timeout)
+            return True
+        except asyncio.TimeoutError:
+            self.ten_env.log_warn(
+                f"Send to {client_id} timed out after {self.send_timeout}s"
+            )
+        except Exception as e:
+            self.ten_env.log_error(f"Failed to send to {client_id}: {e}")
+        return False
+
+    async def broadcast(
+        self, message: dict[str, Any], kind: MessageClass = MessageClass.CONTROL
+    ) -> list[str]:
+        """
+        Queue a message for all connected clients.
+
+        The message is encoded once and put on each client's outbound queue;
+        the per-client writer tasks do the actual sends concurrently, so
+        slow clients neither delay each other nor the caller.
+
+        Returns:
+            IDs of clients whose queue overflowed (eviction candidates)
+        """
+        message_str = json.dumps(message)
+        clients = await self._snapshot_clients()
+        self.log.frame(
+            "broadcast",
+            "broadcast: Sending to %d clients, message_len=%d",
+            len(clients),
+            len(message_str),
+            size=len(message_str),
+        )
+
+        failed = []
+        for conn in clients:
+            if not conn.queue.put(OutboundMessage(kind=kind, payload=message_str)):
+                failed.append(conn.client_id)
+        return failed
+
+    async def evict_clients(self, client_ids: list[str]) -> None:
+        """Close connections that failed to keep up; cleanup runs in _handle_client"""
+        if not client_ids:
+            return
+        async with self._client_lock:
+            targets = [self.clients[cid] for cid in client_ids if cid in self.clients]
+        for conn in targets:
+            self.ten_env.log_warn(f"Evicting unresponsive client: {conn.client_id}")
+            self._stop_writer(conn)
+        await asyncio.gather(
+            *(self._close_client(conn.websocket) for conn in targets),
+            return_exceptions=True,
+        )
+
+    async def _close_client(self, ws: Any) -> None:
+        """Close a client socket without waiting forever on the handshake"""
+        try:
+            await asyncio.wait_for(ws.close(), timeout=self.send_timeout)
+        except Exception:
+            pass
 
     async def send_audio_to_clients(
         self, pcm_data: bytes, metadata: Optional[dict[str, Any]] = None
-    ) -> None:
-        """Send audio to all connected clients"""
-        self.ten_env.log_info(f"send_audio_to_clients: Called with {len(pcm_data)} bytes, clients={len(self.clients)}")
+    ) -> list[str]:
+        """
+        Queue audio for all connected clients
+
+        Returns:
+            IDs of clients whose queue overflowed
+        """
+        self.log.debug(
+            "send_audio_to_clients: Called with %d bytes, clients=%d",
+            len(pcm_data),
+            len(self.clients),
+        )
         if not self.clients:
-            self.ten_env.log_warn("send_audio_to_clients: No clients connected, skipping")
-            return
+            self.log.warn("send_audio_to_clients: No clients connected, skipping", every_s=10)
+            return []
 
-        try:
-            audio_base64 = base64.b64encode(pcm_data).decode("utf-8")
-            message = {"type": "audio", "audio": audio_base64}
-            if metadata:
-                message["metadata"] = metadata
-            self.ten_env.log_info(f"send_audio_to_clients: Broadcasting audio message")
-            await self.broadcast(message)
-            self.ten_env.log_info(f"send_audio_to_clients: Broadcast completed")
-        except Exception as e:
-            self.ten_env.log_error(f"Error sending audio: {e}")
+        failed = []
+        for conn in await self._snapshot_clients():
+            if not self._enqueue_audio(conn, pcm_data, metadata):
+                failed.append(conn.client_id)
+        return failed
+
+    async def send_audio_to_client(
+        self,
+        client_id: str,
+        pcm_data: bytes,
+        metadata: Optional[dict[str, Any]] = None,
+    ) -> bool:
+        """Queue audio for a single client"""
+        conn = self.clients.get(client_id)
+        if not conn:
+            self.log.debug(
+                "send_audio_to_client: %s not connected, dropping audio",
+                client_id,
+                every_s=5,
+            )
+            return False
+        return self._enqueue_audio(conn, pcm_data, metadata)
+
+    @staticmethod
+    def _enqueue_audio(
+        conn: ClientConnection,
+        pcm_data: bytes,
+        metadata: Optional[dict[str, Any]],
+    ) -> bool:
+        # The chunk is shared by all queues; coalescing only appends references
+        return conn.queue.put(
+            OutboundMessage(
+                kind=MessageClass.AUDIO,
+                pcm=[pcm_data],
+                pcm_bytes=len(pcm_data),
+                metadata=metadata,
+            )
+        )
 
     async def send_to_client(
-        self, client_id: str, message: dict[str, Any]
+        self,
+        client_id: str,
+        message: dict[str, Any],
+        kind: MessageClass = MessageClass.FINAL,
     ) -> bool:
-        """Send message to a specific client"""
-        async with self._client_lock:
-            ws = self.clients.get(client_id)
-            if not ws:
-                return False
-            try:
-                await ws.send(json.dumps(message))
-                return True
-            except:
-                return False
+        """
+        Queue a message for a specific client
+
+        Returns:
+            False if the client is gone or its queue overflowed
+        """
+        conn = self.clients.get(client_id)
+        if not conn:
+            return False
+        return conn.queue.put(OutboundMessage(kind=kind, payload=json.dumps(message)))
 
     def get_client_count(self) -> int:
         """Get number of connected clients"""
         return len(self.clients)
+
+    def get_client_stats(self) -> dict[str, dict[str, int]]:
+        """Outbound queue depth and drop/coalesce counters per client"""
+        return {
+            client_id: {"depth": conn.queue.depth, **conn.queue.stats.to_dict()}
+            for client_id, conn in list(self.clients.items())
+        }
@@ -0,0 +1,4 @@
+#
+# VoxFlame Common
+# Code shared by the VoxFlame graph extensions
+#
@@ -0,0 +1,161 @@
+#
+# VoxFlame Logging
+# Hot-path logging for the extensions: lazy formatting, rate limits, summaries
+#
+# ten_env.log_* takes a finished string, so f-strings on per-frame paths
+# are formatted even when the line is never shown. Log wraps ten_env (or
+# anything with the same log_* methods) and formats printf-style arguments
+# only once a line has passed its level, sampling and rate-limit checks:
+#
+#     log.debug("Message from %s: len=%d", client_id, len(message))
+#     log.warn("No clients connected, skipping", every_s=10)
+#     log.frame("audio_in", "Audio received: %d bytes", n, size=n)
+#
+# frame() is for events that happen per audio frame or chunk. With
+# frame_summaries on (the default) those lines are logged at debug and an
+# info summary per key (count, rate, bytes) is logged every
+# summary_interval_s instead. Summaries are emitted by the next frame()
+# call after the interval, so the hot path needs no timer task; call
+# flush() on stop for the last one.
+#
+
+import time
+from typing import Any, Dict, Optional
+
+LEVELS = {"debug": 10, "info": 20, "warn": 30, "error": 40}
+
+
+class _KeyState:
+    __slots__ = ("seen", "last_emit", "suppressed")
+
+    def __init__(self):
+        self.seen = 0
+        self.last_emit = float("-inf")
+        self.suppressed = 0
+
+
+class _FrameCounter:
+    __slots__ = ("count", "size", "since")
+
+    def __init__(self, now: float):
+        self.count = 0
+        self.size = 0
+        self.since = now
+
+
+class Log:
+    """
+    Level-filtered, lazily formatted logging on top of ten_env.
+
+    Lines below `level` are dropped before formatting. A line passed
+    `every_s` is logged at most once per that many seconds per key and
+    `sample=N` logs one in N; the key defaults to the format string. The
+    next line that gets through reports how many were suppressed.
+    """
+
+    def __init__(
+        self,
+        ten_env: Any,
+        level: str = "info",
+        prefix: str = "",
+        frame_summaries: bool = True,
+        summary_interval_s: float = 10.0,
+    ):
+        if level not in LEVELS:
+            raise ValueError(f"Unknown log level: {level}")
+        self.ten_env = ten_env
+        self.level = LEVELS[level]
+        self.prefix = prefix
+        self.frame_summaries = frame_summaries
+        self.summary_interval_s = summary_interval_s
+        self._keys: Dict[str, _KeyState] = {}
+        self._frames: Dict[str, _FrameCounter] = {}
+        self._next_summary = time.monotonic() + summary_interval_s
+
+    def enabled(self, level: str) -> bool:
+        return LEVELS[level] >= self.level
+
+    def debug(self, msg: str, *args: Any, **limits: Any) -> None:
+        self._log("debug", msg, args, **limits)
+
+    def info(self, msg: str, *args: Any, **limits: Any) -> None:
+        self._log("info", msg, args, **limits)
+
+    def warn(self, msg: str, *args: Any, **limits: Any) -> None:
+        self._log("warn", msg, args, **limits)
+
+    def error(self, msg: str, *args: Any, **limits: Any) -> None:
+        self._log("error", msg, args, **limits)
+
+    def frame(self, key: str, msg: str, *args: Any, size: int = 0) -> None:
+        """A per-frame event: counted for the summary and logged per level"""
+        counter = self._frames.get(key)
+        now = time.monotonic()
+        if counter is None:
+            counter = self._frames[key] = _FrameCounter(now)
+        counter.count += 1
+        counter.size += size
+
+        if self.frame_summaries:
+            if self.level <= LEVELS["debug"]:
+                self._emit("debug", msg, args)
+            if now >= self._next_summary:
+                self.flush(now)
+        elif self.level <= LEVELS["info"]:
+            self._emit("info", msg, args)
+
+    def flush(self, now: Optional[float] = None) -> None:
+        """Log and reset the frame summaries"""
+        now = time.monotonic() if now is None else now
+        self._next_summary = now + self.summary_interval_s
+        if not self.frame_summaries or self.level > LEVELS["info"]:
+            return
+        for key, counter in self._frames.items():
+            if not counter.count:
+                continue
+            elapsed = max(now - counter.since, 1e-6)
+            line = (
+                f"{key}: {counter.count} in {elapsed:.1f}s "
+                f"({counter.count / elapsed:.1f}/s)"
+            )
+            if counter.size:
+                line += f", {counter.size} bytes"
+            self._emit("info", line, ())
+            counter.count = counter.size = 0
+            counter.since = now
+
+    def _log(
+        self,
+        level: str,
+        msg: str,
+        args: tuple,
+        key: Optional[str] = None,
+        every_s: float = 0.0,
+        sample: int = 1,
+    ) -> None:
+        if LEVELS[level] < self.level:
+            return
+        if every_s <= 0 and sample <= 1:
+            self._emit(level, msg, args)
+            return
+
+        state = self._keys.get(key or msg)
+        if state is None:
+            state = self._keys[key or msg] = _KeyState()
+        state.seen += 1
+        now = time.monotonic()
+        if (sample > 1 and (state.seen - 1) % sample) or now - state.last_emit < every_s:
+            state.suppressed += 1
+            return
+        suppressed, state.suppressed = state.suppressed, 0
+        state.last_emit = now
+        self._emit(level, msg, args, suppressed)
+
+    def _emit(self, level: str, msg: str, args: tuple, suppressed: int = 0) -> None:
+        try:
+            line = msg % args if args else msg
+        except (TypeError, ValueError):
+            line = f"{msg} {args!r}"
+        if suppressed:
+            line += f" ({suppressed} similar suppressed)"
+        getattr(self.ten_env, f"log_{level}")(self.prefix + line)
@@ -0,0 +1,290 @@
+#
+# VoxFlame Metrics
+# Prometheus-style counters, gauges and histograms shared by the extensions
+#
+# Metrics live in one process-wide registry. Hot paths only add to plain
+# attributes (no locks): all updates come from the extensions' event loop.
+# Values that already exist elsewhere (client counts, queue depths, cache
+# counters) are read by callbacks when the registry is rendered, so they
+# cost nothing until scraped.
+#
+# The registry is served as Prometheus text on a small HTTP endpoint
+# (MetricsServer) and/or written to a file periodically (MetricsFileWriter),
+# e.g. for node_exporter's textfile collector. Rates such as frames per
+# second come from rate() over the _total counters.
+#
+
+import asyncio
+import math
+import os
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Seconds; tuned for per-stage and end-to-end utterance latency
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.5, 5.0, 10.0,
+)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(str(v))}"' for k, v in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Counter:
+    """Monotonically increasing count"""
+
+    kind = "counter"
+
+    def __init__(self, labels: Labels = ()):
+        self.labels = labels
+        self.value = 0
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+    def samples(self, name: str) -> List[str]:
+        return [f"{name}{_format_labels(self.labels)} {_format_value(self.value)}"]
+
+
+class Gauge:
+    """Value that goes up and down, set directly or read from a callback"""
+
+    kind = "gauge"
+
+    def __init__(self, labels: Labels = (), fn: Optional[Callable[[], float]] = None):
+        self.labels = labels
+        self.value = 0
+        self.fn = fn
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        self.value -= amount
+
+    def samples(self, name: str) -> List[str]:
+        value = self.fn() if self.fn is not None else self.value
+        return [f"{name}{_format_labels(self.labels)} {_format_value(value)}"]
+
+
+class CounterFunc(Gauge):
+    """Counter whose value is kept elsewhere (e.g. a stats dataclass)"""
+
+    kind = "counter"
+
+
+class Histogram:
+    """Observations counted into cumulative buckets"""
+
+    kind = "histogram"
+
+    def __init__(self, labels: Labels = (), buckets: Iterable[float] = DEFAULT_BUCKETS):
+        self.labels = labels
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)  # Last one is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def samples(self, name: str) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (math.inf,), self.counts):
+            cumulative += count
+            le = _format_labels(self.labels, ("le", _format_value(bound)))
+            lines.append(f"{name}_bucket{le} {cumulative}")
+        labels = _format_labels(self.labels)
+        lines.append(f"{name}_sum{labels} {_format_value(self.sum)}")
+        lines.append(f"{name}_count{labels} {self.count}")
+        return lines
+
+
+class Registry:
+    """
+    Metrics by name and labels.
+
+    Asking for an existing metric returns it, so extensions can look their
+    metrics up where they use them. Callback metrics are replaced, so a
+    restarted extension points them at its new state.
+    """
+
+    def __init__(self):
+        # name -> (kind, help, {labels: metric})
+        self._families: Dict[str, Tuple[str, str, Dict[Labels, object]]] = {}
+
+    def counter(self, name: str, help: str = "", **labels: str) -> Counter:
+        return self._get(name, help, labels, Counter.kind, Counter)
+
+    def gauge(self, name: str, help: str = "", **labels: str) -> Gauge:
+        return self._get(name, help, labels, Gauge.kind, Gauge)
+
+    def histogram(
+        self,
+        name: str,
+        help: str = "",
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+        **labels: str,
+    ) -> Histogram:
+        return self._get(
+            name, help, labels, Histogram.kind, lambda key: Histogram(key, buckets)
+        )
+
+    def gauge_func(
+        self, name: str, help: str, fn: Callable[[], float], **labels: str
+    ) -> Gauge:
+        return self._set(name, help, labels, Gauge, fn)
+
+    def counter_func(
+        self, name: str, help: str, fn: Callable[[], float], **labels: str
+    ) -> CounterFunc:
+        return self._set(name, help, labels, CounterFunc, fn)
+
+    def _family(self, name: str, help: str, kind: str) -> Dict[Labels, object]:
+        family = self._families.get(name)
+        if family is None:
+            family = self._families[name] = (kind, help, {})
+        elif family[0] != kind:
+            raise ValueError(f"Metric {name} is a {family[0]}, not a {kind}")
+        return family[2]
+
+    def _get(self, name, help, labels, kind, factory):
+        key: Labels = tuple(sorted(labels.items()))
+        metrics = self._family(name, help, kind)
+        metric = metrics.get(key)
+        if metric is None:
+            metric = metrics[key] = factory(key)
+        return metric
+
+    def _set(self, name, help, labels, cls, fn):
+        key: Labels = tuple(sorted(labels.items()))
+        metric = cls(key, fn=fn)
+        self._family(name, help, cls.kind)[key] = metric
+        return metric
+
+    def render(self) -> str:
+        """Prometheus text exposition format"""
+        lines = []
+        for name, (kind, help, metrics) in sorted(self._families.items()):
+            if help:
+                lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            for metric in list(metrics.values()):
+                try:
+                    lines.extend(metric.samples(name))
+                except Exception:
+                    # A callback whose owner is gone; skip it
+                    continue
+        return "\n".join(lines) + "\n"
+
+    def clear(self) -> None:
+        self._families.clear()
+
+
+class MetricsServer:
+    """Serves GET /metrics over plain HTTP/1.0 on the event loop"""
+
+    def __init__(self, registry: "Registry", host: str = "0.0.0.0", port: int = 9464):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    @property
+    def running(self) -> bool:
+        return self._server is not None
+
+    async def start(self) -> None:
+        if self._server is None:
+            self._server = await asyncio.start_server(self._handle, self.host, self.port)
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            request = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), 5)
+            method, _, rest = request.decode("latin-1").partition(" ")
+            path = rest.split(" ", 1)[0].split("?", 1)[0]
+            if method == "GET" and path in ("/metrics", "/"):
+                status, body = "200 OK", self.registry.render()
+            else:
+                status, body = "404 Not Found", "not found\n"
+            data = body.encode("utf-8")
+            writer.write(
+                (
+                    f"HTTP/1.0 {status}\r\n"
+                    "Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    "Connection: close\r\n\r\n"
+                ).encode("latin-1")
+                + data
+            )
+            await writer.drain()
+        except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+class MetricsFileWriter:
+    """Writes the registry to a file every interval_s, replacing it atomically"""
+
+    def __init__(self, registry: "Registry", path: str, interval_s: float = 15.0):
+        self.registry = registry
+        self.path = path
+        self.interval_s = interval_s
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+            self.write()
+
+    def write(self) -> None:
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.registry.render())
+        os.replace(tmp, self.path)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval_s)
+            self.write()
+
+
+# Shared by every extension in the process
+registry = Registry()
@@ -0,0 +1,73 @@
+#
+# VoxFlame Logging tests
+#
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from voxflame_common.log import Log  # noqa: E402
+
+
+class _Env:
+    def __init__(self):
+        self.lines = []
+
+    def __getattr__(self, name):
+        if not name.startswith("log_"):
+            raise AttributeError(name)
+        return lambda msg: self.lines.append((name[4:], msg))
+
+
+class _Lazy:
+    formatted = 0
+
+    def __str__(self):
+        _Lazy.formatted += 1
+        return "lazy"
+
+
+def test_disabled_levels_are_not_formatted():
+    env = _Env()
+    log = Log(env, level="info", prefix="[x] ")
+    log.debug("value: %s", _Lazy())
+    log.info("value: %s", _Lazy())
+
+    assert _Lazy.formatted == 1
+    assert env.lines == [("info", "[x] value: lazy")]
+
+
+def test_rate_limit_and_sampling_report_suppressed_lines():
+    env = _Env()
+    log = Log(env)
+    for i in range(3):
+        log.warn("no clients", every_s=60)
+    for i in range(5):
+        log.info("chunk %d", i, sample=2)
+
+    assert env.lines == [
+        ("warn", "no clients"),
+        ("info", "chunk 0"),
+        ("info", "chunk 2 (1 similar suppressed)"),
+        ("info", "chunk 4 (1 similar suppressed)"),
+    ]
+
+
+def test_frames_are_summarized():
+    env = _Env()
+    log = Log(env, summary_interval_s=60)
+    for _ in range(50):
+        log.frame("audio_in", "Audio received: %d bytes", 640, size=640)
+    assert env.lines == []
+
+    log.flush()
+    assert len(env.lines) == 1
+    level, line = env.lines[0]
+    assert level == "info"
+    assert line.startswith("audio_in: 50 in ")
+    assert line.endswith(", 32000 bytes")
+
+    legacy = Log(env, frame_summaries=False)
+    legacy.frame("audio_in", "Audio received: %d bytes", 640, size=640)
+    assert env.lines[-1] == ("info", "Audio received: 640 bytes")
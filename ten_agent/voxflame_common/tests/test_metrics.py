@@ -0,0 +1,53 @@
+#
+# VoxFlame Metrics tests
+#
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from voxflame_common.metrics import MetricsServer, Registry  # noqa: E402
+
+
+def test_render_counters_gauges_and_histograms():
+    registry = Registry()
+    registry.counter("frames_total", "Frames", direction="in").inc(3)
+    assert registry.counter("frames_total", direction="in").value == 3
+    registry.gauge_func("clients", "Clients", lambda: 2)
+    latency = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+    latency.observe(0.05)
+    latency.observe(0.5)
+    latency.observe(5)
+
+    lines = registry.render().splitlines()
+    assert "# TYPE frames_total counter" in lines
+    assert 'frames_total{direction="in"} 3' in lines
+    assert "clients 2" in lines
+    assert 'latency_seconds_bucket{le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{le="1"} 2' in lines
+    assert 'latency_seconds_bucket{le="+Inf"} 3' in lines
+    assert "latency_seconds_count 3" in lines
+
+
+def test_server_serves_metrics():
+    registry = Registry()
+    registry.counter("requests_total").inc()
+
+    async def scrape() -> bytes:
+        server = MetricsServer(registry, "127.0.0.1", 0)
+        await server.start()
+        port = server._server.sockets[0].getsockname()[1]
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"GET /metrics HTTP/1.1\r\nHost: x\r\n\r\n")
+            response = await reader.read()
+            writer.close()
+            return response
+        finally:
+            await server.stop()
+
+    response = asyncio.run(scrape())
+    assert response.startswith(b"HTTP/1.0 200 OK")
+    assert response.endswith(b"requests_total 1\n")
@@ -0,0 +1,45 @@
+#
+# VoxFlame Tracing tests
+#
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from voxflame_common.tracing import (  # noqa: E402
+    ASR_FINAL,
+    AUDIO_OUT,
+    SPEECH_END,
+    TraceContext,
+    Tracer,
+)
+
+
+def test_trace_survives_message_round_trip():
+    trace = TraceContext.new().mark(SPEECH_END, 10.0)
+    # As echoed by STT: the frame metadata nested in asr_result metadata
+    asr_data = json.loads(
+        json.dumps({"text": "hi", "metadata": {"trace": trace.to_dict()}})
+    )
+
+    found = TraceContext.find(asr_data).mark(ASR_FINAL, 10.25)
+    # A stage keeps its first mark
+    found.mark(ASR_FINAL, 99.0)
+    assert found.trace_id == trace.trace_id
+    assert found.spans() == {"stt": 250.0}
+    assert TraceContext.find({"metadata": {"client_id": "c1"}}) is None
+
+
+def test_tracer_records_each_utterance_once():
+    tracer = Tracer(window=4)
+    for i in range(6):
+        trace = TraceContext(f"t{i}", {SPEECH_END: 0.0, AUDIO_OUT: (i + 1) / 10})
+        assert tracer.record(trace) is not None
+        assert tracer.record(trace) is None
+
+    stats = tracer.percentiles((0.5, 1.0))
+    assert tracer.traces == 6
+    # Only the last 4 utterances are in the window
+    assert stats == {"total": {"count": 6, "p50": 500.0, "p100": 600.0}}
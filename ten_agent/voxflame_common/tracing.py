@@ -0,0 +1,176 @@
+#
+# VoxFlame Tracing
+# Per-utterance latency tracing across the graph extensions
+#
+# An utterance's trace is created by websocket_server when its audio
+# starts and travels with it as a "trace" property: in the audio frame
+# metadata (echoed by STT on asr_result), on asr_result to the corrector,
+# on corrected_text back to main_control, and in the TTS request metadata
+# (echoed on the TTS audio frames). Each extension marks the stages it
+# sees; websocket_server records the trace when the first TTS audio of the
+# utterance comes back.
+#
+# All extensions run in one process, so marks use time.monotonic() and the
+# tracer below is shared by all of them.
+#
+
+import time
+import uuid
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Iterable, Optional
+
+# Stages in utterance order
+SPEECH_START = "speech_start"  # First audio of the utterance received
+SPEECH_END = "speech_end"  # Last audio received before the final ASR result
+ASR_FINAL = "asr_final"  # Final ASR result at main_control
+CORRECTOR_IN = "corrector_in"  # asr_result received by the corrector
+CORRECTION_START = "correction_start"  # Correction job got a pipeline slot
+CORRECTION_DONE = "correction_done"  # Correction (or first chunk) ready
+TTS_REQUEST = "tts_request"  # First text sent to TTS
+AUDIO_OUT = "audio_out"  # First TTS audio back at websocket_server
+
+# Reported spans: name -> (from stage, to stage)
+SPANS = {
+    "stt": (SPEECH_END, ASR_FINAL),
+    "dispatch": (ASR_FINAL, CORRECTOR_IN),
+    "queue": (CORRECTOR_IN, CORRECTION_START),
+    "correction": (CORRECTION_START, CORRECTION_DONE),
+    "handoff": (CORRECTION_DONE, TTS_REQUEST),
+    "tts": (TTS_REQUEST, AUDIO_OUT),
+    "total": (SPEECH_END, AUDIO_OUT),
+}
+
+TRACE_PROPERTY = "trace"
+
+
+@dataclass
+class TraceContext:
+    """Utterance id and the monotonic time each stage was first reached"""
+
+    trace_id: str
+    marks: Dict[str, float] = field(default_factory=dict)
+
+    @classmethod
+    def new(cls) -> "TraceContext":
+        return cls(trace_id=uuid.uuid4().hex[:16])
+
+    def mark(self, stage: str, at: Optional[float] = None) -> "TraceContext":
+        """Record a stage; only its first occurrence counts"""
+        if stage not in self.marks:
+            self.marks[stage] = time.monotonic() if at is None else at
+        return self
+
+    def spans(self) -> Dict[str, float]:
+        """Milliseconds of each span whose two stages were marked"""
+        return {
+            name: (self.marks[end] - self.marks[start]) * 1000
+            for name, (start, end) in SPANS.items()
+            if start in self.marks and end in self.marks
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"id": self.trace_id, "marks": dict(self.marks)}
+
+    @classmethod
+    def from_dict(cls, data: Any) -> Optional["TraceContext"]:
+        if not isinstance(data, dict) or not data.get("id"):
+            return None
+        marks = data.get("marks")
+        return cls(
+            trace_id=str(data["id"]),
+            marks={
+                k: float(v)
+                for k, v in (marks.items() if isinstance(marks, dict) else ())
+                if isinstance(v, (int, float))
+            },
+        )
+
+    @classmethod
+    def find(cls, payload: Any) -> Optional["TraceContext"]:
+        """
+        Trace carried by a message payload, on the payload itself or in its
+        (possibly nested) metadata, e.g. asr_result metadata echoed by STT.
+        """
+        for _ in range(3):
+            if not isinstance(payload, dict):
+                return None
+            trace = cls.from_dict(payload.get(TRACE_PROPERTY))
+            if trace is not None:
+                return trace
+            payload = payload.get("metadata")
+        return None
+
+
+class _Window:
+    """Most recent samples of one span"""
+
+    def __init__(self, size: int):
+        self.samples: Deque[float] = deque(maxlen=size)
+        self.count = 0
+
+    def add(self, value: float) -> None:
+        self.samples.append(value)
+        self.count += 1
+
+    def percentile(self, q: float) -> float:
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class Tracer:
+    """
+    Span percentiles over the last `window` finished utterances.
+
+    A trace is recorded once; later TTS frames of the same utterance are
+    ignored.
+    """
+
+    def __init__(self, window: int = 512, max_recorded_ids: int = 4096):
+        self.window = window
+        self.max_recorded_ids = max_recorded_ids
+        self.traces = 0
+        self._spans: Dict[str, _Window] = {}
+        self._recorded: "OrderedDict[str, None]" = OrderedDict()
+
+    def record(self, trace: TraceContext) -> Optional[Dict[str, float]]:
+        """Add a finished trace; returns its spans, or None if already recorded"""
+        if trace.trace_id in self._recorded:
+            return None
+        self._recorded[trace.trace_id] = None
+        while len(self._recorded) > self.max_recorded_ids:
+            self._recorded.popitem(last=False)
+
+        self.traces += 1
+        spans = trace.spans()
+        for name, value in spans.items():
+            window = self._spans.get(name)
+            if window is None:
+                window = self._spans[name] = _Window(self.window)
+            window.add(value)
+        return spans
+
+    def percentiles(
+        self, quantiles: Iterable[float] = (0.5, 0.9, 0.99)
+    ) -> Dict[str, Dict[str, float]]:
+        """Per span: sample count and the given percentiles in ms"""
+        quantiles = tuple(quantiles)
+        result = {}
+        for name in SPANS:
+            window = self._spans.get(name)
+            if window is None or not window.samples:
+                continue
+            stats = {"count": window.count}
+            for q in quantiles:
+                stats[f"p{q * 100:g}"] = round(window.percentile(q), 1)
+            result[name] = stats
+        return result
+
+    def reset(self) -> None:
+        self.traces = 0
+        self._spans.clear()
+        self._recorded.clear()
+
+
+# Shared by every extension in the process
+tracer = Tracer()